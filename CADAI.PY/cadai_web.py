@@ -1,17 +1,53 @@
+import sys
+from pathlib import Path
+
+import altair as alt
+import numpy as np
 import streamlit as st
 import pandas as pd
-from io import BytesIO
+
+# shared modules live in the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cadai_bearings import bearing_constants, get_catalog, recommend_shaft
+from cadai_costing import cost_frames
+from cadai_design import solve
+from cadai_jobs import QueueFull, get_job_queue, render_jobs
+from cadai_lookup import FRAME_FAMILY, FRAME_WT_INDEX, get_frame_bw_from_roller_wt
+from cadai_memo import cached_cost_frame, cached_cost_roller, memo_stats
+from cadai_metrics import render_sidebar, start_rerun
+from cadai_pricebook import default_constants, get_price_book
+from cadai_store import get_store, new_quote_id
+from cadai_surface import DIMENSIONS, get_surface
+from cadai_sweep import SWEEP_KEYS, grid_frame, price_grid, quote_exposure, quote_totals, tornado
+from cadai_tables import CARRYING_FRAME_WT, SACI_FRAME_WT, SARI_FRAME_WT, SARI_N_FRAME_WT, fab_tables
+from cadai_schedule import (
+    OPTIONAL_COLUMNS, REQUIRED_COLUMNS, cost_schedule, read_schedule, template_csv, validate_schedule,
+)
+
+# ================== INSTRUMENTATION ==================
+# No-op unless CADAI_METRICS=1; open with ?diag=1 for the diagnostics sidebar
+perf = start_rerun(st.session_state)
+perf.mark("setup")
 
 # ================== SESSION INIT ==================
 if "stage" not in st.session_state: st.session_state.stage="select_roller"
-if "costings" not in st.session_state: st.session_state.costings=[]
-if "frame_costings" not in st.session_state: st.session_state.frame_costings=[]
 if "constants" not in st.session_state: st.session_state.constants={}
 if "selected_roller" not in st.session_state: st.session_state.selected_roller=None
 if "last_roller_weight" not in st.session_state: st.session_state.last_roller_weight=0
 if "qty_type" not in st.session_state: st.session_state.qty_type="Single Roller"
 if "qty_value" not in st.session_state: st.session_state.qty_value=1
 
+# ================== QUOTE STORE ==================
+# Roller / frame lines live in SQLite; the session only keeps its quote id
+# (mirrored in the URL so a page reload reopens the same quote).
+store = get_store()
+if "quote_id" not in st.session_state:
+    st.session_state.quote_id = st.query_params.get("quote") or new_quote_id()
+if st.query_params.get("quote") != st.session_state.quote_id:
+    st.query_params["quote"] = st.session_state.quote_id
+qid = st.session_state.quote_id
+
 # ================== SIMPLE BACK SYSTEM ==================
 
 if "history" not in st.session_state:
@@ -33,299 +69,35 @@ def back():
         st.rerun()
 
 # ================== CONSTANTS ==================
-DEFAULT_CONSTANTS = {
-    "STEEL_COST": 70.0,
-    "BEARING_COST_PAIR": 100.0,
-    "SEAL_COST": 30.0,
-    "WELDING_COST": 80.0,
-    "MARKUP": 1.25,
-    "FRAME_RATE": 100.0,
-    "GUIDE_ROLLER": 0.0,
-    "PIVOT_BEARING": 0.0,
-    "LOCKING_RING": 0.0,
-}
+# Rates come from the price book (pricebook.toml, reloaded when saved). Sessions
+# that kept the defaults follow it on every rerun; edited constants stay put.
+DEFAULT_CONSTANTS = default_constants()
+if st.session_state.constants and st.session_state.get("constants_source", "book") == "book":
+    st.session_state.constants = DEFAULT_CONSTANTS.copy()
 
 
 # ================== HELPERS ==================
-def make_df(rows=None):
-
-    cols = ["DESCRIPTION","SECTION","SIZE","WT/M","LENGTH","QTY","TOTAL WT"]
-
-    if not rows:
-        return pd.DataFrame(columns=cols)
-
-    return pd.DataFrame(rows, columns=cols)
-
-
 def safe_get(table, key, label):
 
     if key not in table:
         st.error(f"{label} not available for {key} mm")
+        perf.finish()
         st.stop()
 
     return table[key]
 
 
 # ================== FRAME WEIGHT TABLES ==================
-CARRYING_FRAME_WT = {650:12.7,800:16.8,1000:23.1,1200:26.2,1400:35,1600:38.4,1800:52.4,2000:64.7}
-SARI_FRAME_WT     = {650:14.2,800:18.1,1000:24.5,1200:28.9,1400:37.4,1600:41.8,1800:56.2,2000:68.9}
-SARI_N_FRAME_WT   = {800:19.3,1000:26.1,1200:30.2}
-SACI_FRAME_WT     = {650:13.5,800:17.2,1000:22.9,1200:27.4,1400:36.2,1600:40.5,1800:54.3,2000:66.1}
-
-
-# ================== ROLLER WT → BW ==================
-ROLLER_WT_TO_BW = [
-    (0,15,650),(15,22,800),(22,30,1000),(30,38,1200),
-    (38,48,1400),(48,60,1600),(60,75,1800),(75,1000,2000)
-]
-
-def get_bw(wt):
-
-    for low,high,bw in ROLLER_WT_TO_BW:
-        if low<=wt<high:
-            return bw
+# CARRYING_FRAME_WT / SARI_FRAME_WT / SARI_N_FRAME_WT / SACI_FRAME_WT and the
+# roller WT → BW bands live in cadai_tables; lookups go through cadai_lookup.
 
-    return 1000
 
-
-# ================== FABRICATION TABLES ==================
 # ================== FABRICATION TABLES ==================
-# NOTE: Keep your dict names consistent:
-# - SACI_FAB (not SACI)
-# - SARI_N_FAB must NOT be overwritten later
-
-CARRYING_FAB = {
-    650: make_df([
-        ["BASE ANGLE","ANGLE","65x65x6",5.8,0.984,1,5.71],
-        ["SIDE BRACKET","FLAT","65x6",3.1,0.345,2,2.14],
-        ["CENTER BRACKET","FLAT","65x6",3.1,0.365,2,2.26],
-        ["MID FLAT","FLAT","50x6",2.4,0.300,2,1.44],
-        ["BASE FLAT","FLAT","50x6",2.4,0.240,2,1.15],
-    ]),
-    800: make_df([
-        ["BASE ANGLE","ANGLE","75x75x6",6.8,1.134,1,7.71],
-        ["SIDE BRACKET","FLAT","75x6",3.5,0.385,2,2.70],
-        ["CENTER BRACKET","FLAT","75x6",3.5,0.400,2,2.80],
-        ["MID FLAT","FLAT","50x6",2.4,0.500,2,2.40],
-        ["BASE FLAT","FLAT","50x6",2.4,0.240,2,1.15],
-    ]),
-    1000: make_df([
-        ["BASE ANGLE","ANGLE","90x90x6",6.0,1.350,1,8.10],
-        ["SIDE BRACKET","FLAT","75x8",4.7,0.425,2,4.00],
-        ["CENTER BRACKET","FLAT","75x8",4.7,0.415,2,3.90],
-        ["MID FLAT","FLAT","50x6",2.4,0.550,2,2.64],
-        ["BASE FLAT","FLAT","65x6",3.1,0.240,2,1.49],
-    ]),
-    1200: make_df([
-        ["BASE ANGLE","ANGLE","90x90x6",8.2,1.550,1,12.71],
-        ["SIDE BRACKET","FLAT","75x8",4.7,0.485,2,4.56],
-        ["CENTER BRACKET","FLAT","75x8",4.7,0.435,2,4.09],
-        ["MID FLAT","FLAT","50x6",2.4,0.600,2,2.88],
-        ["BASE FLAT","FLAT","65x8",4.1,0.240,2,1.97],
-    ]),
-    1400: make_df([
-        ["BASE ANGLE","ANGLE","100x100x8",12.1,1.750,1,21.18],
-        ["SIDE BRACKET","FLAT","75x8",4.7,0.520,2,4.89],
-        ["CENTER BRACKET","FLAT","75x8",4.7,0.440,2,4.14],
-        ["MID FLAT","FLAT","50x6",2.4,0.600,2,2.88],
-        ["BASE FLAT","FLAT","65x8",4.1,0.240,2,1.97],
-    ]),
-    1600: make_df([
-        ["BASE ANGLE","ANGLE","100x100x8",12.1,1.960,1,23.72],
-        ["SIDE BRACKET","FLAT","75x8",4.7,0.560,2,5.26],
-        ["CENTER BRACKET","FLAT","75x8",4.7,0.440,2,4.14],
-        ["MID FLAT","FLAT","50x6",2.4,0.700,2,3.36],
-        ["BASE FLAT","FLAT","65x8",4.1,0.240,2,1.97],
-    ]),
-    1800: make_df([
-        ["BASE ANGLE","ANGLE","110x110x10",16.5,2.170,1,35.81],
-        ["SIDE BRACKET","FLAT","75x8",4.7,0.610,2,5.73],
-        ["CENTER BRACKET","FLAT","75x8",4.7,0.445,2,4.18],
-        ["MID FLAT","FLAT","50x6",2.4,0.750,2,3.60],
-        ["BASE FLAT","FLAT","75x10",5.9,0.260,2,3.07],
-    ]),
-    2000: make_df([
-        ["BASE ANGLE","ANGLE","130x130x10",19.7,2.370,1,46.69],
-        ["SIDE BRACKET","FLAT","75x8",4.7,0.650,2,6.11],
-        ["CENTER BRACKET","FLAT","75x8",4.7,0.485,2,4.56],
-        ["MID FLAT","FLAT","50x6",2.4,0.800,2,3.84],
-        ["BASE FLAT","FLAT","75x10",5.9,0.300,2,3.54],
-    ]),
-}
-
-# ✅ IMPORTANT: name must be SACI_FAB (your frame stage uses SACI_FAB)
-SACI_FAB = {
-    650: make_df([
-        ["BASE CHANNEL", "CHANNEL", "ISMC 100 x 50", 9.2, 0.834, 1, 7.67],
-        ["BRG. ANGLE", "ANGLE", "65 x 65 x 6", 5.8, 1.095, 1, 6.35],
-        ["SIDE BRACKET", "FLAT", "65 x 6", 3.1, 0.180, 2, 1.12],
-        ["CENTRE BRACKET", "FLAT", "65 x 6", 3.1, 0.380, 2, 2.36],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6", 4.5, 0.050, 2, 0.45],
-        ["GUIDE BRACKET", "FLAT", "75 x 6", 3.5, 0.150, 2, 1.05],
-        ["MOUNTING ANGLE", "ANGLE", "75 x 75 x 6", 6.8, 0.240, 2, 3.26],
-    ]),
-    800: make_df([
-        ["BASE CHANNEL", "CHANNEL", "ISMC 100 x 50", 9.2, 0.954, 1, 8.78],
-        ["BRG. ANGLE", "ANGLE", "75 x 75 x 6", 6.8, 1.310, 1, 8.91],
-        ["SIDE BRACKET", "FLAT", "75 x 6", 3.5, 0.190, 2, 1.33],
-        ["CENTRE BRACKET", "FLAT", "75 x 6", 3.5, 0.405, 2, 2.84],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6", 4.5, 0.050, 2, 0.45],
-        ["GUIDE BRACKET", "FLAT", "100 x 6", 4.7, 0.160, 2, 1.50],
-        ["MOUNTING ANGLE", "ANGLE", "90 x 90 x 6", 8.2, 0.240, 2, 3.94],
-    ]),
-    1000: make_df([
-        ["BASE CHANNEL", "CHANNEL", "ISMC 125 x 65", 12.7, 1.150, 1, 14.61],
-        ["BRG. ANGLE", "ANGLE", "90 x 90 x 6", 8.2, 1.565, 1, 12.83],
-        ["SIDE BRACKET", "FLAT", "75 x 8", 4.7, 0.200, 2, 1.88],
-        ["CENTRE BRACKET", "FLAT", "75 x 8", 4.7, 0.440, 2, 4.14],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6", 4.5, 0.050, 2, 0.45],
-        ["GUIDE BRACKET", "FLAT", "100 x 6", 4.7, 0.160, 2, 1.50],
-        ["MOUNTING ANGLE", "ANGLE", "100 x 100 x 8", 12.1, 0.240, 2, 5.81],
-    ]),
-    1200: make_df([
-        ["BASE CHANNEL", "CHANNEL", "ISMC 125 x 65", 12.7, 1.350, 1, 17.15],
-        ["BRG. ANGLE", "ANGLE", "90 x 90 x 6", 8.2, 1.810, 1, 14.84],
-        ["SIDE BRACKET", "FLAT", "75 x 8", 4.7, 0.190, 2, 1.79],
-        ["CENTRE BRACKET", "FLAT", "75 x 8", 4.7, 0.425, 2, 4.00],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6", 4.5, 0.050, 2, 0.45],
-        ["GUIDE BRACKET", "FLAT", "130 x 8", 8.2, 0.170, 2, 2.79],
-        ["MOUNTING ANGLE", "ANGLE", "100 x 100 x 8", 12.1, 0.240, 2, 5.81],
-    ]),
-    1400: make_df([
-        ["BASE CHANNEL", "CHANNEL", "ISMC 150 x 75", 16.4, 1.550, 1, 25.42],
-        ["BRG. ANGLE", "ANGLE", "100 x 100 x 8", 12.1, 2.030, 1, 24.56],
-        ["SIDE BRACKET", "FLAT", "75 x 8", 4.7, 0.205, 2, 1.93],
-        ["CENTRE BRACKET", "FLAT", "75 x 8", 4.7, 0.450, 2, 4.23],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6", 4.5, 0.050, 2, 0.45],
-        ["GUIDE BRACKET", "FLAT", "130 x 8", 8.2, 0.170, 2, 2.79],
-        ["MOUNTING ANGLE", "ANGLE", "100 x 100 x 8", 12.1, 0.240, 2, 5.81],
-    ]),
-    1600: make_df([
-        ["BASE CHANNEL", "CHANNEL", "ISMC 150 x 75", 16.4, 1.760, 1, 28.86],
-        ["BRG. ANGLE", "ANGLE", "100 x 100 x 8", 12.1, 2.240, 1, 27.10],
-        ["SIDE BRACKET", "FLAT", "75 x 8", 4.7, 0.205, 2, 1.93],
-        ["CENTRE BRACKET", "FLAT", "75 x 8", 4.7, 0.450, 2, 4.23],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6", 4.5, 0.050, 2, 0.45],
-        ["GUIDE BRACKET", "FLAT", "130 x 8", 8.2, 0.170, 2, 2.79],
-        ["MOUNTING ANGLE", "ANGLE", "100 x 100 x 8", 12.1, 0.240, 2, 5.81],
-    ]),
-    1800: make_df([
-        ["BASE CHANNEL", "CHANNEL", "ISMC 150 x 75", 16.4, 1.950, 1, 31.98],
-        ["BRG. ANGLE", "ANGLE", "110 x 110 x 10", 16.5, 2.445, 1, 40.34],
-        ["SIDE BRACKET", "FLAT", "75 x 8", 4.7, 0.220, 2, 2.07],
-        ["CENTRE BRACKET", "FLAT", "75 x 8", 4.7, 0.470, 2, 4.42],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6", 4.5, 0.050, 2, 0.45],
-        ["GUIDE BRACKET", "FLAT", "130 x 8", 8.2, 0.185, 2, 3.03],
-        ["MOUNTING ANGLE", "ANGLE", "110 x 110 x 10", 16.5, 0.260, 2, 8.58],
-    ]),
-    2000: make_df([
-        ["BASE CHANNEL", "CHANNEL", "ISMC 150 x 75", 16.4, 2.150, 1, 35.26],
-        ["BRG. ANGLE", "ANGLE", "130 x 130 x 10", 19.7, 2.650, 1, 52.21],
-        ["SIDE BRACKET", "FLAT", "75 x 8", 4.7, 0.215, 2, 2.02],
-        ["CENTRE BRACKET", "FLAT", "75 x 8", 4.7, 0.460, 2, 4.32],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6", 4.5, 0.050, 2, 0.45],
-        ["GUIDE BRACKET", "FLAT", "130 x 8", 8.2, 0.190, 2, 3.12],
-        ["MOUNTING ANGLE", "ANGLE", "110 x 110 x 10", 16.5, 0.300, 2, 9.90],
-    ]),
-}
-
-# ✅ SARI tables present (you already pasted)
-SARI_FAB = {
-    650: make_df([
-        ["BASE CHANNEL",  "ISMC",  "100 x 50",        0.972, 9.2, 1,  8.94],
-        ["BRG. ANGLE",    "ANGLE", "65 x 65 x 6",     0.790, 5.8, 1,  4.58],
-        ["SIDE BRACKET",  "FLAT",  "65 x 6",          0.125, 3.1, 2,  0.78],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6",     0.050, 4.5, 2,  0.45],
-        ["GUIDE BRACKET", "FLAT",  "75 x 6",          0.150, 3.5, 2,  1.05],
-        ["MOUNTING FLAT", "FLAT",  "100 x 6",         0.330, 4.7, 2,  3.10],
-    ]),
-    800: make_df([
-        ["BASE CHANNEL",  "ISMC",  "100 x 50",        1.122, 9.2, 1, 10.32],
-        ["BRG. ANGLE",    "ANGLE", "75 x 75 x 6",     0.990, 6.8, 1,  6.73],
-        ["SIDE BRACKET",  "FLAT",  "75 x 6",          0.130, 3.5, 2,  0.91],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6",     0.050, 4.5, 2,  0.45],
-        ["GUIDE BRACKET", "FLAT",  "100 x 6",         0.160, 4.7, 2,  1.50],
-        ["MOUNTING FLAT", "FLAT",  "100 x 6",         0.340, 4.7, 2,  3.20],
-    ]),
-    1000: make_df([
-        ["BASE CHANNEL",  "ISMC",  "125 x 65",        1.334, 12.7, 1, 16.94],
-        ["BRG. ANGLE",    "ANGLE", "90 x 90 x 6",     1.194,  8.2, 1,  9.79],
-        ["SIDE BRACKET",  "FLAT",  "75 x 8",          0.130,  4.7, 2,  1.22],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6",     0.050,  4.5, 2,  0.45],
-        ["GUIDE BRACKET", "FLAT",  "100 x 6",         0.160,  4.7, 2,  1.50],
-        ["MOUNTING FLAT", "FLAT",  "130 x 8",         0.380,  8.2, 2,  6.23],
-    ]),
-    1200: make_df([
-        ["BASE CHANNEL",  "ISMC",  "125 x 65",        1.544, 12.7, 1, 19.61],
-        ["BRG. ANGLE",    "ANGLE", "90 x 90 x 6",     1.444,  8.2, 1, 11.84],
-        ["SIDE BRACKET",  "FLAT",  "75 x 8",          0.130,  4.7, 2,  1.22],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6",     0.050,  4.5, 2,  0.45],
-        ["GUIDE BRACKET", "FLAT",  "130 x 8",         0.160,  8.2, 2,  2.62],
-        ["MOUNTING FLAT", "FLAT",  "130 x 8",         0.380,  8.2, 2,  6.23],
-    ]),
-    1400: make_df([
-        ["BASE CHANNEL",  "ISMC",  "150 x 75",        1.744, 16.4, 1, 28.60],
-        ["BRG. ANGLE",    "ANGLE", "100 x 100 x 8",   1.644, 12.1, 1, 19.89],
-        ["SIDE BRACKET",  "FLAT",  "75 x 8",          0.140,  4.7, 2,  1.32],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6",     0.050,  4.5, 2,  0.45],
-        ["GUIDE BRACKET", "FLAT",  "130 x 8",         0.170,  8.2, 2,  2.79],
-        ["MOUNTING FLAT", "FLAT",  "150 x 8",         0.420,  9.4, 2,  7.90],
-    ]),
-    1600: make_df([
-        ["BASE CHANNEL",  "ISMC",  "150 x 75",        1.954, 16.4, 1, 32.05],
-        ["BRG. ANGLE",    "ANGLE", "100 x 100 x 8",   1.844, 12.1, 1, 22.31],
-        ["SIDE BRACKET",  "FLAT",  "75 x 8",          0.140,  4.7, 2,  1.32],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6",     0.050,  4.5, 2,  0.45],
-        ["GUIDE BRACKET", "FLAT",  "130 x 8",         0.170,  8.2, 2,  2.79],
-        ["MOUNTING FLAT", "FLAT",  "150 x 8",         0.420,  9.4, 2,  7.90],
-    ]),
-    1800: make_df([
-        ["BASE CHANNEL",  "ISMC",  "150 x 75",        2.150, 16.4, 1, 35.26],
-        ["BRG. ANGLE",    "ANGLE", "110 x 110 x 10",  2.044, 16.5, 1, 33.73],
-        ["SIDE BRACKET",  "FLAT",  "75 x 8",          0.150,  4.7, 2,  1.41],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6",     0.050,  4.5, 2,  0.45],
-        ["GUIDE BRACKET", "FLAT",  "130 x 8",         0.180,  8.2, 2,  2.95],
-        ["MOUNTING FLAT", "FLAT",  "150 x 8",         0.460,  9.4, 2,  8.65],
-    ]),
-    2000: make_df([
-        ["BASE CHANNEL",  "ISMC",  "150 x 75",        2.350, 16.4, 1, 38.54],
-        ["BRG. ANGLE",    "ANGLE", "130 x 130 x 10",  2.244, 19.7, 1, 44.21],
-        ["SIDE BRACKET",  "FLAT",  "75 x 8",          0.165,  4.7, 2,  1.55],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6",     0.050,  4.5, 2,  0.45],
-        ["GUIDE BRACKET", "FLAT",  "130 x 8",         0.160,  8.2, 2,  2.62],
-        ["MOUNTING FLAT", "FLAT",  "150 x 8",         0.490,  9.4, 2,  9.21],
-    ]),
-}
-
-# ✅ THIS WAS YOUR BUG:
-# You defined SARI_N_FAB with data above, then overwrote it to {} later.
-# DO NOT overwrite it. Keep the populated dict.
-SARI_N_FAB = {
-    800: make_df([
-        ["BASE CHANNEL", "ISMC", "100 x 50", 1.148, 9.2, 1, 10.56],
-        ["BRG. ANGLE", "ANGLE", "65 x 65 x 6", 1.042, 5.8, 1, 6.04],
-        ["SIDE BRACKET", "FLAT", "65 x 6", 0.152, 3.5, 2, 1.06],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6", 0.050, 4.5, 2, 0.45],
-        ["GUIDE BRACKET", "ANGLE", "50 x 50 x 6", 0.185, 4.5, 2, 1.67],
-        ["MOUNTING FLAT", "FLAT", "110 x 6", 0.387, 5.0, 2, 3.87],
-    ]),
-    1000: make_df([
-        ["BASE CHANNEL", "ISMC", "100 x 50", 1.348, 9.2, 1, 12.40],
-        ["BRG. ANGLE", "ANGLE", "65 x 65 x 6", 1.242, 5.8, 1, 7.20],
-        ["SIDE BRACKET", "FLAT", "65 x 6", 0.152, 3.5, 2, 1.06],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6", 0.050, 4.5, 2, 0.45],
-        ["GUIDE BRACKET", "ANGLE", "50 x 50 x 6", 0.185, 4.5, 2, 1.67],
-        ["MOUNTING FLAT", "FLAT", "110 x 6", 0.387, 5.0, 2, 3.87],
-    ]),
-    1200: make_df([
-        ["BASE CHANNEL", "ISMC", "100 x 50", 1.548, 9.2, 1, 14.24],
-        ["BRG. ANGLE", "ANGLE", "65 x 65 x 6", 1.442, 5.8, 1, 8.36],
-        ["SIDE BRACKET", "FLAT", "65 x 6", 0.191, 3.5, 2, 1.34],
-        ["SUPPORT ANGLE", "ANGLE", "50 x 50 x 6", 0.050, 4.5, 2, 0.45],
-        ["GUIDE BRACKET", "ANGLE", "50 x 50 x 6", 0.190, 4.5, 2, 1.71],
-        ["MOUNTING FLAT", "FLAT", "110 x 6", 0.409, 5.0, 2, 4.09],
-    ]),
-}
+# Built once per process in cadai_tables (shared, read-only across sessions)
+CARRYING_FAB = fab_tables("CARRYING")
+SACI_FAB     = fab_tables("SACI")
+SARI_FAB     = fab_tables("SARI")
+SARI_N_FAB   = fab_tables("SARI_N")
 
 
 
@@ -340,6 +112,7 @@ with left:
         if st.button("⬅", key=f"top_back_{st.session_state.stage}"):
             back()
 # ================== SELECT ==================
+perf.stage("select_roller")
 if st.session_state.stage=="select_roller":
 
     main = st.selectbox("Roller Type",[
@@ -366,8 +139,18 @@ if st.session_state.stage=="select_roller":
             st.session_state.stage="ask_constants"
             st.rerun()
 
+    st.markdown("---")
+    b1,b2=st.columns(2)
+    if b1.button("📥 Bulk Import Roller Schedule", key="btn_bulk_import"):
+        st.session_state.stage="bulk_import"
+        st.rerun()
+    if b2.button("🆕 New Quote", key="btn_new_quote", help=f"Current quote: {qid}"):
+        st.session_state.quote_id=new_quote_id()
+        st.rerun()
+
 
 # ================== CONSTANT ASK ==================
+perf.stage("ask_constants")
 if st.session_state.stage=="ask_constants":
 
     st.subheader("Change Constants?")
@@ -380,14 +163,18 @@ if st.session_state.stage=="ask_constants":
 
     if c2.button("NO"):
         st.session_state.constants=DEFAULT_CONSTANTS.copy()
+        st.session_state.constants_source="book"
         st.session_state.stage="input"
         st.rerun()
 
 
 # ================== CONSTANT EDIT ==================
+perf.stage("constants")
 if st.session_state.stage=="constants":
 
     st.subheader("Edit Constants")
+    if get_price_book().error:
+        st.warning(f"Price book not reloaded: {get_price_book().error}")
 
     c={}
     cols=st.columns(3)
@@ -398,37 +185,108 @@ if st.session_state.stage=="constants":
 
     if st.button("Save"):
         st.session_state.constants=c
+        st.session_state.constants_source="custom"
         st.session_state.stage="input"
         st.rerun()
 
 
+# ================== BULK IMPORT ==================
+perf.stage("bulk_import")
+if st.session_state.stage=="bulk_import":
+
+    st.subheader("Bulk Import Roller Schedule")
+    st.caption(
+        "One row per roller line. Columns: "
+        + ", ".join(REQUIRED_COLUMNS)
+        + " (optional: " + ", ".join(OPTIONAL_COLUMNS) + ")"
+    )
+    st.download_button("Download Template", template_csv(), "roller_schedule_template.csv")
+
+    if not st.session_state.constants:
+        st.session_state.constants=DEFAULT_CONSTANTS.copy()
+        st.session_state.constants_source="book"
+        st.info("Using default constants.")
+
+    uploaded=st.file_uploader("Roller Schedule", type=["xlsx","csv"], key="bulk_schedule_file")
+
+    if uploaded is not None:
+        schedule=read_schedule(uploaded)
+        valid, errors = validate_schedule(schedule)
+
+        st.info(f"{len(valid)} valid line(s) | {len(errors)} error(s)")
+        if errors:
+            st.dataframe(pd.DataFrame(errors), use_container_width=True, hide_index=True)
+
+        if st.button("Cost Schedule", key="btn_cost_schedule", disabled=valid.empty):
+            bar=st.progress(0.0)
+            rows=[]
+            for done,total,chunk_rows in cost_schedule(valid, st.session_state.constants):
+                rows.extend(chunk_rows)
+                bar.progress(done/total, text=f"Costed {done} / {total} lines")
+
+            store.add_rollers(qid, rows)
+            st.session_state.selected_roller=rows[-1]["ROLLER"]
+            st.session_state.last_roller_weight=rows[-1]["WT"]
+            st.session_state.stage="compiled"
+            st.rerun()
+
+
 # ================== INPUT (CLEAN + NO ERRORS) ==================
 # ================== INPUT (FIXED + IMPACT LOGIC ADDED) ==================
+perf.stage("input")
 if st.session_state.stage == "input":
 
     st.subheader(f"Roller: {st.session_state.selected_roller}")
 
-    # --- Bearing Options ---
-    BEARING_OPTIONS = {
-        "420201 (12 mm bore)": 12,
-        "420202 (15 mm bore)": 15,
-        "420203 (17 mm bore)": 17,
-        "420204 (20 mm bore)": 20,
-        "420205 (25 mm bore)": 25,
-        "420206 (30 mm bore)": 30,
-        "6203 (17 mm bore)": 17,
-        "6204 (20 mm bore)": 20,
-        "6205 (25 mm bore)": 25,
-        "6206 (30 mm bore)": 30,
-        "6304 (20 mm bore)": 20,
-        "6305 (25 mm bore)": 25,
-        "6306 (30 mm bore)": 30,
-    }
-
-    MARKET_SHAFT_SIZES = [12, 15, 17, 20, 25, 30, 35, 40, 45, 50]
+    # --- Bearing catalog (data/bearings.csv, loaded once per process) ---
+    catalog = get_catalog()
 
     is_impact = (st.session_state.selected_roller == "Impact Idler Without Frame")
 
+    # ================== CHEAPEST DESIGN (cadai_design) ==================
+    # Sits above the spec inputs so "Use Design" can fill them in this same rerun
+    with st.expander("Find Cheapest Design"):
+        d1, d2, d3 = st.columns(3)
+        design_bw = d1.number_input("Belt Width (mm)", value=1000, min_value=300, step=50, key="design_bw")
+        design_load = d2.number_input("Roller Load (kN)", value=5.0, min_value=0.0, step=0.5, key="design_load")
+        design_bearing = d3.selectbox(
+            "Bearing", ["Any"] + [f"Series {s}" for s in catalog.series] + catalog.options(), key="design_bearing",
+        )
+
+        if st.button("Search Designs", key="design_search_btn"):
+            choice = None
+            if design_bearing.startswith("Series "):
+                choice = design_bearing.removeprefix("Series ")
+            elif design_bearing != "Any":
+                choice = catalog.sku_of_label(design_bearing)
+            st.session_state.design_result = solve(
+                design_bw, design_load, st.session_state.selected_roller,
+                {**DEFAULT_CONSTANTS, **st.session_state.constants}, choice,
+            )
+
+        result = st.session_state.get("design_result")
+        if result is not None:
+            designs = result["designs"]
+            st.caption(
+                f"{result['combinations']:,} combinations · {result['evaluated']:,} costed · "
+                f"{result['pruned']} of {result['branches']} bearings pruned"
+            )
+            if designs.empty:
+                st.warning("No design meets the load with these options.")
+            else:
+                st.dataframe(designs, hide_index=True)
+                u1, u2 = st.columns([1, 1])
+                pick = u1.selectbox("Design", designs.index, format_func=lambda i: f"#{i + 1}", key="design_pick")
+                if u2.button("Use Design", key="design_use_btn"):
+                    d = designs.loc[pick]
+                    st.session_state.pipe_dia = float(d["PIPE DIA"])
+                    st.session_state.pipe_thk = float(d["PIPE THK"])
+                    st.session_state.fw_mode = "Manual"
+                    st.session_state.face_width_manual = float(d["FACE WIDTH"])
+                    st.session_state.bearing_choice = catalog.label(catalog.rows(d["BEARING"]))
+                    st.session_state.shaft_dia = float(d["SHAFT DIA"])
+                    st.session_state.shaft_len = float(d["SHAFT LENGTH"])
+
     # ================== QTY + TYPE ==================
 
     qty_col1, qty_col2 = st.columns([1, 2])
@@ -488,12 +346,17 @@ if st.session_state.stage == "input":
 
     # ================== PIPE + FACE WIDTH ==================
 
+    # spec defaults go in through the widget keys (no value=), so "Use Design"
+    # above can set these inputs without clashing with a widget default
+    for k, v in {"pipe_dia": 89.0, "pipe_thk": 3.2, "face_width_manual": 190.0}.items():
+        if k not in st.session_state:
+            st.session_state[k] = v
+
     c1, c2 = st.columns([1, 1])
 
     with c1:
         pipe_dia = st.number_input(
             "PIPE DIA (mm)",
-            value=89.0,
             min_value=0.0,
             step=0.1,
             key="pipe_dia"
@@ -501,7 +364,6 @@ if st.session_state.stage == "input":
 
         pipe_thk = st.number_input(
             "PIPE THK (mm)",
-            value=3.2,
             min_value=0.0,
             step=0.1,
             key="pipe_thk"
@@ -520,7 +382,6 @@ if st.session_state.stage == "input":
 
             face_width = st.number_input(
                 "FACE WIDTH (mm)",
-                value=190.0,
                 min_value=0.0,
                 step=1.0,
                 key="face_width_manual",
@@ -563,21 +424,20 @@ if st.session_state.stage == "input":
 
         bearing_choice = st.selectbox(
             "BEARING STANDARD",
-            list(BEARING_OPTIONS.keys()),
+            catalog.options(),
             key="bearing_choice",
         )
 
-        bore = int(BEARING_OPTIONS[bearing_choice])
-        target = bore + 5
-
-        rec_shaft_dia = next(
-            (s for s in MARKET_SHAFT_SIZES if s >= target),
-            target
-        )
+        bearing_sku = catalog.sku_of_label(bearing_choice)
+        rec_shaft_dia = recommend_shaft(catalog.bore_of(bearing_sku))
+        bearing_cost = catalog.pair_cost(bearing_sku, np.nan)
+        if not np.isnan(bearing_cost):
+            st.caption(f"Bearing pair cost (catalog) = {bearing_cost:g}")
 
+        if "shaft_dia" not in st.session_state:
+            st.session_state.shaft_dia = float(rec_shaft_dia)
         shaft_dia = st.number_input(
             "SHAFT DIA (mm)",
-            value=float(rec_shaft_dia),
             min_value=0.0,
             step=1.0,
             key="shaft_dia",
@@ -587,71 +447,41 @@ if st.session_state.stage == "input":
 
         fw = st.session_state.get("face_width", 190.0)
 
+        if "shaft_len" not in st.session_state:
+            st.session_state.shaft_len = float(fw + 60)
         shaft_len = st.number_input(
             "SHAFT LENGTH (mm)",
-            value=float(fw + 60),
             min_value=0.0,
             step=1.0,
             key="shaft_len",
         )
 
     st.markdown("---")
-    # ================== IMPACT RULES (ONLY LOGIC, NO UI CHANGE) ==================
-shaft_dia_eff = float(shaft_dia)          # ✅ aligned
-if is_impact:
-        # IF X IS ODD THEN ADD 3 (X+3)
-        sd_int = int(round(shaft_dia_eff))
-        if sd_int % 2 != 0:
-            shaft_dia_eff = float(sd_int + 3)
-
-    # Rubber rings (Impact only)
-    rubber_qty = 0
-    rubber_cost = 0.0
-    if is_impact:
-        rubber_qty = int(float(face_width) / 35)  # as per your formula
-        rubber_cost = float(rubber_qty * 50)
 
-    # --- WEIGHT CALC ---
-    pipe_wt  = (3.14 * pipe_dia * face_width * pipe_thk * 7.85) / 1e6
-    shaft_wt = (3.14 / 4) * (shaft_dia_eff / 10) ** 2 * (shaft_len / 10) * 7.85 / 1000
-    total_wt = pipe_wt + shaft_wt
+    # ================== COSTING (shared engine, memoized across sessions) ==================
+    res = cached_cost_roller(
+        pipe_dia, pipe_thk, face_width, shaft_dia, shaft_len,
+        st.session_state.selected_roller, roller_qty, bearing_constants(st.session_state.constants, bearing_sku),
+    )
 
-    st.session_state.last_roller_weight = float(total_wt)
+    shaft_dia_eff  = res["shaft_dia"]
+    rubber_qty     = int(res["rubber_qty"])
+    rubber_cost    = res["rubber_cost"]
+    bracket_weight = res["bracket_wt"]
+    bracket_cost   = res["bracket_cost"]
+    total_wt       = res["weight"]
+    unit_cp        = res["unit_cp"]
+    unit_price     = res["unit_price"]
+    total_price    = res["total_price"]
 
-    # --- COSTING ---
-    c = st.session_state.constants
-    housing_cost = pipe_dia / 2
-
-    # --- Flat Return Bracket Logic ---
-bracket_cost = 0
-bracket_weight = 0
-
-if st.session_state.selected_roller == "Flat Return Roller":
-    bracket_weight = 1.5 * 2  # 2 brackets per roller
-    bracket_cost = bracket_weight * c["STEEL_COST"]
-
-    unit_cp = (
-    total_wt * c["STEEL_COST"]
-    + housing_cost
-    + rubber_cost
-    + bracket_cost   # ✅ added
-    + c["BEARING_COST_PAIR"]
-    + c["SEAL_COST"]
-    + c["WELDING_COST"]
-    + c.get("GUIDE_ROLLER", 0.0)
-    + c.get("PIVOT_BEARING", 0.0)
-    + c.get("LOCKING_RING", 0.0)
-)
-
-    unit_price  = unit_cp * c["MARKUP"]
-    total_price = unit_price * roller_qty
+    st.session_state.last_roller_weight = float(total_wt)
 
     # --- DISPLAY ---
     if st.session_state.selected_roller == "Flat Return Roller":
-    st.caption(
-        f"Bracket Weight = {bracket_weight} kg | "
-        f"Bracket Cost = {round(bracket_cost,2)}"
-    )
+        st.caption(
+            f"Bracket Weight = {bracket_weight} kg | "
+            f"Bracket Cost = {round(bracket_cost,2)}"
+        )
     if is_impact:
         st.info(
             f"Roller Weight = {round(total_wt,3)} kg | "
@@ -666,6 +496,28 @@ if st.session_state.selected_roller == "Flat Return Roller":
             f"Total Price = {round(total_price,2)}"
         )
 
+    # --- PRICE vs DIMENSION (shared price surface, no recosting) ---
+    if st.toggle("Show price vs. dimension", key="price_charts"):
+        surface = get_surface(st.session_state.selected_roller, bearing_constants(st.session_state.constants, bearing_sku))
+        point = {
+            "PIPE DIA": pipe_dia, "PIPE THK": pipe_thk, "FACE WIDTH": face_width,
+            "SHAFT DIA": shaft_dia, "SHAFT LENGTH": shaft_len,
+        }
+        estimate = surface.lookup(point)
+        if estimate is None:
+            st.caption("Current spec is outside the precomputed grid; curves are clipped to it.")
+        else:
+            st.caption(f"Grid unit price = {estimate:,.2f} (dashed line = current value)")
+        for tab, dim in zip(st.tabs(DIMENSIONS), DIMENSIONS):
+            xs, prices = surface.profile(dim, point)
+            curve = pd.DataFrame({dim: xs, "UNIT PRICE": prices}).dropna()
+            chart = alt.Chart(curve).mark_line(point=True).encode(
+                x=f"{dim}:Q", y=alt.Y("UNIT PRICE:Q", scale=alt.Scale(zero=False)),
+                tooltip=[dim, alt.Tooltip("UNIT PRICE:Q", format=",.2f")],
+            )
+            here = alt.Chart(pd.DataFrame({dim: [point[dim]]})).mark_rule(strokeDash=[4, 4]).encode(x=f"{dim}:Q")
+            tab.altair_chart(chart + here, use_container_width=True)
+
     # --- SAVE BUTTON ---
     if st.button("Calculate Roller Cost", key="btn_calc_roller_cost"):
         row = {
@@ -677,7 +529,11 @@ if st.session_state.selected_roller == "Flat Return Roller":
             "UNIT_CP": round(unit_cp, 2),
             "UNIT_PRICE": round(unit_price, 2),
             "TOTAL_PRICE": round(total_price, 2),
+            "FIXED COST": round(res["fixed_cost"], 2),   # what-if sweep reprices from this
+            "BEARING": bearing_sku,
         }
+        if not np.isnan(bearing_cost):
+            row["BEARING COST"] = round(float(bearing_cost), 2)
 
         # Optional: keep extra columns only for impact (won’t break others)
         if is_impact:
@@ -685,19 +541,23 @@ if st.session_state.selected_roller == "Flat Return Roller":
             row["RUBBER COST"] = round(float(rubber_cost), 2)
             row["SHAFT DIA (EFFECTIVE)"] = round(float(shaft_dia_eff), 2)
 
-        st.session_state.costings.append(row)
+        store.add_rollers(qid, [row])
         st.session_state.stage = "compiled"
         st.rerun()
+
           # ================== COMPILED ==================
 # ================== COMPILED (ONLY ONE BLOCK) ==================
+perf.stage("compiled")
 if st.session_state.stage == "compiled":
     st.subheader("Roller Costing")
 
-    if not st.session_state.costings:
+    lines = store.roller_lines(qid)
+
+    if not lines:
         st.warning("No roller costing saved yet. Go back and calculate.")
     else:
-        # --- editable table with delete checkbox ---
-        df = pd.DataFrame(st.session_state.costings).copy()
+        # --- editable table with delete checkbox (index = store line id) ---
+        df = pd.DataFrame([row for _, row in lines], index=[i for i, _ in lines])
         df.insert(0, "DELETE", False)
 
         edited = st.data_editor(
@@ -710,20 +570,28 @@ if st.session_state.stage == "compiled":
         # --- clean delete icon (right aligned) ---
         _, tool_col2 = st.columns([9, 1])
         if st.button("🗑", help="Delete selected rows", key="delete_selected_roller_rows"):
-            cleaned = edited[edited["DELETE"] == False].drop(columns=["DELETE"])
-            st.session_state.costings = cleaned.to_dict("records")
+            store.delete_rollers(qid, edited.index[edited["DELETE"] == True])
             st.rerun()
 
+        # --- running totals (maintained by the store on add / delete, no rescan) ---
+        summary = store.summary(qid)
+        t1, t2, t3 = st.columns(3)
+        t1.metric("Rollers", f"{summary['roller']['qty']:,.0f}")
+        t2.metric("Roller Weight (kg)", f"{summary['roller']['weight']:,.1f}")
+        t3.metric("Roller Total Price", f"{summary['roller']['total_price']:,.2f}")
+        with st.expander("Totals by roller type / belt width"):
+            st.dataframe(pd.DataFrame(store.totals(qid, "roller")).round(2), hide_index=True)
+
     r = st.session_state.selected_roller
 
-   if r in [
-    "Carrying Idler Without Frame",
-    "Impact Idler Without Frame",
-    "Flat Return Roller"
-]:
+    if r in [
+        "Carrying Idler Without Frame",
+        "Impact Idler Without Frame",
+        "Flat Return Roller"
+    ]:
         st.warning("Frame Not Applicable for this roller type.")
 
-    c1, c2, c3 = st.columns(3)
+    c1, c2, c3, c4, c5 = st.columns(5)
 
     if c1.button("Back", key="compiled_back_btn"):
         st.session_state.stage = "input"
@@ -739,25 +607,114 @@ if st.session_state.stage == "compiled":
     if c3.button("New Roller", key="compiled_new_btn"):
         st.session_state.stage = "select_roller"
         st.rerun()
+
+    if c4.button("What-if", key="compiled_sweep_btn", disabled=not lines):
+        st.session_state.stage = "sweep"
+        st.rerun()
+
+    if c5.button("Frame All Sets", key="compiled_frame_bulk_btn", disabled=not lines):
+        st.session_state.stage = "frame_bulk"
+        st.rerun()
+
+
+# ================== WHAT-IF SWEEP ==================
+# Reprices the whole saved quote over ranges of constants in one NumPy broadcast
+perf.stage("sweep")
+if st.session_state.stage == "sweep":
+    st.subheader("What-if Pricing")
+
+    base = {**DEFAULT_CONSTANTS, **st.session_state.constants}
+    exposure = quote_exposure(store.rollers(qid), store.frames(qid), base)
+    if exposure["estimated"]:
+        st.caption(f"{exposure['estimated']} older line(s) backed out of their unit cost with the current constants.")
+
+    swept = st.multiselect("Constants to sweep", SWEEP_KEYS, default=["STEEL_COST"], key="sweep_keys")
+
+    ranges = {}
+    for k in swept:
+        s1, s2, s3 = st.columns(3)
+        lo = s1.number_input(f"{k} low", value=float(base[k]) * 0.8, min_value=0.0, key=f"sweep_lo_{k}")
+        hi = s2.number_input(f"{k} high", value=float(base[k]) * 1.2, min_value=0.0, key=f"sweep_hi_{k}")
+        steps = s3.number_input(f"{k} steps", value=21, min_value=2, max_value=201, step=1, key=f"sweep_n_{k}")
+        ranges[k] = np.linspace(lo, hi, int(steps))
+
+    if ranges:
+        try:
+            grid = price_grid(exposure, base, ranges)
+        except ValueError as e:
+            st.error(str(e))
+            perf.finish()
+            st.stop()
+
+        total = grid["total"]
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Current Total", f"{sum(quote_totals(exposure, base)):,.2f}")
+        m2.metric("Scenarios", f"{total.size:,}")
+        m3.metric("Lowest Total", f"{total.min():,.2f}")
+        m4.metric("Highest Total", f"{total.max():,.2f}")
+
+        # --- tornado: one constant at a time, low/high vs current ---
+        st.markdown("### Sensitivity (Tornado)")
+        torn = pd.DataFrame(tornado(exposure, base, ranges))
+        bars = pd.concat([
+            torn.assign(END="LOW", TOTAL=torn["TOTAL AT LOW"]),
+            torn.assign(END="HIGH", TOTAL=torn["TOTAL AT HIGH"]),
+        ])
+        st.altair_chart(
+            alt.Chart(bars).mark_bar().encode(
+                y=alt.Y("CONSTANT:N", sort=list(torn["CONSTANT"]), title=None),
+                x=alt.X("TOTAL:Q", scale=alt.Scale(zero=False), title="Quote Total"),
+                x2="BASE TOTAL:Q",
+                color=alt.Color("END:N", title="Range End"),
+                tooltip=["CONSTANT", "END", "LOW", "HIGH", alt.Tooltip("TOTAL:Q", format=",.2f")],
+            ),
+            use_container_width=True,
+        )
+
+        # --- cost surface: two swept axes, the others at their current value ---
+        st.markdown("### Cost Surface")
+        names = list(ranges)
+        xk = st.selectbox("X axis", names, key="sweep_x")
+        if len(names) == 1:
+            surface = pd.DataFrame({xk: ranges[xk], "TOTAL": total})
+            st.altair_chart(
+                alt.Chart(surface).mark_line(point=True).encode(x=f"{xk}:Q", y=alt.Y("TOTAL:Q", scale=alt.Scale(zero=False))),
+                use_container_width=True,
+            )
+        else:
+            yk = st.selectbox("Y axis", [n for n in names if n != xk], key="sweep_y")
+            pick = tuple(
+                slice(None) if n in (xk, yk) else int(np.abs(ranges[n] - base[n]).argmin())
+                for n in names
+            )
+            plane = total[pick]
+            if names.index(xk) > names.index(yk):
+                plane = plane.T
+            xs, ys = np.meshgrid(ranges[xk], ranges[yk], indexing="ij")
+            surface = pd.DataFrame({xk: xs.ravel().round(3), yk: ys.ravel().round(3), "TOTAL": plane.ravel()})
+            st.altair_chart(
+                alt.Chart(surface).mark_rect().encode(
+                    x=f"{xk}:O", y=alt.Y(f"{yk}:O", sort="descending"), color="TOTAL:Q",
+                    tooltip=[xk, yk, alt.Tooltip("TOTAL:Q", format=",.2f")],
+                ),
+                use_container_width=True,
+            )
+            others = [n for n in names if n not in (xk, yk)]
+            if others:
+                st.caption("Other swept constants held at their current value: " + ", ".join(others))
+
+        st.download_button(
+            "Download Scenarios (CSV)",
+            lambda: grid_frame(grid).to_csv(index=False).encode("utf-8"),
+            f"quote_{qid}_whatif.csv",
+            mime="text/csv",
+        )
+
+    if st.button("Back", key="sweep_back_btn"):
+        st.session_state.stage = "compiled"
+        st.rerun()
 # ================== FRAME INPUT (FULL FIXED BLOCK) ==================
-# ================== ROLLER WT → FRAME BW MAP ==================
-ROLLER_WT_TO_BW = [
-    (0, 15, 650),
-    (15, 22, 800),
-    (22, 30, 1000),
-    (30, 38, 1200),
-    (38, 48, 1400),
-    (48, 60, 1600),
-    (60, 75, 1800),
-    (75, 10**9, 2000),
-]
-
-def get_frame_bw_from_roller_wt(roller_wt: float) -> int:
-    """Map roller weight (kg) to a belt width (mm)."""
-    for low, high, bw in ROLLER_WT_TO_BW:
-        if low <= roller_wt < high:
-            return bw
-    return 1000
+perf.stage("frame_input")
 if st.session_state.stage == "frame_input":
 
     st.subheader("Frame Costing")
@@ -767,12 +724,13 @@ if st.session_state.stage == "frame_input":
     c          = st.session_state.constants
 
     # --- Get last roller row safely ---
-    if not st.session_state.costings:
+    last_roller = store.last_roller(qid)
+
+    if last_roller is None:
         st.error("No roller costing found. Go back and calculate roller first.")
+        perf.finish()
         st.stop()
 
-    last_roller = st.session_state.costings[-1]
-
     # --- Get quantity & qty type safely ---
     set_qty  = int(last_roller.get("QTY", 1))
     qty_type = str(last_roller.get("QTY TYPE", "")).strip()
@@ -780,6 +738,7 @@ if st.session_state.stage == "frame_input":
     # ✅ FIX: Accept anything starting with SET
     if not qty_type.upper().startswith("SET"):
         st.error("Frame costing only applies when QTY TYPE is SET.")
+        perf.finish()
         st.stop()
 
     # --- Auto belt width selection ---
@@ -797,8 +756,7 @@ if st.session_state.stage == "frame_input":
         fab      = safe_get(SARI_FAB, bw, "SARI Fabrication Table")
 
     elif roller == "SARI (N-6012)":
-        if bw not in SARI_N_FRAME_WT:
-            bw = min(SARI_N_FRAME_WT.keys(), key=lambda k: abs(k-bw))
+        bw = FRAME_WT_INDEX["SARI_N"].nearest_key(bw)
         frame_wt = safe_get(SARI_N_FRAME_WT, bw, "SARI N Frame Weight")
         fab      = safe_get(SARI_N_FAB, bw, "SARI N Fabrication Table")
 
@@ -808,6 +766,7 @@ if st.session_state.stage == "frame_input":
 
     else:
         st.error("Frame not defined for this roller.")
+        perf.finish()
         st.stop()
 
     # --- Show reference tables ---
@@ -815,7 +774,7 @@ if st.session_state.stage == "frame_input":
     st.success(f"Selected Frame Weight = {frame_wt} kg")
 
     st.subheader("Fabrication Table (Editable)")
-    edited = st.data_editor(fab, use_container_width=True)
+    edited = st.data_editor(fab.copy(), use_container_width=True)   # copy-on-edit, shared table stays intact
 
     # --- Calculate frame weight from fabrication ---
     if "TOTAL WT" in edited.columns and not edited.empty:
@@ -823,25 +782,24 @@ if st.session_state.stage == "frame_input":
     else:
         total_frame_wt = frame_wt
 
-    # --- Frame costing ---
-    frame_unit_cost  = total_frame_wt*c["STEEL_COST"] + c["FRAME_RATE"] + c["WELDING_COST"]
-    frame_unit_price = frame_unit_cost * c["MARKUP"]
-
-    # ✅ IMPORTANT: Frame total price = SET QTY × UNIT PRICE
-    frame_total_price = frame_unit_price * set_qty
+    # --- Frame costing (memoized; total = SET QTY × UNIT PRICE) ---
+    fres = cached_cost_frame(roller, roller_wt, set_qty, c, frame_wt=total_frame_wt)
+    frame_unit_price  = fres["unit_price"]
+    frame_total_price = fres["total_price"]
 
     st.metric("Frame Unit Price", round(frame_unit_price,2))
     st.metric("Frame Total Price", round(frame_total_price,2))
 
     if st.button("Add Frame Cost"):
 
-        st.session_state.frame_costings.append({
+        store.add_frames(qid, [{
             "ROLLER": roller,
             "BELT WIDTH": bw,
+            "FRAME WT": round(total_frame_wt,3),
             "FRAME UNIT PRICE": round(frame_unit_price,2),
             "FRAME TOTAL PRICE": round(frame_total_price,2),
             "FRAME QTY (SET)": set_qty
-        })
+        }])
 
         st.session_state.stage = "frame_compiled"
         st.rerun()
@@ -852,17 +810,85 @@ if st.session_state.stage == "frame_input":
 
       
 
+# ================== BULK FRAMES ==================
+# One frame per SET line of a framed roller, priced in one cost_frames() pass
+# (belt width + frame weight straight from the precomputed frame matrix)
+perf.stage("frame_bulk")
+if st.session_state.stage == "frame_bulk":
+
+    st.subheader("Frame Costing (All SET Lines)")
+
+    framed = {row.get("ROLLER LINE") for row in store.frames(qid)}
+    sets = [
+        (i, row) for i, row in store.roller_lines(qid)
+        if str(row.get("QTY TYPE", "")).upper().startswith("SET")
+        and row.get("ROLLER") in FRAME_FAMILY
+        and i not in framed
+    ]
+
+    if not sets:
+        st.info("No unframed SET lines: every SET line of a framed roller already has a frame.")
+    else:
+        set_qty = np.array([int(row.get("QTY", 1)) for _, row in sets])
+        fres = cost_frames(
+            [row["ROLLER"] for _, row in sets], [float(row["WT"]) for _, row in sets], set_qty,
+            {**DEFAULT_CONSTANTS, **st.session_state.constants},
+        )
+        bulk = pd.DataFrame({
+            "ROLLER LINE": [i for i, _ in sets],
+            "ROLLER": [row["ROLLER"] for _, row in sets],
+            "BELT WIDTH": fres["belt_width"],
+            "FRAME WT": np.round(fres["frame_wt"], 3),
+            "FRAME UNIT PRICE": np.round(fres["unit_price"], 2),
+            "FRAME TOTAL PRICE": np.round(fres["total_price"], 2),
+            "FRAME QTY (SET)": set_qty,
+        })
+        st.dataframe(bulk, use_container_width=True, hide_index=True)
+
+        m1, m2 = st.columns(2)
+        m1.metric("Frames (sets)", f"{len(bulk)} ({int(set_qty.sum())})")
+        m2.metric("Frame Total Price", f"{bulk['FRAME TOTAL PRICE'].sum():,.2f}")
+
+        if st.button(f"Add {len(bulk)} Frame Lines", key="frame_bulk_add_btn"):
+            store.add_frames(qid, bulk.to_dict("records"))
+            st.session_state.stage = "frame_compiled"
+            st.rerun()
+
+    if st.button("Back", key="frame_bulk_back_btn"):
+        st.session_state.stage = "compiled"
+        st.rerun()
+
+
 # ================== FRAME COMPILED (FULL FIXED BLOCK) ==================
+perf.stage("frame_compiled")
 if st.session_state.stage == "frame_compiled":
     st.subheader("Frame Costing Table")
-    st.dataframe(pd.DataFrame(st.session_state.frame_costings), use_container_width=True)
 
-    if st.session_state.costings and st.session_state.frame_costings:
-        last_roller = st.session_state.costings[-1]
-        last_frame  = st.session_state.frame_costings[-1]
+    frame_lines = store.frame_lines(qid)
+    if frame_lines:
+        # --- editable table with delete checkbox (index = store line id) ---
+        fdf = pd.DataFrame([row for _, row in frame_lines], index=[i for i, _ in frame_lines])
+        fdf.insert(0, "DELETE", False)
 
-        roller_total = float(last_roller.get("TOTAL_PRICE", 0))
-        frame_total  = float(last_frame.get("FRAME TOTAL PRICE", 0))
+        fedited = st.data_editor(
+            fdf,
+            use_container_width=True,
+            hide_index=True,
+            key="frame_costing_editor",
+        )
+
+        _, ftool_col2 = st.columns([9, 1])
+        if ftool_col2.button("🗑", help="Delete selected frame rows", key="delete_selected_frame_rows"):
+            store.delete_frames(qid, fedited.index[fedited["DELETE"] == True])
+            st.rerun()
+
+    summary = store.summary(qid)
+
+    if summary["roller"]["lines"] and summary["frame"]["lines"]:
+
+        # whole quote, from the store's running totals
+        roller_total = summary["roller"]["total_price"]
+        frame_total  = summary["frame"]["total_price"]
 
         st.markdown("### Total Cost (Roller + Frame)")
         total_df = pd.DataFrame([{
@@ -871,6 +897,8 @@ if st.session_state.stage == "frame_compiled":
             "TOTAL (ROLLER + FRAME)": round(roller_total + frame_total, 2),
         }])
         st.dataframe(total_df, use_container_width=True)
+        with st.expander("Totals by roller type / belt width"):
+            st.dataframe(pd.DataFrame(store.totals(qid)).round(2), hide_index=True)
 
     st.markdown("---")
     c1, c2 = st.columns(2)
@@ -883,21 +911,35 @@ if st.session_state.stage == "frame_compiled":
         st.session_state.stage = "select_roller"
         st.rerun()
 # ================== DOWNLOAD ==================
-if st.session_state.costings:
-
-    buf=BytesIO()
-
-    with pd.ExcelWriter(buf,engine="xlsxwriter") as w:
-        pd.DataFrame(st.session_state.costings).to_excel(w,index=False)
-
-    st.download_button("Download Roller",buf.getvalue(),"roller.xlsx")
-
-
-if st.session_state.frame_costings:
-
-    buf=BytesIO()
-
-    with pd.ExcelWriter(buf,engine="xlsxwriter") as w:
-        pd.DataFrame(st.session_state.frame_costings).to_excel(w,index=False)
-
-    st.download_button("Download Frame",buf.getvalue(),"frame.xlsx")
+# Workbooks (rollers, frames, totals, material takeoff) are built on the shared
+# export pool (cadai_jobs), which reads the lines itself; this rerun only
+# queues the quote id and shows the job's status
+perf.mark("download")
+if "export_owner" not in st.session_state:
+    st.session_state.export_owner = new_quote_id()
+roller_lines, frame_lines = store.count(qid)
+if roller_lines or frame_lines:
+    st.markdown("---")
+    e1, e2, e3 = st.columns(3)
+    export = None
+    if e1.button("Export Quote", key="export_quote_btn"):
+        export = ("quote", f"quote_{qid}.xlsx")
+    if e2.button("Export Rollers", key="export_rollers_btn", disabled=not roller_lines):
+        export = ("rollers", f"quote_{qid}_rollers.xlsx")
+    if e3.button("Export Frames", key="export_frames_btn", disabled=not frame_lines):
+        export = ("frames", f"quote_{qid}_frames.xlsx")
+    if export:
+        kind, file_name = export
+        try:
+            get_job_queue().submit(st.session_state.export_owner, kind, store, qid, file_name)
+        except QueueFull as e:
+            st.warning(str(e))
+render_jobs(st, st.session_state.export_owner)
+
+# ================== DIAGNOSTICS ==================
+if st.query_params.get("diag") == "1":
+    perf.mark("diagnostics")
+    render_sidebar(st, perf)
+    st.sidebar.markdown("**Costing caches**")
+    st.sidebar.dataframe(memo_stats(), hide_index=True)
+perf.finish()
@@ -1,118 +1,274 @@
 # carrying_idler_cost_fixed.py
+#
+# Interactive:  python CARRYINGIDLERWITHOUTFRAME.py
+# Batch:        python CARRYINGIDLERWITHOUTFRAME.py --batch specs.csv --output costed.csv
+#               (CSV or JSONL in/out, "-" for stdin/stdout; format taken from the extension or --in-format/--out-format)
+import argparse
+import csv
+import itertools
+import json
 import math
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from cadai_costing import CARRYING, cost_roller, cost_rollers
+from cadai_pricebook import default_constants
 
 # ---------------------------
 # CONFIGURABLE CONSTANTS
 # ---------------------------
+# Rates come from the price book (pricebook.toml / $CADAI_PRICEBOOK)
+_RATES = default_constants()
+
 BELT_WIDTH = 1000             # mm (fixed by spec)
-STEEL_COST_PER_KG = 70.0      # ₹ per kg (change to your company rate)
-BEARING_COST_PAIR = 100.0     # ₹
-SEAL_COST = 30.0              # ₹
-WELDING_COST = 80.0           # ₹
-MARKUP = 1.25                 # multiplier
+STEEL_COST_PER_KG = _RATES["STEEL_COST"]         # ₹ per kg
+BEARING_COST_PAIR = _RATES["BEARING_COST_PAIR"]  # ₹
+SEAL_COST = _RATES["SEAL_COST"]                  # ₹
+WELDING_COST = _RATES["WELDING_COST"]            # ₹
+MARKUP = _RATES["MARKUP"]                        # multiplier
 
 STEEL_DENSITY = 7850.0        # kg/m^3 (steel density)
 
-# ---------------------------
-# UTILITY - units: mm -> m
-# ---------------------------
-def mm_to_m(x_mm):
-    return x_mm / 1000.0
+CONSTANTS = {
+    "STEEL_COST": STEEL_COST_PER_KG,
+    "BEARING_COST_PAIR": BEARING_COST_PAIR,
+    "SEAL_COST": SEAL_COST,
+    "WELDING_COST": WELDING_COST,
+    "MARKUP": MARKUP,
+}
 
-# ---------------------------
-# INPUT (you enter X values)
-# ---------------------------
-print("=== CARRYING IDLER WITHOUT FRAME - COST CALCULATOR ===")
-pipe_diameter_mm = float(input("Enter Pipe Diameter (mm): ").strip())
-face_width_mm = float(input("Enter Face Width (mm): ").strip())
-shaft_diameter_mm = float(input("Enter Shaft Diameter (mm): ").strip())
-shaft_length_mm = float(input("Enter Shaft Length (mm): ").strip())
-pipe_thickness_mm = float(input("Enter Pipe Thickness (mm): ").strip())
-qty = int(input("Enter Quantity: ").strip())
+# Batch input columns (same order as the interactive prompts) and output columns
+SPEC_FIELDS = [
+    "pipe_diameter_mm", "face_width_mm", "shaft_diameter_mm",
+    "shaft_length_mm", "pipe_thickness_mm", "qty",
+]
+RESULT_FIELDS = [
+    "shaft_diameter_used_mm", "pipe_weight_kg", "shaft_weight_kg", "total_weight_kg",
+    "total_cost_per_roller", "cost_price_for_qty", "unit_selling_price", "total_selling_price",
+]
+CHUNK_SIZE = 10000
 
-# ---------------------------
-# RULE: make shaft even by adding 3 if odd (as given)
-# Use robust integer logic
-# ---------------------------
-shaft_dia_int = int(round(shaft_diameter_mm))
-if shaft_dia_int % 2 != 0:
-    shaft_dia_int += 3  # add 3 to make it even as per rule
-shaft_diameter_mm = float(shaft_dia_int)
 
-# ---------------------------
-# WEIGHT CALCULATIONS (accurate geometry)
-# - Pipe: approximate as hollow cylinder (outer dia D, thickness t, length = face_width)
-#   Volume = pi * ( (D/2)^2 - (D/2 - t)^2 ) * L
-# - Shaft: solid cylinder: Volume = pi * (d/2)^2 * L
-# Units: convert mm -> m for volume (m^3), multiply by density to get kg
-# ---------------------------
-# Convert to meters
-D_m = mm_to_m(pipe_diameter_mm)
-t_m = mm_to_m(pipe_thickness_mm)
-L_m = mm_to_m(face_width_mm)       # pipe length = face width (as per your formula)
-d_shaft_m = mm_to_m(shaft_diameter_mm)
-L_shaft_m = mm_to_m(shaft_length_mm)
-
-# Pipe (hollow cylinder) volume and mass
-outer_area = math.pi * (D_m / 2.0) ** 2
-inner_radius = (D_m / 2.0) - t_m
-if inner_radius < 0:
-    inner_area = 0.0
-else:
-    inner_area = math.pi * (inner_radius) ** 2
-pipe_volume_m3 = max(0.0, (outer_area - inner_area) * L_m)
-pipe_weight_kg = pipe_volume_m3 * STEEL_DENSITY
-
-# Shaft (solid cylinder) volume and mass
-shaft_volume_m3 = math.pi * (d_shaft_m / 2.0) ** 2 * L_shaft_m
-shaft_weight_kg = shaft_volume_m3 * STEEL_DENSITY
-
-total_weight_kg = pipe_weight_kg + shaft_weight_kg
+def interactive():
+    """Ask for one roller with input() and print the detailed breakdown."""
+    # ---------------------------
+    # INPUT (you enter X values)
+    # ---------------------------
+    print("=== CARRYING IDLER WITHOUT FRAME - COST CALCULATOR ===")
+    pipe_diameter_mm = float(input("Enter Pipe Diameter (mm): ").strip())
+    face_width_mm = float(input("Enter Face Width (mm): ").strip())
+    shaft_diameter_mm = float(input("Enter Shaft Diameter (mm): ").strip())
+    shaft_length_mm = float(input("Enter Shaft Length (mm): ").strip())
+    pipe_thickness_mm = float(input("Enter Pipe Thickness (mm): ").strip())
+    qty = int(input("Enter Quantity: ").strip())
 
-# ---------------------------
-# COST ELEMENTS
-# ---------------------------
-housing_cost = pipe_diameter_mm / 2.0           # as per your rule (₹)
-material_cost = total_weight_kg * STEEL_COST_PER_KG
-bearing_cost = BEARING_COST_PAIR
-seal_cost = SEAL_COST
-welding_cost = WELDING_COST
+    # ---------------------------
+    # COSTING (shared engine)
+    # - Shaft rule: make shaft even by adding 3 if odd (as given)
+    # - Pipe: hollow cylinder (outer dia D, thickness t, length = face_width)
+    #   Volume = pi * ( (D/2)^2 - (D/2 - t)^2 ) * L
+    # - Shaft: solid cylinder: Volume = pi * (d/2)^2 * L
+    # ---------------------------
+    res = cost_roller(
+        pipe_diameter_mm, pipe_thickness_mm, face_width_mm, shaft_diameter_mm, shaft_length_mm,
+        CARRYING, qty, CONSTANTS,
+        geometry="hollow", density=STEEL_DENSITY, odd_shaft_rule="all",
+    )
+
+    shaft_diameter_mm = res["shaft_dia"]
+    pipe_weight_kg = res["pipe_wt"]
+    shaft_weight_kg = res["shaft_wt"]
+    pipe_volume_m3 = pipe_weight_kg / STEEL_DENSITY
+    shaft_volume_m3 = shaft_weight_kg / STEEL_DENSITY
+    total_weight_kg = res["weight"]
+
+    # ---------------------------
+    # COST ELEMENTS
+    # ---------------------------
+    housing_cost = res["housing_cost"]              # as per your rule (₹)
+    material_cost = total_weight_kg * STEEL_COST_PER_KG
+    bearing_cost = BEARING_COST_PAIR
+    seal_cost = SEAL_COST
+    welding_cost = WELDING_COST
+
+    total_cost_per_roller = res["unit_cp"]
+    cost_price_for_qty = total_cost_per_roller * qty
+    unit_selling_price = res["unit_price"]
+    total_selling_price = res["total_price"]
+
+    # ---------------------------
+    # OUTPUT (detailed breakdown)
+    # ---------------------------
+    print("\n===== DETAILED BREAKDOWN =====")
+    print(f"Input summary:")
+    print(f"  Pipe Dia (mm):       {pipe_diameter_mm}")
+    print(f"  Face Width (mm):     {face_width_mm}")
+    print(f"  Pipe Thickness (mm): {pipe_thickness_mm}")
+    print(f"  Shaft Dia (mm) used: {shaft_diameter_mm}  (rounded rule applied)")
+    print(f"  Shaft Length (mm):   {shaft_length_mm}")
+    print(f"  Quantity:            {qty}")
+
+    print("\nWeight calculations:")
+    print(f"  Pipe volume (m^3):   {pipe_volume_m3:.8f}")
+    print(f"  Pipe weight (kg):    {pipe_weight_kg:.4f}")
+    print(f"  Shaft volume (m^3):  {shaft_volume_m3:.8f}")
+    print(f"  Shaft weight (kg):   {shaft_weight_kg:.4f}")
+    print(f"  Total weight (kg):   {total_weight_kg:.4f}")
+
+    print("\nCost elements (change constants at top if needed):")
+    print(f"  Steel cost (@{STEEL_COST_PER_KG} ₹/kg):  {material_cost:.2f} ₹")
+    print(f"  Housing cost:        {housing_cost:.2f} ₹")
+    print(f"  Bearing cost (pair): {bearing_cost:.2f} ₹")
+    print(f"  Seal cost:           {seal_cost:.2f} ₹")
+    print(f"  Welding cost:        {welding_cost:.2f} ₹")
+
+    print("\nTotals:")
+    print(f"  Total cost per roller (₹)  : {total_cost_per_roller:.2f}")
+    print(f"  Cost price for {qty} pcs   : {cost_price_for_qty:.2f}")
+    print(f"  Unit selling price (₹)     : {unit_selling_price:.2f}  (markup {MARKUP*100-100:.0f}%)")
+    print(f"  Total selling price (₹)    : {total_selling_price:.2f}")
+
+    print("\n===== END =====")
 
-total_cost_per_roller = material_cost + housing_cost + bearing_cost + seal_cost + welding_cost
-cost_price_for_qty = total_cost_per_roller * qty
-unit_selling_price = total_cost_per_roller * MARKUP
-total_selling_price = unit_selling_price * qty
 
 # ---------------------------
-# OUTPUT (detailed breakdown)
+# BATCH / STREAMING MODE
+# Every stage is a generator, so memory stays flat whatever the file size:
+#   read_specs -> chunked -> cost_chunks -> write_rows
 # ---------------------------
-print("\n===== DETAILED BREAKDOWN =====")
-print(f"Input summary:")
-print(f"  Pipe Dia (mm):       {pipe_diameter_mm}")
-print(f"  Face Width (mm):     {face_width_mm}")
-print(f"  Pipe Thickness (mm): {pipe_thickness_mm}")
-print(f"  Shaft Dia (mm) used: {shaft_diameter_mm}  (rounded rule applied)")
-print(f"  Shaft Length (mm):   {shaft_length_mm}")
-print(f"  Quantity:            {qty}")
-
-print("\nWeight calculations:")
-print(f"  Pipe volume (m^3):   {pipe_volume_m3:.8f}")
-print(f"  Pipe weight (kg):    {pipe_weight_kg:.4f}")
-print(f"  Shaft volume (m^3):  {shaft_volume_m3:.8f}")
-print(f"  Shaft weight (kg):   {shaft_weight_kg:.4f}")
-print(f"  Total weight (kg):   {total_weight_kg:.4f}")
-
-print("\nCost elements (change constants at top if needed):")
-print(f"  Steel cost (@{STEEL_COST_PER_KG} ₹/kg):  {material_cost:.2f} ₹")
-print(f"  Housing cost:        {housing_cost:.2f} ₹")
-print(f"  Bearing cost (pair): {bearing_cost:.2f} ₹")
-print(f"  Seal cost:           {seal_cost:.2f} ₹")
-print(f"  Welding cost:        {welding_cost:.2f} ₹")
-
-print("\nTotals:")
-print(f"  Total cost per roller (₹)  : {total_cost_per_roller:.2f}")
-print(f"  Cost price for {qty} pcs   : {cost_price_for_qty:.2f}")
-print(f"  Unit selling price (₹)     : {unit_selling_price:.2f}  (markup {MARKUP*100-100:.0f}%)")
-print(f"  Total selling price (₹)    : {total_selling_price:.2f}")
-
-print("\n===== END =====")
\ No newline at end of file
+def _format_of(path, fmt):
+    if fmt:
+        return fmt
+    return "jsonl" if str(path).lower().endswith((".jsonl", ".json")) else "csv"
+
+
+def check_spec(spec):
+    """Raise ValueError unless every dimension is finite and > 0 and qty is a whole number >= 1."""
+    for k in SPEC_FIELDS:
+        if not math.isfinite(spec[k]) or spec[k] <= 0:
+            raise ValueError(f"{k} must be a finite number > 0, got {spec[k]!r}")
+    if not spec["qty"].is_integer():
+        raise ValueError(f"qty must be a whole number, got {spec['qty']!r}")
+
+
+def read_specs(stream, fmt, rejects, errors=sys.stderr):
+    """Yield a spec dict per input row; bad rows go to `errors` with their line number and are counted in rejects["rows"]."""
+    if fmt == "jsonl":
+        records = ((n, line) for n, line in enumerate(stream, start=1) if line.strip())
+    else:
+        records = enumerate(csv.DictReader(stream), start=2)
+
+    for line_no, rec in records:
+        try:
+            if fmt == "jsonl":
+                rec = json.loads(rec)
+            spec = {k: float(rec[k]) for k in SPEC_FIELDS}
+            check_spec(spec)
+            spec["qty"] = int(spec["qty"])
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as exc:
+            rejects["rows"] += 1
+            print(f"line {line_no}: skipped ({exc!r})", file=errors)
+            continue
+        yield spec
+
+
+def chunked(iterable, size):
+    """Yield lists of at most `size` items."""
+    it = iter(iterable)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def cost_chunks(chunks):
+    """Cost each chunk in one vectorized engine call; yield costed row dicts."""
+    for chunk in chunks:
+        cols = {k: np.fromiter((spec[k] for spec in chunk), dtype=float, count=len(chunk)) for k in SPEC_FIELDS}
+        res = cost_rollers(
+            cols["pipe_diameter_mm"], cols["pipe_thickness_mm"], cols["face_width_mm"],
+            cols["shaft_diameter_mm"], cols["shaft_length_mm"], CARRYING, cols["qty"], CONSTANTS,
+            geometry="hollow", density=STEEL_DENSITY, odd_shaft_rule="all",
+        )
+        out = {
+            "shaft_diameter_used_mm": res["shaft_dia"],
+            "pipe_weight_kg": np.round(res["pipe_wt"], 4),
+            "shaft_weight_kg": np.round(res["shaft_wt"], 4),
+            "total_weight_kg": np.round(res["weight"], 4),
+            "total_cost_per_roller": np.round(res["unit_cp"], 2),
+            "cost_price_for_qty": np.round(res["unit_cp"] * cols["qty"], 2),
+            "unit_selling_price": np.round(res["unit_price"], 2),
+            "total_selling_price": np.round(res["total_price"], 2),
+        }
+        out = {k: v.tolist() for k, v in out.items()}
+        for i, spec in enumerate(chunk):
+            row = dict(spec)
+            row.update((k, out[k][i]) for k in RESULT_FIELDS)
+            yield row
+
+
+def write_rows(rows, stream, fmt):
+    """Write rows as they arrive; returns the number written."""
+    n = 0
+    if fmt == "jsonl":
+        for row in rows:
+            stream.write(json.dumps(row) + "\n")
+            n += 1
+    else:
+        writer = csv.DictWriter(stream, fieldnames=SPEC_FIELDS + RESULT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            n += 1
+    return n
+
+
+def run_batch(src, dst, in_fmt=None, out_fmt=None, chunk_size=CHUNK_SIZE, errors="-"):
+    """Stream specs from src to costed rows in dst ("-" = stdin/stdout, errors "-" = stderr).
+
+    Returns (rows, rejects, seconds).
+    """
+    in_fmt = _format_of(src, in_fmt)
+    out_fmt = _format_of(dst, out_fmt)
+    fin = sys.stdin if src == "-" else open(src, newline="", encoding="utf-8")
+    fout = sys.stdout if dst == "-" else open(dst, "w", newline="", encoding="utf-8")
+    ferr = sys.stderr if errors == "-" else open(errors, "w", encoding="utf-8")
+    rejects = Counter()
+    start = time.perf_counter()
+    try:
+        specs = read_specs(fin, in_fmt, rejects, ferr)
+        n = write_rows(cost_chunks(chunked(specs, chunk_size)), fout, out_fmt)
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+        if ferr is not sys.stderr:
+            ferr.close()
+    return n, rejects["rows"], time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carrying idler (without frame) cost calculator")
+    parser.add_argument("--batch", metavar="INPUT", help="CSV/JSONL of roller specs, '-' for stdin")
+    parser.add_argument("--output", metavar="OUTPUT", default="-", help="costed CSV/JSONL, '-' for stdout (default)")
+    parser.add_argument("--in-format", choices=["csv", "jsonl"])
+    parser.add_argument("--out-format", choices=["csv", "jsonl"])
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--errors", metavar="PATH", default="-", help="rejected rows by line number, '-' for stderr (default)")
+    args = parser.parse_args(argv)
+
+    if not args.batch:
+        interactive()
+        return
+
+    n, rejected, secs = run_batch(
+        args.batch, args.output, args.in_format, args.out_format, args.chunk_size, args.errors,
+    )
+    rate = n / secs if secs > 0 else float("inf")
+    print(f"costed {n} rows ({rejected} rejected) in {secs:.2f} s — {rate:,.0f} rows/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# bench_app.py
+# End-to-end script rerun time of each CADAI.PY/cadai_web.py stage (streamlit.testing AppTest).
+# Run through benchmarks/run.py.
+#
+# Each param drives a fresh AppTest to one stage (untimed), then times a plain
+# rerun of that stage. The quote is pre-seeded with SEED_LINES roller lines (and
+# their frames) so the compiled / frame stages render a realistic quote.
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# the app must open a throwaway quote DB, not the real one
+os.environ["CADAI_DB"] = os.path.join(tempfile.mkdtemp(prefix="cadai_bench_"), "quotes.db")
+
+from streamlit.testing.v1 import AppTest
+
+from cadai_api import price_batch
+from cadai_store import get_store, new_quote_id
+
+APP = os.path.join(ROOT, "CADAI.PY", "cadai_web.py")
+SEED_LINES = 500
+ROLLER = "Carrying Idler With Frame"
+STAGES = ["select_roller", "ask_constants", "constants", "input", "compiled", "frame_input", "frame_compiled", "frame_bulk",
+          "bulk_import"]
+
+
+def _seed_quote():
+    line = {"ROLLER": ROLLER, "PIPE DIA": 89, "PIPE THK": 3.2, "FACE WIDTH": 380, "SHAFT DIA": 25,
+            "QTY": 10, "QTY TYPE": "SET (1 Frame)"}
+    res = price_batch({"rollers": [line] * SEED_LINES, "frames": "auto"})
+    qid = new_quote_id()
+    store = get_store()
+    store.add_rollers(qid, res["rollers"]["lines"])
+    store.add_frames(qid, res["frames"]["lines"])
+    return qid
+
+
+def _click(at, label=None, key=None):
+    btn = at.button(key=key) if key else next(b for b in at.button if b.label == label)
+    return btn.click().run()
+
+
+def _goto(stage):
+    """Fresh AppTest sitting at `stage`."""
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.query_params["quote"] = _seed_quote()
+    at.run()
+    if stage == "select_roller":
+        return at
+    if stage == "bulk_import":
+        return _click(at, key="btn_bulk_import")
+
+    at.selectbox[0].set_value(ROLLER).run()
+    _click(at, "Proceed")
+    if stage == "ask_constants":
+        return at
+    if stage == "constants":
+        return _click(at, "YES")
+
+    _click(at, "NO")
+    if stage == "input":
+        return at
+
+    at.radio(key="qty_type_radio").set_value("SET (1 Frame)").run()
+    _click(at, key="btn_calc_roller_cost")
+    if stage == "compiled":
+        return at
+    if stage == "frame_bulk":
+        return _click(at, key="compiled_frame_bulk_btn")
+
+    _click(at, key="compiled_frame_btn")
+    if stage == "frame_input":
+        return at
+
+    return _click(at, "Add Frame Cost")
+
+
+def _setup(stage):
+    at = _goto(stage)
+    if at.session_state.stage != stage or at.exception:
+        raise RuntimeError(f"could not reach stage {stage}: at {at.session_state.stage}, {[e.value for e in at.exception]}")
+    return at
+
+
+def time_stage_rerun(at):
+    at.run()
+
+
+time_stage_rerun.params = STAGES
+time_stage_rerun.setup = _setup
@@ -0,0 +1,111 @@
+# bench_costing.py
+# Costing kernels: scalar vs batch roller weight/cost, batch frame cost, the
+# cheapest-design search and the precomputed price surface.
+# Run through benchmarks/run.py.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from cadai_costing import DEFAULT_CONSTANTS, ROLLER_TYPES, cost_frames, cost_roller, cost_rollers, pipe_weight, shaft_weight
+from cadai_design import solve
+from cadai_lookup import FRAME_FAMILY
+from cadai_surface import DIMENSIONS, PriceSurface, get_surface
+
+SIZES = [1_000, 100_000]
+
+
+def _specs(n):
+    rng = np.random.default_rng(0)
+    face = rng.uniform(200, 900, n)
+    return {
+        "pipe_dia": rng.choice([89.0, 114.3, 127.0, 152.4], n),
+        "pipe_thk": rng.choice([3.2, 3.6, 4.5], n),
+        "face_width": face,
+        "shaft_dia": rng.choice([20.0, 25.0, 30.0, 35.0], n),
+        "shaft_len": face + 60,
+        "roller_type": rng.choice(ROLLER_TYPES, n),
+        "qty": rng.integers(1, 50, n).astype(float),
+    }
+
+
+# ================== WEIGHTS ==================
+def time_weight_scalar():
+    pipe_weight(89, 3.2, 380) + shaft_weight(25, 440)
+
+
+def time_weight_batch(s):
+    pipe_weight(s["pipe_dia"], s["pipe_thk"], s["face_width"]) + shaft_weight(s["shaft_dia"], s["shaft_len"])
+
+
+time_weight_batch.params = SIZES
+time_weight_batch.setup = _specs
+
+
+# ================== ROLLER COST ==================
+def time_cost_roller_scalar():
+    cost_roller(89, 3.2, 380, 25, 440, "Impact Idler Without Frame", 10, DEFAULT_CONSTANTS)
+
+
+def time_cost_rollers_loop(s):
+    """The pre-engine way: one scalar call per line (1k lines only)."""
+    for i in range(len(s["qty"])):
+        cost_roller(s["pipe_dia"][i], s["pipe_thk"][i], s["face_width"][i], s["shaft_dia"][i],
+                    s["shaft_len"][i], s["roller_type"][i], s["qty"][i], DEFAULT_CONSTANTS)
+
+
+time_cost_rollers_loop.params = [1_000]
+time_cost_rollers_loop.setup = _specs
+
+
+def time_cost_rollers_batch(s):
+    cost_rollers(constants=DEFAULT_CONSTANTS, **s)
+
+
+time_cost_rollers_batch.params = SIZES
+time_cost_rollers_batch.setup = _specs
+
+
+# ================== FRAME COST ==================
+def _frame_specs(n):
+    rng = np.random.default_rng(0)
+    return (
+        rng.choice(list(FRAME_FAMILY), n),
+        rng.uniform(1.0, 80.0, n),
+        rng.integers(1, 20, n),
+    )
+
+
+def time_cost_frames_batch(s):
+    cost_frames(*s, DEFAULT_CONSTANTS)
+
+
+time_cost_frames_batch.params = SIZES
+time_cost_frames_batch.setup = _frame_specs
+
+
+# ================== DESIGN SEARCH ==================
+def time_design_solve(load_kn):
+    solve(1000, load_kn)
+
+
+time_design_solve.params = [5.0, 20.0]
+
+
+# ================== PRICE SURFACE ==================
+_POINT = {"PIPE DIA": 89.0, "PIPE THK": 3.2, "FACE WIDTH": 380.0, "SHAFT DIA": 25.0, "SHAFT LENGTH": 440.0}
+
+
+def time_surface_build():
+    PriceSurface(ROLLER_TYPES[0], DEFAULT_CONSTANTS)
+
+
+def time_surface_profiles(surface):
+    for dim in DIMENSIONS:
+        surface.profile(dim, _POINT)
+
+
+time_surface_profiles.setup = lambda _: get_surface(ROLLER_TYPES[0], DEFAULT_CONSTANTS)
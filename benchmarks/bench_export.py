@@ -0,0 +1,173 @@
+# bench_export.py
+# Quote export benchmark: streamed constant-memory workbook vs. DataFrame + in-memory workbook.
+#
+#   python benchmarks/bench_export.py                 # 10k / 50k rows
+#   python benchmarks/bench_export.py --rows 100000
+#
+# time_* functions (100 / 10k / 100k rows) are picked up by benchmarks/run.py.
+#
+# Reports seconds and peak Python heap (tracemalloc, MB) per 10k roller rows
+# (plus a third as many frame rows).
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+import pandas as pd
+
+from cadai_export import FRAME_COLUMNS, ROLLER_COLUMNS, write_quote_workbook
+from cadai_jobs import PENDING, JobQueue
+from cadai_store import QuoteStore
+
+ROLLERS = ["Carrying Idler With Frame", "Impact Idler Without Frame", "Flat Return Roller", "SARI"]
+
+
+def roller_rows(n):
+    """Synthetic costing rows, generated lazily."""
+    for i in range(n):
+        yield {
+            "LINE": i + 1,
+            "ROLLER": ROLLERS[i % len(ROLLERS)],
+            "WT": 1.5 + (i % 50) * 0.1,
+            "QTY": 1 + i % 20,
+            "QTY TYPE": "SINGLE ROLLER",
+            "ROLLER QTY": 1 + i % 20,
+            "UNIT_CP": 400.0 + i % 97,
+            "UNIT_PRICE": 500.0 + i % 97,
+            "TOTAL_PRICE": (500.0 + i % 97) * (1 + i % 20),
+            "BEARING": ["6204", "6205", "6306"][i % 3],
+            "BEARING COST": 120.0 + i % 3 * 40,
+            "FIXED COST": 85.0,
+        }
+
+
+def frame_rows(n):
+    for i in range(n):
+        yield {
+            "ROLLER LINE": 4 * i + 1,
+            "ROLLER": "Carrying Idler With Frame",
+            "BELT WIDTH": [650, 800, 1000, 1200][i % 4],
+            "FRAME WT": 20.0 + i % 4 * 2.5,
+            "FRAME UNIT PRICE": 1500.0,
+            "FRAME TOTAL PRICE": 1500.0 * (1 + i % 5),
+            "FRAME QTY (SET)": 1 + i % 5,
+        }
+
+
+def _measure(fn):
+    """(seconds, peak MB): timed on a clean run, memory on a second, traced run."""
+    t0 = time.perf_counter()
+    fn()
+    secs = time.perf_counter() - t0
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return secs, peak / 2**20
+
+
+def streamed(n):
+    with tempfile.TemporaryFile() as fh:
+        write_quote_workbook(fh, roller_rows(n), frame_rows(n // 3))
+
+
+def materialized(n):
+    buf = BytesIO()
+    with pd.ExcelWriter(buf, engine="xlsxwriter") as w:
+        pd.DataFrame(list(roller_rows(n))).to_excel(w, index=False, sheet_name="ROLLERS")
+        pd.DataFrame(list(frame_rows(n // 3))).to_excel(w, index=False, sheet_name="FRAMES")
+
+
+def roundtrip(n=50):
+    """Read a streamed workbook back: every exported column comes out as written."""
+    rollers, frames = list(roller_rows(n)), list(frame_rows(n))
+    buf = BytesIO()
+    write_quote_workbook(buf, rollers, frames)
+    wb = openpyxl.load_workbook(buf, read_only=True)
+    for sheet, columns, rows in (("ROLLERS", ROLLER_COLUMNS, rollers), ("FRAMES", FRAME_COLUMNS, frames)):
+        header, *back = wb[sheet].iter_rows(values_only=True)
+        assert list(header) == columns, f"{sheet}: columns {header}"
+        for row, cells in zip(rows, back, strict=True):
+            for col, got in zip(columns, cells):
+                want = row.get(col)
+                assert got == want or isinstance(want, float) and abs(got - want) < 1e-9, f"{sheet}: {col} {got!r} != {want!r}"
+    wb.close()
+
+
+def rebuild_after_edit():
+    """Delete the last line and add a different one (same id, same count): the export is rebuilt."""
+    store = QuoteStore(os.path.join(tempfile.mkdtemp(prefix="cadai_bench_"), "quotes.db"))
+    queue = JobQueue(workers=1)
+    rows = list(roller_rows(3))
+
+    def export():
+        job = queue.submit("bench", "rollers", store, "q")
+        while job.status in PENDING:
+            time.sleep(0.01)
+        assert job.status == "done", job.error
+        wb = openpyxl.load_workbook(BytesIO(job.data), read_only=True)
+        last = list(wb["ROLLERS"].iter_rows(values_only=True))[-1]
+        wb.close()
+        return job, last
+
+    store.add_rollers("q", rows)
+    first, _ = export()
+    line, _ = store.roller_lines("q")[-1]
+    store.delete_rollers("q", [line])
+    store.add_rollers("q", [{**rows[-1], "ROLLER": "SARI", "TOTAL_PRICE": 1.0}])
+    assert store.roller_lines("q")[-1][0] == line, "SQLite did not reuse the id; check is moot"
+    second, last = export()
+    assert second is not first, "stale export job reused after delete + add"
+    assert last[ROLLER_COLUMNS.index("ROLLER")] == "SARI", f"workbook not rebuilt: {last}"
+
+
+# ================== SUITE ==================
+EXPORT_SIZES = [100, 10_000, 100_000]
+
+
+def time_export_streamed(n):
+    streamed(n)
+
+
+def time_export_dataframe(n):
+    materialized(n)
+
+
+for _fn in (time_export_streamed, time_export_dataframe):
+    _fn.params = EXPORT_SIZES
+    _fn.repeat = 3
+
+
+def run(sizes):
+    results = []
+    for n in sizes:
+        for name, fn in (("streamed", streamed), ("dataframe", materialized)):
+            secs, mb = _measure(lambda: fn(n))
+            results.append({"writer": name, "rows": n, "seconds": secs, "peak_mb": mb,
+                            "seconds_per_10k": secs / n * 10_000, "mb_per_10k": mb / n * 10_000})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000])
+    args = parser.parse_args(argv)
+
+    roundtrip()
+    rebuild_after_edit()
+    print(f"{'writer':<10} {'rows':>8} {'seconds':>9} {'peak MB':>9} {'s/10k':>7} {'MB/10k':>8}")
+    for r in run(args.rows):
+        print(f"{r['writer']:<10} {r['rows']:>8} {r['seconds']:>9.2f} {r['peak_mb']:>9.1f} "
+              f"{r['seconds_per_10k']:>7.2f} {r['mb_per_10k']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
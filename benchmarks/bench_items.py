@@ -0,0 +1,104 @@
+# bench_items.py
+# Technical Excel 'Item' extraction: streamed single-column read (cadai_items)
+# vs. the full pd.read_excel the estimator used to do.
+#
+#   python benchmarks/bench_items.py                  # 10k / 50k rows
+#   python benchmarks/bench_items.py --rows 200000 --cols 40
+#
+# time_* functions (10k / 50k rows) are picked up by benchmarks/run.py.
+#
+# Reports seconds and peak Python heap (tracemalloc, MB) for each reader.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import lru_cache
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import xlsxwriter
+
+from cadai_items import unique_items
+
+COLS = 20
+DISTINCT = 400                # distinct Item values
+
+
+@lru_cache(maxsize=None)
+def technical_sheet(rows, cols=COLS):
+    """Path of a synthetic technical sheet: Item plus `cols - 1` other columns (written once per size)."""
+    path = os.path.join(tempfile.gettempdir(), f"cadai_bench_items_{rows}x{cols}.xlsx")
+    if os.path.exists(path):
+        return path
+    wb = xlsxwriter.Workbook(path, {"constant_memory": True})
+    ws = wb.add_worksheet()
+    ws.write_row(0, 0, ["Sl No", "Item"] + [f"SPEC {c}" for c in range(cols - 2)])
+    for r in range(1, rows + 1):
+        ws.write_number(r, 0, r)
+        ws.write_string(r, 1, f"MODULE {r * 7919 % DISTINCT:04d}")
+        for c in range(2, cols):
+            ws.write_number(r, c, (r * c) % 1000 / 10)
+    wb.close()
+    return path
+
+
+def read_full(path):
+    df = pd.read_excel(path)
+    return df["Item"].dropna().unique().tolist()
+
+
+def read_streamed(path):
+    return unique_items(path)
+
+
+# ================== benchmarks/run.py ==================
+SIZES = [10_000, 50_000]
+
+
+def time_items_full(path):
+    read_full(path)
+
+
+def time_items_streamed(path):
+    read_streamed(path)
+
+
+for _fn in (time_items_full, time_items_streamed):
+    _fn.params = SIZES
+    _fn.setup = technical_sheet
+    _fn.repeat = 3
+
+
+# ================== CLI ==================
+def measure(fn, path):
+    tracemalloc.start()
+    t = time.perf_counter()
+    items = fn(path)
+    secs = time.perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return secs, peak, items
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Technical Excel Item extraction benchmark")
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000])
+    ap.add_argument("--cols", type=int, default=COLS)
+    args = ap.parse_args()
+
+    for rows in args.rows:
+        path = technical_sheet(rows, args.cols)
+        full = measure(read_full, path)
+        streamed = measure(read_streamed, path)
+        assert full[2] == streamed[2], "readers disagree"
+        print(f"{rows:>8,} rows x {args.cols} cols  ({len(full[2])} items)")
+        print(f"   pd.read_excel : {full[0]:7.2f} s  {full[1]:8.1f} MB peak")
+        print(f"   streamed      : {streamed[0]:7.2f} s  {streamed[1]:8.1f} MB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# bench_lookup.py
+# Belt-width / frame lookups and fabrication TOTAL WT summation.
+# Run through benchmarks/run.py.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from cadai_bearings import get_catalog, recommend_shaft
+from cadai_fabstore import FAB_SOURCE, FabStore, compile_rows
+from cadai_lookup import FRAME_WT_INDEX, frame_bw, frame_wt, get_frame_bw_from_roller_wt
+from cadai_tables import FAB_ROWS, fab_total_wt, make_df
+
+SIZES = [1_000, 100_000]
+
+
+def _roller_wts(n):
+    return np.random.default_rng(0).uniform(0.5, 120.0, n)
+
+
+# ================== BELT WIDTH ==================
+def time_bw_scalar():
+    get_frame_bw_from_roller_wt(7.3)
+
+
+def time_bw_batch(wts):
+    get_frame_bw_from_roller_wt(wts)
+
+
+time_bw_batch.params = SIZES
+time_bw_batch.setup = _roller_wts
+
+
+def time_frame_bw_snap_batch(wts):
+    """SARI (N-6012) only has 3 widths, so most lookups snap to the nearest."""
+    frame_bw("SARI_N", wts)
+
+
+time_frame_bw_snap_batch.params = SIZES
+time_frame_bw_snap_batch.setup = _roller_wts
+
+
+# ================== FRAME WEIGHT ==================
+def time_frame_wt_scalar():
+    frame_wt("SACI", 1400)
+
+
+def time_nearest_key_batch(bws):
+    FRAME_WT_INDEX["SARI_N"].nearest_key(bws)
+
+
+time_nearest_key_batch.params = SIZES
+time_nearest_key_batch.setup = lambda n: np.random.default_rng(0).choice([650, 800, 1000, 1200, 1400, 1600, 1800, 2000], n)
+
+
+# ================== FABRICATION TOTAL WT ==================
+def time_fab_total_wt_build():
+    """Every table built and summed from the raw rows (what each rerun used to do)."""
+    for family, tables in FAB_ROWS.items():
+        for rows in tables.values():
+            make_df(rows)["TOTAL WT"].sum()
+
+
+def time_fab_total_wt_cached():
+    for family, tables in FAB_ROWS.items():
+        for bw in tables:
+            fab_total_wt(family, bw)
+
+
+# ================== FABRICATION STORE ==================
+def time_fab_store_open():
+    """Open the compiled store (index only; rows stay mapped, unread)."""
+    FabStore.open()
+
+
+def time_fab_store_compile():
+    compile_rows(pd.read_csv(FAB_SOURCE))
+
+
+def time_fab_store_table(store):
+    """One width's DataFrame out of the mapped rows (what fab_table() caches)."""
+    store.table("SACI", 1400)
+
+
+time_fab_store_table.setup = lambda _: FabStore.open()
+
+
+# ================== BEARINGS ==================
+def _bearing_skus(n):
+    catalog = get_catalog()
+    return np.random.default_rng(0).choice(catalog.sku, n)
+
+
+def time_bearing_cost_batch(skus):
+    """Per-row BEARING_COST_PAIR for a schedule column of SKUs."""
+    get_catalog().pair_cost(skus, 100.0)
+
+
+time_bearing_cost_batch.params = SIZES
+time_bearing_cost_batch.setup = _bearing_skus
+
+
+def time_recommend_shaft_batch(skus):
+    recommend_shaft(get_catalog().bore_of(skus))
+
+
+time_recommend_shaft_batch.params = SIZES
+time_recommend_shaft_batch.setup = _bearing_skus
+
+
+def time_bearing_search():
+    get_catalog().search(min_bore=20, max_bore=30, min_load=15)
@@ -0,0 +1,85 @@
+# bench_tender.py
+# Tender pricing (cadai_tender) scaling with worker processes.
+#
+#   python benchmarks/bench_tender.py                          # 1 .. all cores
+#   python benchmarks/bench_tender.py --workers 1 8 16 32 --conveyors 64 --lines 5000
+#
+# time_tender (one worker vs. all cores) is picked up by benchmarks/run.py.
+#
+# Reports seconds, lines/s and speed-up over the first worker count for each.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from functools import lru_cache
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from cadai_costing import ROLLER_TYPES
+from cadai_tender import price_tender, read_manifest
+
+CONVEYORS = 16
+LINES = 2_000                 # schedule lines per conveyor
+
+
+@lru_cache(maxsize=None)
+def tender(conveyors=CONVEYORS, lines=LINES):
+    """Manifest path of a synthetic tender (schedules written once per size)."""
+    folder = os.path.join(tempfile.gettempdir(), f"cadai_bench_tender_{conveyors}x{lines}")
+    manifest = os.path.join(folder, "tender.csv")
+    if os.path.exists(manifest):
+        return manifest
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(0)
+    for n in range(conveyors):
+        pd.DataFrame({
+            "ROLLER": rng.choice(ROLLER_TYPES, lines),
+            "PIPE DIA": rng.choice([89, 114, 127, 152], lines),
+            "PIPE THK": rng.choice([3.2, 4.5], lines),
+            "FACE WIDTH": rng.choice([200, 380, 465, 530], lines),
+            "SHAFT DIA": rng.choice([25, 30, 35], lines),
+            "QTY": rng.integers(1, 50, lines),
+            "QTY TYPE": rng.choice(["SET (1 Frame)", "SINGLE ROLLER"], lines),
+        }).to_csv(os.path.join(folder, f"CV-{n:03d}.csv"), index=False)
+    pd.DataFrame({
+        "CONVEYOR": [f"CV-{n:03d}" for n in range(conveyors)],
+        "SCHEDULE": [f"CV-{n:03d}.csv" for n in range(conveyors)],
+    }).to_csv(manifest, index=False)
+    return manifest
+
+
+# ================== benchmarks/run.py ==================
+def time_tender(workers):
+    price_tender(read_manifest([tender()]), workers)
+
+
+time_tender.params = sorted({1, os.cpu_count() or 1})
+time_tender.repeat = 3
+
+
+# ================== CLI ==================
+def main():
+    ap = argparse.ArgumentParser(description="Tender pricing worker scaling benchmark")
+    ap.add_argument("--workers", type=int, nargs="+", default=time_tender.params)
+    ap.add_argument("--conveyors", type=int, default=CONVEYORS)
+    ap.add_argument("--lines", type=int, default=LINES)
+    args = ap.parse_args()
+
+    conveyors = read_manifest([tender(args.conveyors, args.lines)])
+    total = args.conveyors * args.lines
+    base = None
+    for workers in args.workers:
+        t = time.perf_counter()
+        price_tender(conveyors, workers)
+        secs = time.perf_counter() - t
+        base = base or secs
+        print(f"{workers:>4} workers : {secs:7.2f} s  {total / secs:>10,.0f} lines/s  x{base / secs:5.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# run.py
+# Benchmark runner (asv style) — times every `time_*` function in benchmarks/bench_*.py
+# and saves the results as JSON for release-to-release comparison.
+#
+#   python benchmarks/run.py                              # all benchmarks
+#   python benchmarks/run.py -k lookup -k costing         # name filter
+#   python benchmarks/run.py --compare benchmarks/results/<old>.json
+#
+# Benchmark conventions:
+#   time_x()                        timed as is
+#   time_x.params = [a, b]          timed once per param: time_x(param)
+#   time_x.setup = fn               state = fn(param) (untimed), then time_x(state)
+#   time_x.repeat = n               samples to take (default REPEAT)
+#
+# Output: benchmarks/results/<timestamp>-<commit>.json
+#   {"meta": {...}, "results": {"bench_costing.time_cost_rollers(10000)": {"min": s, ...}}}
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+RESULTS_DIR = os.path.join(HERE, "results")
+REPEAT = 5
+MIN_SAMPLE = 0.05             # s, calls per sample are scaled up to at least this
+MAX_NUMBER = 100_000
+REGRESSION = 1.20             # --compare flags anything 20% slower than the baseline
+
+
+# ================== DISCOVERY ==================
+def discover(filters=()):
+    """[(benchmark name, fn, param)] for every time_* function in bench_*.py."""
+    found = []
+    for fname in sorted(os.listdir(HERE)):
+        if not (fname.startswith("bench_") and fname.endswith(".py")):
+            continue
+        module = importlib.import_module(fname[:-3])
+        for attr in sorted(dir(module)):
+            fn = getattr(module, attr)
+            if not (attr.startswith("time_") and callable(fn)):
+                continue
+            params = getattr(fn, "params", None)
+            for param in params if params is not None else [None]:
+                name = f"{module.__name__}.{attr}" + ("" if params is None else f"({param})")
+                if not filters or any(f in name for f in filters):
+                    found.append((name, fn, param))
+    return found
+
+
+# ================== TIMING ==================
+def _call(fn, param):
+    setup = getattr(fn, "setup", None)
+    if setup is not None:
+        state = setup(param)
+        return lambda: fn(state)
+    if param is None:
+        return fn
+    return lambda: fn(param)
+
+
+def measure(fn, param):
+    """Seconds per call: min / median / mean / stdev over `repeat` samples."""
+    call = _call(fn, param)
+
+    t0 = time.perf_counter()
+    call()                                   # warm-up, also sizes the sample
+    first = time.perf_counter() - t0
+    number = 1 if first >= MIN_SAMPLE else min(MAX_NUMBER, max(1, int(MIN_SAMPLE / max(first, 1e-9))))
+
+    samples = []
+    for _ in range(getattr(fn, "repeat", REPEAT)):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            call()
+        samples.append((time.perf_counter() - t0) / number)
+
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "repeat": len(samples),
+        "number": number,
+    }
+
+
+# ================== META ==================
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def _versions():
+    versions = {"python": platform.python_version()}
+    for pkg in ("numpy", "pandas", "streamlit", "xlsxwriter", "openpyxl"):
+        try:
+            versions[pkg] = importlib.import_module(pkg).__version__
+        except ImportError:
+            versions[pkg] = None
+    return versions
+
+
+def meta():
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": _versions(),
+    }
+
+
+# ================== COMPARE ==================
+def compare(results, baseline_path, threshold=REGRESSION):
+    """Print current vs baseline medians; returns the names that regressed."""
+    with open(baseline_path, encoding="utf-8") as fh:
+        base = json.load(fh)["results"]
+
+    regressed = []
+    print(f"\n{'benchmark':<60} {'base':>10} {'now':>10} {'ratio':>7}")
+    for name, r in results.items():
+        if name not in base:
+            continue
+        ratio = r["median"] / base[name]["median"]
+        flag = " SLOWER" if ratio > threshold else (" faster" if ratio < 1 / threshold else "")
+        if ratio > threshold:
+            regressed.append(name)
+        print(f"{name:<60} {_fmt(base[name]['median']):>10} {_fmt(r['median']):>10} {ratio:>6.2f}x{flag}")
+    return regressed
+
+
+def _fmt(secs):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if secs >= scale:
+            return f"{secs / scale:.2f}{unit}"
+    return f"{secs / 1e-9:.0f}ns"
+
+
+# ================== CLI ==================
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run the CADAI benchmark suite")
+    ap.add_argument("-k", dest="filters", action="append", default=[], help="only benchmarks whose name contains this")
+    ap.add_argument("-o", "--output", help="results JSON (default benchmarks/results/<timestamp>-<commit>.json)")
+    ap.add_argument("--compare", help="baseline results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=REGRESSION, help="slowdown ratio counted as a regression")
+    args = ap.parse_args(argv)
+
+    info = meta()
+    results = {}
+    for name, fn, param in discover(args.filters):
+        r = measure(fn, param)
+        results[name] = r
+        print(f"{name:<60} {_fmt(r['median']):>10}  (±{_fmt(r['stdev'])}, {r['repeat']}x{r['number']})", flush=True)
+
+    out = args.output
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"{stamp}-{info['commit']}.json")
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump({"meta": info, "results": results}, fh, indent=2)
+    print(f"\nSaved {len(results)} results to {out}")
+
+    if args.compare:
+        regressed = compare(results, args.compare, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} regression(s) over {args.threshold:.2f}x")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+# cadai_api.py
+# Headless JSON costing API (stdlib http.server) — the same engine the Streamlit
+# stages use, without the script rerun on every request.
+#
+#   python cadai_api.py --port 8600 --workers 4
+#
+# Endpoints (JSON in, JSON out):
+#   GET  /health
+#   GET  /constants                         default costing constants (price book)
+#   GET  /fabrication?roller=SACI&bw=1000   fabrication table of one frame
+#   GET  /bearings?bore=25&min_load=14      bearing catalog search (also min_bore, max_bore,
+#                                           series, max_cost), cheapest first
+#   POST /rollers  {"constants": {...}, "lines": [roller lines]}
+#   POST /frames   {"constants": {...}, "lines": [frame lines]}
+#   POST /batch    {"constants": {...}, "rollers": [...], "frames": [...] | "auto"}
+#
+# Roller lines use the bulk-import schedule columns (ROLLER, PIPE DIA, PIPE THK,
+# FACE WIDTH, SHAFT DIA, QTY, optional SHAFT LENGTH / QTY TYPE / NO. OF ROLLERS /
+# BEARING).
+# Frame lines are {"ROLLER", "WT" (roller kg), "QTY" (sets)}. "frames": "auto"
+# prices one frame line per SET roller line, like the frame stage does.
+#
+# Big requests are split into CHUNK_SIZE slices and costed on a process pool.
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from cadai_bearings import get_catalog, recommend_shaft
+from cadai_costing import cost_frames
+from cadai_lookup import FRAME_FAMILY
+from cadai_pricebook import default_constants
+from cadai_schedule import REQUIRED_COLUMNS, SET, cost_schedule, validate_schedule
+from cadai_tables import FAB_ROWS, fab_table
+
+CHUNK_SIZE = 2000             # lines per pool task
+MAX_BODY = 64 * 1024 * 1024   # bytes
+
+FRAME_COLUMNS = ["ROLLER", "WT", "QTY"]
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ================== REQUEST PARSING ==================
+def _constants(body):
+    constants = default_constants()
+    for key, value in (body.get("constants") or {}).items():
+        if key not in constants:
+            raise ApiError(400, f"Unknown constant: {key}")
+        try:
+            constants[key] = float(value)
+        except (TypeError, ValueError):
+            raise ApiError(400, f"Constant {key} must be a number")
+    return constants
+
+
+def _lines(body, key):
+    lines = body.get(key) or []
+    if not isinstance(lines, list) or not all(isinstance(x, dict) for x in lines):
+        raise ApiError(400, f'"{key}" must be a list of objects')
+    return lines
+
+
+def _frame(lines, columns):
+    df = pd.DataFrame(lines)
+    df.columns = [" ".join(str(c).replace("_", " ").upper().split()) for c in df.columns]
+    return df.reindex(columns=list(dict.fromkeys(columns + list(df.columns))))
+
+
+# ================== COSTING (runs in the pool) ==================
+def cost_roller_lines(lines, constants, offset=0):
+    """Cost roller lines; returns (rows, errors) with LINE = index in the request."""
+    df = _frame(lines, REQUIRED_COLUMNS)
+    df.index = np.arange(offset, offset + len(df))
+    valid, errors = validate_schedule(df)
+    # validate_schedule numbers spreadsheet rows (header + 1-based)
+    errors = [{"LINE": offset + e["ROW"] - 2, "ERROR": e["ERROR"]} for e in errors]
+
+    rows = []
+    for _, _, chunk in cost_schedule(valid, constants):
+        rows.extend(chunk)
+    for line, row in zip(valid.index, rows):
+        row["LINE"] = int(line)
+    return rows, errors
+
+
+def cost_frame_lines(lines, constants, offset=0):
+    """Cost frame lines; returns (rows, errors) with LINE = index in the request."""
+    df = _frame(lines, FRAME_COLUMNS)
+    df["ROLLER"] = df["ROLLER"].astype(str).str.strip()
+    df["WT"] = pd.to_numeric(df["WT"], errors="coerce")
+    df["QTY"] = pd.to_numeric(df["QTY"], errors="coerce")
+
+    checks = [
+        (~df["ROLLER"].isin(FRAME_FAMILY), "Frame not defined for this roller"),
+        (~(df["WT"] > 0), "WT must be a number > 0"),
+        (~(df["QTY"] >= 1) | (df["QTY"] % 1 != 0), "QTY must be a whole number >= 1"),
+    ]
+    bad = np.zeros(len(df), dtype=bool)
+    errors = []
+    for mask, message in checks:
+        mask = mask.to_numpy()
+        bad |= mask
+        errors.extend({"LINE": offset + int(i), "ERROR": message} for i in np.flatnonzero(mask))
+    errors.sort(key=lambda e: e["LINE"])
+
+    ok = df[~bad]
+    qty = ok["QTY"].to_numpy()
+    res = cost_frames(ok["ROLLER"].to_numpy(), ok["WT"].to_numpy(), qty, constants)
+    rows = [
+        {
+            "LINE": offset + int(i),
+            "ROLLER": roller,
+            "BELT WIDTH": int(res["belt_width"][k]),
+            "FRAME WT": round(float(res["frame_wt"][k]), 3),
+            "FRAME UNIT PRICE": round(float(res["unit_price"][k]), 2),
+            "FRAME TOTAL PRICE": round(float(res["total_price"][k]), 2),
+            "FRAME QTY (SET)": int(qty[k]),
+        }
+        for k, (i, roller) in enumerate(zip(np.flatnonzero(~bad), ok["ROLLER"].to_numpy()))
+    ]
+    return rows, errors
+
+
+def auto_frame_lines(roller_rows):
+    """One frame line per SET roller line of a frame roller (as the frame stage does)."""
+    return [
+        {"ROLLER": r["ROLLER"], "WT": r["WT"], "QTY": r["QTY"], "ROLLER LINE": r["LINE"]}
+        for r in roller_rows
+        if r.get("QTY TYPE") == SET and r["ROLLER"] in FRAME_FAMILY
+    ]
+
+
+# ================== POOL ==================
+def _run(pool, fn, lines, constants):
+    """Cost `lines` with `fn`, chunked across the pool for big requests."""
+    if pool is None or len(lines) <= CHUNK_SIZE:
+        return fn(lines, constants)
+
+    starts = range(0, len(lines), CHUNK_SIZE)
+    futures = [pool.submit(fn, lines[s:s + CHUNK_SIZE], constants, s) for s in starts]
+    rows, errors = [], []
+    for f in futures:
+        r, e = f.result()
+        rows.extend(r)
+        errors.extend(e)
+    return rows, errors
+
+
+def _result(rows, errors, price_key):
+    return {
+        "count": len(rows),
+        "total_price": round(sum(r[price_key] for r in rows), 2),
+        "lines": rows,
+        "errors": errors,
+    }
+
+
+def price_rollers(body, pool=None):
+    rows, errors = _run(pool, cost_roller_lines, _lines(body, "lines"), _constants(body))
+    return _result(rows, errors, "TOTAL_PRICE")
+
+
+def price_frames(body, pool=None):
+    rows, errors = _run(pool, cost_frame_lines, _lines(body, "lines"), _constants(body))
+    return _result(rows, errors, "FRAME TOTAL PRICE")
+
+
+def price_batch(body, pool=None):
+    constants = _constants(body)
+    roller_rows, roller_errors = _run(pool, cost_roller_lines, _lines(body, "rollers"), constants)
+
+    if body.get("frames") == "auto":
+        frame_lines = auto_frame_lines(roller_rows)
+    else:
+        frame_lines = _lines(body, "frames")
+    frame_rows, frame_errors = _run(pool, cost_frame_lines, frame_lines, constants)
+    if body.get("frames") == "auto":
+        for row in frame_rows:
+            row["ROLLER LINE"] = frame_lines[row.pop("LINE")]["ROLLER LINE"]
+
+    rollers = _result(roller_rows, roller_errors, "TOTAL_PRICE")
+    frames = _result(frame_rows, frame_errors, "FRAME TOTAL PRICE")
+    return {
+        "rollers": rollers,
+        "frames": frames,
+        "grand_total": round(rollers["total_price"] + frames["total_price"], 2),
+    }
+
+
+def fabrication(query):
+    roller = (query.get("roller") or [""])[0]
+    family = FRAME_FAMILY.get(roller)
+    if family is None:
+        raise ApiError(404, f"Frame not defined for: {roller}")
+    try:
+        bw = int((query.get("bw") or [""])[0])
+    except ValueError:
+        raise ApiError(400, "bw must be a belt width in mm")
+    if bw not in FAB_ROWS[family]:
+        raise ApiError(404, f"No fabrication table for {roller} at {bw} mm")
+    df = fab_table(family, bw)
+    return {"roller": roller, "belt_width": bw, "total_wt": float(df["TOTAL WT"].sum()), "rows": df.to_dict("records")}
+
+
+BEARING_FILTERS = ["bore", "min_bore", "max_bore", "min_load", "max_cost"]
+
+
+def bearings(query):
+    filters = {}
+    for key in BEARING_FILTERS:
+        if key in query:
+            try:
+                filters[key] = float(query[key][0])
+            except ValueError:
+                raise ApiError(400, f"{key} must be a number")
+    if "series" in query:
+        filters["series"] = query["series"][0]
+    df = get_catalog().search(**filters)
+    df = df.assign(SHAFT_DIA=recommend_shaft(df["BORE"].to_numpy()))
+    return {"count": len(df), "bearings": json.loads(df.to_json(orient="records"))}
+
+
+# ================== HTTP ==================
+POST_ROUTES = {"/rollers": price_rollers, "/frames": price_frames, "/batch": price_batch}
+
+
+class CostingHandler(BaseHTTPRequestHandler):
+    server_version = "CADAI-API/1.0"
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, route):
+        try:
+            self._send(200, route())
+        except ApiError as e:
+            self._send(e.status, {"error": str(e)})
+        except Exception as e:  # keep the server up; report the failure
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._handle(lambda: {"status": "ok"})
+        elif url.path == "/constants":
+            self._handle(default_constants)
+        elif url.path == "/fabrication":
+            self._handle(lambda: fabrication(parse_qs(url.query)))
+        elif url.path == "/bearings":
+            self._handle(lambda: bearings(parse_qs(url.query)))
+        else:
+            self._send(404, {"error": f"Unknown path: {url.path}"})
+
+    def do_POST(self):
+        route = POST_ROUTES.get(urlparse(self.path).path)
+        if route is None:
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+        self._handle(lambda: route(self._body(), self.server.pool))
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            raise ApiError(413, "Request body too large")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            raise ApiError(400, f"Invalid JSON: {e}")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Request body must be a JSON object")
+        return body
+
+    def log_message(self, fmt, *args):
+        if not self.server.quiet:
+            super().log_message(fmt, *args)
+
+
+class CostingServer(ThreadingHTTPServer):
+    """Threaded HTTP server; one thread per connection, costing on a process pool."""
+
+    daemon_threads = True
+
+    def __init__(self, address, workers=None, quiet=False):
+        super().__init__(address, CostingHandler)
+        self.quiet = quiet
+        self.pool = ProcessPoolExecutor(workers) if workers != 0 else None
+
+    def server_close(self):
+        super().server_close()
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def make_server(host="127.0.0.1", port=8600, workers=None, quiet=False):
+    """Build (but do not start) a server; port=0 picks a free port, workers=0 costs inline."""
+    return CostingServer((host, port), workers=workers, quiet=quiet)
+
+
+# ================== CLI ==================
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="CADAI headless costing API")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8600)
+    ap.add_argument("--workers", type=int, default=os.cpu_count(), help="costing processes (0 = inline)")
+    ap.add_argument("--quiet", action="store_true", help="no per-request access log")
+    args = ap.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.workers, args.quiet)
+    print(f"CADAI API on http://{args.host}:{server.server_address[1]} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
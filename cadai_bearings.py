@@ -0,0 +1,149 @@
+# cadai_bearings.py
+# Bearing catalog — SKUs loaded from data/bearings.csv and indexed for bore /
+# series / load / price queries, plus the shaft size to pair with a bearing.
+#
+# File: $CADAI_BEARINGS, default data/bearings.csv next to this module.
+# Columns: SKU, SERIES, BORE (mm), OD, WIDTH, DYN_LOAD_KN, PAIR_COST (₹ per pair).
+# A blank PAIR_COST means "price at the BEARING_COST_PAIR constant".
+#
+# Like cadai_lookup, queries are np.searchsorted over sorted arrays and accept a
+# scalar or a whole column.
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+BEARINGS_PATH = os.environ.get(
+    "CADAI_BEARINGS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "bearings.csv")
+)
+
+
+
+def _out(result, scalar):
+    return result.item() if scalar else result
+
+
+# ================== SHAFT RULE ==================
+MARKET_SHAFT_SIZES = np.array([12, 15, 17, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70], dtype=float)
+BORE_ALLOWANCE = 5            # mm, shaft = smallest market size >= bore + 5
+
+
+def recommend_shaft(bore):
+    """Smallest market shaft size >= bore + BORE_ALLOWANCE (the target itself above the range)."""
+    target = np.asarray(bore, dtype=float) + BORE_ALLOWANCE
+    i = np.searchsorted(MARKET_SHAFT_SIZES, target)
+    sizes = MARKET_SHAFT_SIZES[np.minimum(i, len(MARKET_SHAFT_SIZES) - 1)]
+    return _out(np.where(i < len(MARKET_SHAFT_SIZES), sizes, target), target.ndim == 0)
+
+
+# ================== CATALOG ==================
+class BearingCatalog:
+    """Bearing SKUs indexed by SKU, bore (sorted array), series (dict of row lists) and cost."""
+
+    def __init__(self, df):
+        df = df.copy()
+        df.columns = [str(c).strip().upper() for c in df.columns]
+        df["SKU"] = df["SKU"].astype(str).str.strip()
+        df["SERIES"] = df["SERIES"].astype(str).str.strip()
+        for col in ["BORE", "OD", "WIDTH", "DYN_LOAD_KN", "PAIR_COST"]:
+            df[col] = pd.to_numeric(df.get(col), errors="coerce")
+        if df["SKU"].duplicated().any():
+            raise ValueError(f"Duplicate bearing SKU: {df.loc[df['SKU'].duplicated(), 'SKU'].iloc[0]}")
+        if not (df["BORE"] > 0).all():
+            raise ValueError("Every bearing needs a BORE > 0")
+
+        self.df = df.reset_index(drop=True)   # file order, which is also the UI order
+        self.sku = self.df["SKU"].to_numpy()
+        self.bore = self.df["BORE"].to_numpy(dtype=float)
+        self.load = self.df["DYN_LOAD_KN"].to_numpy(dtype=float)
+        self.cost = self.df["PAIR_COST"].to_numpy(dtype=float)
+
+        # bore index: row numbers sorted by (bore, cost), NaN cost last
+        self._by_bore = np.lexsort((np.nan_to_num(self.cost, nan=np.inf), self.bore))
+        self._bores = self.bore[self._by_bore]
+        # SKU index: sorted SKUs -> row number
+        self._by_sku = np.argsort(self.sku, kind="stable")
+        self._skus = self.sku[self._by_sku]
+        self.series = {}
+        for i, s in enumerate(self.df["SERIES"]):
+            self.series.setdefault(s, []).append(i)
+
+    @classmethod
+    def from_file(cls, path=BEARINGS_PATH):
+        if path.lower().endswith((".xlsx", ".xls")):
+            return cls(pd.read_excel(path, dtype={"SKU": str, "SERIES": str}))
+        return cls(pd.read_csv(path, dtype={"SKU": str, "SERIES": str}))
+
+    def __len__(self):
+        return len(self.sku)
+
+    # ---------- lookups ----------
+    def rows(self, sku):
+        """Row number of each SKU, -1 where it is not in the catalog."""
+        sku = np.asarray(sku).astype(str)
+        i = np.clip(np.searchsorted(self._skus, sku), 0, len(self._skus) - 1)
+        found = self._skus[i] == sku
+        return _out(np.where(found, self._by_sku[i], -1), sku.ndim == 0)
+
+    def contains(self, sku):
+        return _out(np.asarray(self.rows(sku)) >= 0, np.ndim(sku) == 0)
+
+    def bore_of(self, sku):
+        """Bore (mm) of each SKU, NaN where unknown."""
+        i = np.asarray(self.rows(sku))
+        return _out(np.where(i >= 0, self.bore[i], np.nan), i.ndim == 0)
+
+    def pair_cost(self, sku, default):
+        """Catalog price per pair of each SKU; `default` where unknown or unpriced."""
+        i = np.asarray(self.rows(sku))
+        cost = np.where(i >= 0, self.cost[i], np.nan)
+        return _out(np.where(np.isnan(cost), default, cost), i.ndim == 0)
+
+    def search(self, bore=None, min_bore=None, max_bore=None, series=None, min_load=None, max_cost=None):
+        """Catalog rows matching every given filter, cheapest first (unpriced last)."""
+        if bore is not None:
+            min_bore = max_bore = bore
+        lo = np.searchsorted(self._bores, -np.inf if min_bore is None else min_bore, side="left")
+        hi = np.searchsorted(self._bores, np.inf if max_bore is None else max_bore, side="right")
+        idx = self._by_bore[lo:hi]
+        if series is not None:
+            idx = idx[np.isin(idx, self.series.get(str(series), []))]
+        if min_load is not None:
+            idx = idx[self.load[idx] >= min_load]
+        if max_cost is not None:
+            idx = idx[self.cost[idx] <= max_cost]
+        idx = idx[np.argsort(np.nan_to_num(self.cost[idx], nan=np.inf), kind="stable")]
+        return self.df.iloc[idx]
+
+    # ---------- UI ----------
+    def label(self, i):
+        return f"{self.sku[i]} ({self.bore[i]:g} mm bore)"
+
+    def options(self):
+        """Selectbox labels in file order."""
+        return [self.label(i) for i in range(len(self))]
+
+    def sku_of_label(self, label):
+        return label.split(" ", 1)[0]
+
+
+@lru_cache(maxsize=None)
+def get_catalog(path=BEARINGS_PATH):
+    """Process-wide catalog, read once."""
+    return BearingCatalog.from_file(path)
+
+
+def bearing_constants(constants, sku):
+    """constants with BEARING_COST_PAIR set from the catalog where the SKU is priced.
+
+    `sku` may be one SKU or a column of them (giving a per-row BEARING_COST_PAIR
+    array, which cost_rollers broadcasts). Blank / missing SKUs keep the constant.
+    """
+    if sku is None:
+        return constants
+    cost = get_catalog().pair_cost(sku, constants["BEARING_COST_PAIR"])
+    if np.ndim(cost) == 0 and float(cost) == float(constants["BEARING_COST_PAIR"]):
+        return constants
+    return {**constants, "BEARING_COST_PAIR": cost}
@@ -0,0 +1,127 @@
+# cadai_catalog.py
+# Module price catalog for the project estimator — prices every module of an
+# uploaded technical sheet in one batch, so the chat only asks about the rest.
+#
+# Two indexes over the catalog names:
+#   exact  dicts: normalized name -> entry, and the same with the spaces
+#          squeezed out ("GEARBOX" finds "Gear Box")
+#   fuzzy  inverted token index: token -> entry ids, scored by IDF-weighted
+#          token overlap (Jaccard); numbers are tokens too, so "PULLEY 500"
+#          never matches "PULLEY 600"
+#
+# File: $CADAI_MODULE_CATALOG, default data/module_prices.csv (ITEM, PRICE
+# columns; .xlsx also read). The estimator can also take an uploaded catalog.
+
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+import pandas as pd
+
+CATALOG_PATH = os.environ.get(
+    "CADAI_MODULE_CATALOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "module_prices.csv")
+)
+
+FUZZY_MIN = 0.75              # weighted token overlap needed for a fuzzy match
+CANDIDATE_TOKENS = 3          # rarest query tokens used to pull candidates
+
+_TOKEN = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+
+
+def tokens(name):
+    return _TOKEN.findall(str(name).lower())
+
+
+def normalize(name):
+    """Case, punctuation and spacing insensitive key."""
+    return " ".join(tokens(name))
+
+
+# ================== CATALOG ==================
+class PriceCatalog:
+    """Module name -> price, with exact and token-fuzzy lookup."""
+
+    def __init__(self, df):
+        df = df.copy()
+        df.columns = [str(c).strip().upper() for c in df.columns]
+        if "ITEM" not in df.columns or "PRICE" not in df.columns:
+            raise ValueError("Price catalog needs ITEM and PRICE columns")
+        df["PRICE"] = pd.to_numeric(df["PRICE"], errors="coerce")
+        df = df.dropna(subset=["ITEM", "PRICE"])
+
+        self.names = df["ITEM"].astype(str).tolist()
+        self.prices = df["PRICE"].astype(float).tolist()
+        self.exact, self.compact = {}, {}
+        for i, name in enumerate(self.names):
+            key = normalize(name)
+            self.exact.setdefault(key, i)                 # first row wins on duplicates
+            self.compact.setdefault(key.replace(" ", ""), i)
+
+        self.entry_tokens = [set(tokens(name)) for name in self.names]
+        self.index = {}
+        for i, toks in enumerate(self.entry_tokens):
+            for t in toks:
+                self.index.setdefault(t, []).append(i)
+        n = max(len(self.names), 1)
+        self.idf = {t: math.log(1 + n / len(ids)) for t, ids in self.index.items()}
+
+    @classmethod
+    def from_file(cls, source):
+        name = str(getattr(source, "name", source)).lower()
+        if name.endswith((".xlsx", ".xls")):
+            return cls(pd.read_excel(source))
+        return cls(pd.read_csv(source))
+
+    def __len__(self):
+        return len(self.names)
+
+    def _weight(self, t):
+        return self.idf.get(t, math.log(1 + max(len(self.names), 1)))
+
+    def fuzzy(self, name):
+        """(entry id, score) of the best token match, or (None, 0.0)."""
+        query = set(tokens(name))
+        known = sorted((t for t in query if t in self.index), key=lambda t: len(self.index[t]))
+        candidates = Counter(i for t in known[:CANDIDATE_TOKENS] for i in self.index[t])
+        best, best_score = None, 0.0
+        for i in candidates:
+            entry = self.entry_tokens[i]
+            shared = sum(self._weight(t) for t in query & entry)
+            score = shared / sum(self._weight(t) for t in query | entry)
+            if score > best_score:
+                best, best_score = i, score
+        return best, best_score
+
+    def lookup(self, name):
+        """{"PRICE", "MATCH", "SCORE", "HOW"} for one module, or None when nothing is close enough."""
+        key = normalize(name)
+        i = self.exact.get(key)
+        if i is None:
+            i = self.compact.get(key.replace(" ", ""))
+        if i is not None:
+            return {"PRICE": self.prices[i], "MATCH": self.names[i], "SCORE": 1.0, "HOW": "exact"}
+        i, score = self.fuzzy(name)
+        if i is not None and score >= FUZZY_MIN:
+            return {"PRICE": self.prices[i], "MATCH": self.names[i], "SCORE": round(score, 3), "HOW": "fuzzy"}
+        return None
+
+    def price_all(self, modules):
+        """Batch lookup: ({module: match dict} for the priced ones, [modules left to ask about])."""
+        priced, pending = {}, []
+        for module in modules:
+            hit = self.lookup(module)
+            if hit is None:
+                pending.append(module)
+            else:
+                priced[module] = hit
+        return priced, pending
+
+
+@lru_cache(maxsize=None)
+def get_catalog(path=CATALOG_PATH):
+    """Process-wide default catalog (empty when the file is missing)."""
+    if not os.path.exists(path):
+        return PriceCatalog(pd.DataFrame(columns=["ITEM", "PRICE"]))
+    return PriceCatalog.from_file(path)
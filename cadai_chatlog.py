@@ -0,0 +1,66 @@
+# cadai_chatlog.py
+# Bounded chat history and running project summary for the estimator
+# (cadai_excel_project.py).
+#
+# ChatLog keeps the newest TAIL messages in a ring buffer; that tail is all a
+# rerun draws. Messages pushed out of it go to a bounded archive (oldest
+# dropped past MAX_ARCHIVE) that is only drawn a page at a time on request.
+# So a rerun does the same work on message 20 as on message 2,000.
+#
+# ProjectSummary formats one summary line per module as its price comes in and
+# keeps the running total, so finishing the project needs no pass over
+# module_prices.
+
+from collections import deque
+from itertools import islice
+
+TAIL = 20                     # messages rendered on every rerun
+MAX_ARCHIVE = 2_000           # older messages kept for paging
+PAGE_SIZE = 25
+
+
+# ================== CHAT LOG ==================
+class ChatLog:
+    """Live ring-buffer tail plus a paged, bounded archive."""
+
+    def __init__(self, tail=TAIL, max_archive=MAX_ARCHIVE):
+        self.tail = deque(maxlen=tail)
+        self.archive = deque(maxlen=max_archive)
+        self.dropped = 0              # messages that fell off the archive
+
+    def append(self, role, text):
+        if len(self.tail) == self.tail.maxlen:
+            if len(self.archive) == self.archive.maxlen:
+                self.dropped += 1
+            self.archive.append(self.tail[0])
+        self.tail.append({"role": role, "text": text})
+
+    def __len__(self):
+        return self.dropped + len(self.archive) + len(self.tail)
+
+    def pages(self, page_size=PAGE_SIZE):
+        return -(-len(self.archive) // page_size)
+
+    def page(self, n, page_size=PAGE_SIZE):
+        """Archived messages of page `n` (1 = oldest kept)."""
+        start = (n - 1) * page_size
+        return list(islice(self.archive, start, start + page_size))
+
+
+# ================== SUMMARY ==================
+class ProjectSummary:
+    """Priced modules as summary lines plus a running total, built as prices come in."""
+
+    def __init__(self):
+        self.lines = []
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, module, price):
+        self.lines.append(f"- {module}: ₹{price:.2f}\n")
+        self.total += price
+        self.count += 1
+
+    def text(self):
+        body = "".join(self.lines)
+        return f"**✅ All module prices entered!**\n\n{body}\n**Total Project Cost: ₹{self.total:.2f}**"
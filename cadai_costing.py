@@ -0,0 +1,284 @@
+# cadai_costing.py
+# Shared roller costing engine — prices any number of roller lines in one NumPy pass.
+#
+# Used by:
+#   - CADAI.PY/cadai_web.py      (input stage)
+#   - cadai_web.py               (input stage)
+#   - CARRYINGIDLERWITHOUTFRAME.py
+#   - cadai_api.py
+
+import math
+
+import numpy as np
+
+from cadai_lookup import FRAME_FAMILY, FRAME_WT_INDEX, ROLLER_BW, TableIndex
+from cadai_lookup import frame_wt as reference_frame_wt
+from cadai_tables import DEFAULT_BW, FAB_ROWS, ROLLER_WT_TO_BW, fab_total_wt
+
+# ================== ROLLER TYPES ==================
+CARRYING = "Carrying Idler Without Frame"
+IMPACT = "Impact Idler Without Frame"
+CARRYING_FRAME = "Carrying Idler With Frame"
+FLAT_RETURN = "Flat Return Roller"
+SARI = "SARI"
+SARI_N = "SARI (N-6012)"
+SACI = "SACI"
+
+ROLLER_TYPES = [CARRYING, IMPACT, CARRYING_FRAME, FLAT_RETURN, SARI, SARI_N, SACI]
+
+# ================== CONSTANTS ==================
+# Built-in defaults; live rates come from the price book (cadai_pricebook).
+DEFAULT_CONSTANTS = {
+    "STEEL_COST": 70.0,
+    "BEARING_COST_PAIR": 100.0,
+    "SEAL_COST": 30.0,
+    "WELDING_COST": 80.0,
+    "MARKUP": 1.25,
+    "FRAME_RATE": 100.0,
+    "GUIDE_ROLLER": 0.0,
+    "PIVOT_BEARING": 0.0,
+    "LOCKING_RING": 0.0,
+}
+
+# ================== RULES ==================
+SHOP_PI = 3.14                # pi used by the estimator weight formulas
+STEEL_DENSITY = 7850.0        # kg/m^3
+
+RUBBER_RING_PITCH = 35        # mm of face width per rubber ring (impact)
+RUBBER_RING_COST = 50         # ₹ per ring
+BRACKET_WT = 1.5 * 2          # kg, flat return: 2 brackets per roller
+
+EXTRA_COSTS = ("GUIDE_ROLLER", "PIVOT_BEARING", "LOCKING_RING")
+
+
+# ================== HELPERS ==================
+def _const(constants, key, default=None):
+    """Constant as a float array (scalars and per-row arrays both broadcast)."""
+    if key not in constants and default is not None:
+        return np.float64(default)
+    return np.asarray(constants[key], dtype=float)
+
+
+# ================== WEIGHTS ==================
+def pipe_weight(pipe_dia, pipe_thk, face_width, geometry="shell", density=STEEL_DENSITY):
+    """Pipe weight (kg).
+
+    "shell"  – estimator formula, pi*D*L*t with pi = 3.14
+    "hollow" – exact annulus, pi*((D/2)^2 - (D/2 - t)^2)*L
+    """
+    D = np.asarray(pipe_dia, dtype=float)
+    t = np.asarray(pipe_thk, dtype=float)
+    L = np.asarray(face_width, dtype=float)
+
+    if geometry == "hollow":
+        outer_r = D / 2.0
+        inner_r = np.maximum(outer_r - t, 0.0)
+        area = math.pi * (outer_r ** 2 - inner_r ** 2)
+        return np.maximum(area * L, 0.0) * density / 1e9
+
+    return SHOP_PI * D * L * t * density / 1e9
+
+
+def shaft_weight(shaft_dia, shaft_len, geometry="shell", density=STEEL_DENSITY):
+    """Solid shaft weight (kg)."""
+    d = np.asarray(shaft_dia, dtype=float)
+    L = np.asarray(shaft_len, dtype=float)
+    pi = math.pi if geometry == "hollow" else SHOP_PI
+    return (pi / 4) * d ** 2 * L * density / 1e9
+
+
+def effective_shaft_dia(shaft_dia, apply_rule=True):
+    """IF X IS ODD THEN ADD 3 (X+3), only where apply_rule is True."""
+    d = np.asarray(shaft_dia, dtype=float)
+    d_int = np.round(d)
+    odd = (d_int % 2 != 0) & np.asarray(apply_rule, dtype=bool)
+    return np.where(odd, d_int + 3, d)
+
+
+def face_width_from_belt_width(belt_width):
+    """Face width (mm) of one roller in a 3-roll set for a belt width (mm)."""
+    bw = np.asarray(belt_width, dtype=float)
+    add_val = np.select(
+        [bw < 800, bw == 800, bw == 1000, bw >= 1500],
+        [100, 150, 200, 250],
+        default=150,
+    )
+    return (bw + add_val) / 3
+
+
+# ================== BATCH COSTING ==================
+def cost_rollers(
+    pipe_dia,
+    pipe_thk,
+    face_width,
+    shaft_dia,
+    shaft_len,
+    roller_type,
+    qty,
+    constants,
+    geometry="shell",
+    density=STEEL_DENSITY,
+    odd_shaft_rule="impact",
+    whole_rubber_rings=True,
+):
+    """Cost a batch of rollers in one vectorized pass.
+
+    Every spec argument may be a scalar or an array; they broadcast against
+    each other. Constants may be scalars or arrays too (e.g. a per-row
+    BEARING_COST_PAIR). ``odd_shaft_rule`` is "impact" (impact idlers only,
+    as in the web app) or "all".
+
+    Returns a dict of NumPy arrays: shaft_dia (effective), pipe_wt, shaft_wt,
+    weight, housing_cost, rubber_qty, rubber_cost, bracket_wt, bracket_cost,
+    fixed_cost (housing + rubber, the part no constant scales), unit_cp,
+    unit_price, total_price.
+    """
+    pipe_dia, pipe_thk, face_width, shaft_dia, shaft_len, qty = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (pipe_dia, pipe_thk, face_width, shaft_dia, shaft_len, qty))
+    )
+    roller_type = np.asarray(roller_type)
+
+    is_impact = roller_type == IMPACT
+    is_flat_return = roller_type == FLAT_RETURN
+
+    # --- SHAFT RULE ---
+    apply_rule = True if odd_shaft_rule == "all" else is_impact
+    shaft_dia_eff = effective_shaft_dia(shaft_dia, apply_rule)
+
+    # --- WEIGHTS ---
+    pipe_wt = pipe_weight(pipe_dia, pipe_thk, face_width, geometry, density)
+    shaft_wt = shaft_weight(shaft_dia_eff, shaft_len, geometry, density)
+    total_wt = pipe_wt + shaft_wt
+
+    # --- RUBBER RINGS (impact only) ---
+    rings = face_width / RUBBER_RING_PITCH
+    if whole_rubber_rings:
+        rings = np.floor(rings)
+    rubber_qty = np.where(is_impact, rings, 0.0)
+    rubber_cost = rubber_qty * RUBBER_RING_COST
+
+    # --- FLAT RETURN BRACKETS ---
+    steel_cost = _const(constants, "STEEL_COST")
+    bracket_wt = np.where(is_flat_return, BRACKET_WT, 0.0)
+    bracket_cost = bracket_wt * steel_cost
+
+    # --- COSTING ---
+    housing_cost = pipe_dia / 2
+    extras = sum(_const(constants, k, 0.0) for k in EXTRA_COSTS)
+
+    unit_cp = (
+        total_wt * steel_cost
+        + housing_cost
+        + rubber_cost
+        + bracket_cost
+        + _const(constants, "BEARING_COST_PAIR")
+        + _const(constants, "SEAL_COST")
+        + _const(constants, "WELDING_COST")
+        + extras
+    )
+    unit_price = unit_cp * _const(constants, "MARKUP")
+    total_price = unit_price * qty
+
+    return {
+        "shaft_dia": shaft_dia_eff,
+        "pipe_wt": pipe_wt,
+        "shaft_wt": shaft_wt,
+        "weight": total_wt,
+        "housing_cost": housing_cost,
+        "rubber_qty": rubber_qty,
+        "rubber_cost": rubber_cost,
+        "bracket_wt": bracket_wt,
+        "bracket_cost": bracket_cost,
+        "fixed_cost": housing_cost + rubber_cost,
+        "unit_cp": unit_cp,
+        "unit_price": unit_price,
+        "total_price": total_price,
+    }
+
+
+def cost_roller(pipe_dia, pipe_thk, face_width, shaft_dia, shaft_len, roller_type, qty, constants, **kw):
+    """Single-roller convenience wrapper: same keys as cost_rollers, plain floats."""
+    res = cost_rollers(pipe_dia, pipe_thk, face_width, shaft_dia, shaft_len, roller_type, qty, constants, **kw)
+    return {k: float(v) for k, v in res.items()}
+
+
+# ================== FRAME COSTING ==================
+def _fab_wt_index(family):
+    return TableIndex({bw: fab_total_wt(family, bw) for bw in FAB_ROWS[family]})
+
+
+_FAB_WT_INDEX = {family: _fab_wt_index(family) for family in FAB_ROWS}
+
+
+def _frame_matrix():
+    """(frame roller type × band belt width) lookups, built once per process.
+
+    Columns are every width the roller WT bands can give; each cell holds the
+    width the family actually uses (SARI (N-6012) snaps to its nearest), its
+    reference frame weight and the frame weight priced (fabrication TOTAL WT
+    sum, reference weight where the width has no table).
+    """
+    rollers = np.array(sorted(FRAME_FAMILY))
+    widths = np.unique(np.r_[[band[2] for band in ROLLER_WT_TO_BW], DEFAULT_BW]).astype(int)
+    bw = np.zeros((len(rollers), len(widths)), dtype=int)
+    ref_wt = np.zeros(bw.shape)
+    wt = np.zeros(bw.shape)
+    for r, roller in enumerate(rollers):
+        family = FRAME_FAMILY[roller]
+        index = FRAME_WT_INDEX[family]
+        bw[r] = np.where(index.contains(widths), widths, index.nearest_key(widths))
+        ref_wt[r] = reference_frame_wt(family, bw[r])
+        fab_wt = _FAB_WT_INDEX[family].get(bw[r], np.nan)
+        wt[r] = np.where(np.isnan(fab_wt), ref_wt[r], fab_wt)
+    return rollers, widths, bw, ref_wt, wt
+
+
+FRAME_ROLLERS, FRAME_WIDTHS, FRAME_BW, FRAME_REF_WT, FRAME_WT_MATRIX = _frame_matrix()
+
+
+def frame_cells(roller_type, roller_wt):
+    """(row, col) of each line in the frame matrix; ValueError for roller types without a frame."""
+    roller_type = np.asarray(roller_type)
+    row = np.clip(np.searchsorted(FRAME_ROLLERS, roller_type), 0, len(FRAME_ROLLERS) - 1)
+    unknown = FRAME_ROLLERS[row] != roller_type
+    if unknown.any():
+        raise ValueError(f"Frame not defined for: {', '.join(sorted(map(str, np.unique(roller_type[unknown]))))}")
+    col = np.searchsorted(FRAME_WIDTHS, ROLLER_BW(roller_wt))
+    return row, col
+
+
+def cost_frames(roller_type, roller_wt, set_qty, constants, frame_wt=None):
+    """Cost a batch of frames (one per SET line) in one pass.
+
+    roller_type / roller_wt / set_qty broadcast like cost_rollers. Belt width
+    comes from the roller WT bands (SARI (N-6012) snaps to its nearest
+    width), frame weight from the fabrication table's TOTAL WT sum
+    (reference frame weight if a width has no table) unless `frame_wt` is
+    given (e.g. the sum of a table the user edited). Both are read from the
+    precomputed frame matrix.
+
+    Returns a dict of NumPy arrays: belt_width, frame_ref_wt, frame_wt,
+    unit_cp, unit_price, total_price. Raises ValueError for roller types
+    that have no frame.
+    """
+    roller_type, roller_wt, set_qty = np.broadcast_arrays(
+        np.asarray(roller_type), np.asarray(roller_wt, dtype=float), np.asarray(set_qty, dtype=float)
+    )
+    row, col = frame_cells(roller_type, roller_wt)
+    bw = FRAME_BW[row, col]
+    ref_wt = FRAME_REF_WT[row, col]
+    total_wt = FRAME_WT_MATRIX[row, col]
+    if frame_wt is not None:
+        total_wt = np.broadcast_to(np.asarray(frame_wt, dtype=float), total_wt.shape).copy()
+    unit_cp = total_wt * _const(constants, "STEEL_COST") + _const(constants, "FRAME_RATE") + _const(constants, "WELDING_COST")
+    unit_price = unit_cp * _const(constants, "MARKUP")
+    total_price = unit_price * set_qty
+
+    return {
+        "belt_width": bw,
+        "frame_ref_wt": ref_wt,
+        "frame_wt": total_wt,
+        "unit_cp": unit_cp,
+        "unit_price": unit_price,
+        "total_price": total_price,
+    }
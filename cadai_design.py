@@ -0,0 +1,147 @@
+# cadai_design.py
+# Roller design search — the cheapest buildable configurations for a belt
+# width, roller load and bearing choice.
+#
+# Design space (all discrete):
+#   pipe       PIPE_DIAS × PIPE_THKS (wall less than half the diameter)
+#   bearing    catalog SKUs (cadai_bearings), optionally one SKU or one series
+#   shaft      MARKET_SHAFT_SIZES, at least recommend_shaft(bore)
+#   face width face_width_from_belt_width (the add_val rule), shaft = face width + 60
+#
+# Screening rules (constants below, not a substitute for a design check):
+#   bearing    DYN_LOAD_KN >= SERVICE_FACTOR × load / 2 (two bearings per roller)
+#   shaft      bending stress at the bearing seat, 32·M / (π·d³) with
+#              M = load / 2 × overhang, within SHAFT_STRESS_MPA
+#   pipe       bore >= bearing OD + 2 × HOUSING_WALL (housing fits the pipe)
+#
+# Prices come from cost_rollers. Given a bearing, the unit price splits into a
+# pipe part + shaft part + bearing, so each bearing branch has an exact lower
+# bound (cheapest fitting pipe + cheapest allowed shaft). Branches are visited
+# cheapest bound first and stop once a bound exceeds the top-N price found;
+# a visited branch is costed as one vectorized pipe × shaft batch.
+
+import numpy as np
+import pandas as pd
+
+from cadai_bearings import MARKET_SHAFT_SIZES, get_catalog, recommend_shaft
+from cadai_costing import (
+    CARRYING, IMPACT, cost_rollers, effective_shaft_dia, face_width_from_belt_width, pipe_weight, shaft_weight,
+)
+from cadai_pricebook import default_constants
+from cadai_schedule import SHAFT_ALLOWANCE
+
+PIPE_DIAS = np.array([63.5, 76, 89, 102, 108, 114, 127, 133, 140, 152, 159, 165, 194], dtype=float)
+PIPE_THKS = np.array([2.9, 3.2, 3.6, 4.0, 4.5, 4.8, 5.4, 6.0, 6.3], dtype=float)
+
+SERVICE_FACTOR = 1.5          # bearing dynamic rating / load per bearing
+SHAFT_STRESS_MPA = 80.0       # allowable bending stress at the bearing seat
+HOUSING_WALL = 4.0            # mm of housing each side of the bearing OD
+TOP = 10
+
+DESIGN_COLUMNS = [
+    "BEARING", "BORE", "DYN_LOAD_KN", "PIPE DIA", "PIPE THK", "FACE WIDTH", "SHAFT DIA", "SHAFT LENGTH",
+    "WT", "UNIT_CP", "UNIT_PRICE",
+]
+
+
+# ================== RULES ==================
+def shaft_stress(shaft_dia, load_kn, overhang):
+    """Bending stress (MPa) at the bearing seat for a roller load (kN) shared by two bearings."""
+    d = np.asarray(shaft_dia, dtype=float)
+    moment = load_kn * 1000 / 2 * overhang          # N·mm
+    return 32 * moment / (np.pi * d ** 3)
+
+
+def _bearings(catalog, bearing, load_kn):
+    """Candidate catalog rows: one SKU, one series or all, with enough rated load."""
+    if bearing is None:
+        rows = np.arange(len(catalog))
+    elif bearing in catalog.series:
+        rows = np.asarray(catalog.series[bearing])
+    elif catalog.contains(bearing):
+        return np.asarray([catalog.rows(bearing)])  # an explicit SKU is kept even if unrated
+    else:
+        raise ValueError(f"Unknown bearing or series: {bearing}")
+    if load_kn <= 0:
+        return rows
+    return rows[catalog.load[rows] >= SERVICE_FACTOR * load_kn / 2]
+
+
+# ================== SEARCH ==================
+def solve(belt_width, load_kn, roller_type=CARRYING, constants=None, bearing=None,
+          pipe_dias=PIPE_DIAS, pipe_thks=PIPE_THKS, shaft_sizes=MARKET_SHAFT_SIZES, top=TOP):
+    """Cheapest `top` designs by unit price.
+
+    Returns {"designs": DataFrame (DESIGN_COLUMNS, cheapest first), "combinations":
+    size of the design space, "evaluated": combinations costed, "branches":
+    bearings searched, "pruned": bearings skipped on their bound}.
+    """
+    catalog = get_catalog()
+    constants = {**default_constants(), **(constants or {})}
+    face_width = float(face_width_from_belt_width(belt_width))
+    shaft_len = face_width + SHAFT_ALLOWANCE
+
+    D, T = (a.ravel() for a in np.meshgrid(np.asarray(pipe_dias, float), np.asarray(pipe_thks, float), indexing="ij"))
+    ok = T * 2 < D
+    D, T = D[ok], T[ok]
+    shafts = np.asarray(shaft_sizes, dtype=float)
+    rows = _bearings(catalog, bearing, load_kn)
+
+    # separable parts of the unit cost (before markup), same formulas as cost_rollers
+    steel = constants["STEEL_COST"]
+    pipe_part = steel * pipe_weight(D, T, face_width) + D / 2
+    shaft_eff = effective_shaft_dia(shafts, roller_type == IMPACT)
+    shaft_part = steel * shaft_weight(shaft_eff, shaft_len)
+    strong = shaft_stress(shafts, load_kn, SHAFT_ALLOWANCE / 2) <= SHAFT_STRESS_MPA
+    bearing_cost = catalog.pair_cost(catalog.sku[rows], constants["BEARING_COST_PAIR"])
+    # the rest (seal, welding, extras, rubber rings, brackets) is the same for every candidate
+    probe = cost_rollers(D[0], T[0], face_width, shafts[0], shaft_len, roller_type, 1, {**constants, "BEARING_COST_PAIR": 0.0})
+    fixed = float(probe["unit_cp"]) - pipe_part[0] - shaft_part[0]
+
+    branches = []
+    for k, row in enumerate(rows):
+        od = catalog.df["OD"].iat[row]
+        fits = np.isnan(od) | (D - 2 * T >= od + 2 * HOUSING_WALL)
+        allowed = strong & (shafts >= recommend_shaft(catalog.bore[row]))
+        if fits.any() and allowed.any():
+            bound = (pipe_part[fits].min() + shaft_part[allowed].min() + bearing_cost[k] + fixed) * constants["MARKUP"]
+            branches.append((bound, k, row, np.flatnonzero(fits), np.flatnonzero(allowed)))
+    branches.sort(key=lambda b: (b[0], b[1]))
+
+    best_price = np.empty(0)
+    best = {}
+    evaluated = pruned = 0
+    for n, (bound, k, row, pipes, sizes) in enumerate(branches):
+        if len(best_price) >= top and bound > best_price[-1] + 1e-9:
+            pruned = len(branches) - n
+            break
+        p, s = (a.ravel() for a in np.meshgrid(pipes, sizes, indexing="ij"))
+        res = cost_rollers(
+            D[p], T[p], face_width, shafts[s], shaft_len, roller_type, 1,
+            {**constants, "BEARING_COST_PAIR": bearing_cost[k]},
+        )
+        evaluated += len(p)
+        batch = {
+            "BEARING": np.full(len(p), catalog.sku[row]), "BORE": np.full(len(p), catalog.bore[row]),
+            "DYN_LOAD_KN": np.full(len(p), catalog.load[row]),
+            "PIPE DIA": D[p], "PIPE THK": T[p], "FACE WIDTH": np.full(len(p), face_width),
+            "SHAFT DIA": shafts[s], "SHAFT LENGTH": np.full(len(p), shaft_len),
+            "WT": res["weight"], "UNIT_CP": res["unit_cp"], "UNIT_PRICE": res["unit_price"],
+        }
+        merged = {c: np.concatenate([best[c], batch[c]]) if best else batch[c] for c in DESIGN_COLUMNS}
+        order = np.argsort(merged["UNIT_PRICE"], kind="stable")[:top]
+        best = {c: v[order] for c, v in merged.items()}
+        best_price = best["UNIT_PRICE"]
+
+    designs = pd.DataFrame(best or {c: [] for c in DESIGN_COLUMNS}, columns=DESIGN_COLUMNS)
+    for col in ["FACE WIDTH", "SHAFT LENGTH"]:
+        designs[col] = designs[col].round(2)
+    designs["WT"] = designs["WT"].round(3)
+    designs[["UNIT_CP", "UNIT_PRICE"]] = designs[["UNIT_CP", "UNIT_PRICE"]].round(2)
+    return {
+        "designs": designs,
+        "combinations": len(D) * len(shafts) * len(rows),
+        "evaluated": evaluated,
+        "branches": len(branches),
+        "pruned": pruned,
+    }
@@ -1,5 +1,8 @@
 import streamlit as st
-import pandas as pd
+
+from cadai_catalog import PriceCatalog, get_catalog
+from cadai_chatlog import ChatLog, ProjectSummary
+from cadai_items import ItemReadError, unique_items
 
 # ---------------------------
 # STREAMLIT SETUP
@@ -18,45 +21,100 @@ if "module_prices" not in st.session_state:
     st.session_state.module_prices = {}
 if "excel_uploaded" not in st.session_state:
     st.session_state.excel_uploaded = False
-if "chat_messages" not in st.session_state:
-    st.session_state.chat_messages = [{"role":"ai","text":"Hi! Upload your technical Excel and I will ask for part prices one by one."}]
+if "summary" not in st.session_state:
+    st.session_state.summary = ProjectSummary()
+if "chat_log" not in st.session_state:
+    st.session_state.chat_log = ChatLog()
+    st.session_state.chat_log.append("ai", "Hi! Upload your technical Excel and I will ask for part prices one by one.")
+
+
+def _set_price(module, price):
+    st.session_state.module_prices[module] = price
+    st.session_state.summary.add(module, price)
+
 
 # ---------------------------
 # DISPLAY CHAT
 # ---------------------------
-for msg in st.session_state.chat_messages:
+def _show(msg):
     if msg["role"] == "ai":
         st.markdown(f"**CADAi:** {msg['text']}")
     else:
         st.markdown(f"**You:** {msg['text']}")
 
+
+# Only the newest messages are drawn each rerun; older ones a page at a time on request
+log = st.session_state.chat_log
+if log.archive:
+    if st.toggle(f"Show {len(log) - len(log.tail)} earlier messages", key="show_history"):
+        if log.dropped:
+            st.caption(f"{log.dropped} oldest messages are no longer kept.")
+        page = st.number_input("Page", min_value=1, max_value=log.pages(), value=log.pages(), key="history_page")
+        with st.container(border=True):
+            for msg in log.page(int(page)):
+                _show(msg)
+for msg in log.tail:
+    _show(msg)
+
 # ---------------------------
 # EXCEL UPLOADER
 # ---------------------------
+catalog_file = st.file_uploader("Price catalog (optional, ITEM / PRICE columns)", type=["csv", "xlsx"])
 uploaded_file = st.file_uploader("Upload your technical Excel file", type=["xlsx"])
 if uploaded_file and not st.session_state.excel_uploaded:
-    df = pd.read_excel(uploaded_file)
+    # Stream just the 'Item' column (cadai_items) instead of reading the whole sheet
+    bar = st.progress(0.0, text="Reading Excel...")
 
-    # Extract module names from 'Item' column
-    if "Item" not in df.columns:
-        st.session_state.chat_messages.append({"role":"ai","text":"❌ Excel must have a column named 'Item'!"})
-    else:
-        modules_list = df["Item"].dropna().unique().tolist()
-        st.session_state.modules = modules_list
+    def _progress(done, total):
+        if total:
+            bar.progress(min(done / total, 1.0), text=f"Reading Excel... {done:,} rows")
+
+    try:
+        modules_list = unique_items(uploaded_file, progress=_progress)
+    except ItemReadError as e:
+        modules_list = None
+        log.append("ai", f"❌ {e}")
+    bar.empty()
+
+    catalog = get_catalog()
+    if catalog_file is not None:
+        try:
+            catalog = PriceCatalog.from_file(catalog_file)
+        except ValueError as e:
+            log.append("ai", f"⚠️ Price catalog ignored: {e}")
+
+    if modules_list is not None:
+        modules_list = [str(m) for m in modules_list]
         st.session_state.excel_uploaded = True
-        st.session_state.chat_messages.append({"role":"ai","text":f"✅ Excel received. I found {len(modules_list)} modules: {', '.join(modules_list)}"})
-        st.session_state.chat_messages.append({"role":"ai","text":f"Let's start! What is the price of '{st.session_state.modules[0]}'?"})
+        log.append("ai", f"✅ Excel received. I found {len(modules_list)} modules: {', '.join(modules_list)}")
+
+        # Price every module the catalog knows in one batch; only the rest go through the chat
+        priced, pending = catalog.price_all(modules_list)
+        for mod, hit in priced.items():
+            _set_price(mod, hit["PRICE"])
+        st.session_state.modules = pending
+        if priced:
+            filled_text = f"📒 Filled {len(priced)} of {len(modules_list)} prices from the catalog:\n\n"
+            for mod, hit in priced.items():
+                note = "" if hit["HOW"] == "exact" else f" (matched '{hit['MATCH']}')"
+                filled_text += f"- {mod}: ₹{hit['PRICE']:.2f}{note}\n"
+            log.append("ai", filled_text)
+
+        if pending:
+            log.append("ai", f"Let's start! What is the price of '{pending[0]}'?")
+        else:
+            log.append("ai", st.session_state.summary.text())
 
-    st.experimental_rerun()
+    st.rerun()
 
 # ---------------------------
 # USER INPUT
 # ---------------------------
-user_input = st.text_input("Type here...", key="chat_input")
+user_input = st.chat_input("Type here...")
 
 if user_input:
     # Save user message
-    st.session_state.chat_messages.append({"role":"user","text":user_input})
+    log.append("user", user_input)
 
     # If we are in the module price flow
     if st.session_state.excel_uploaded and st.session_state.current_index < len(st.session_state.modules):
@@ -64,28 +122,22 @@ if user_input:
         try:
             price = float(user_input.strip())
         except ValueError:
-            st.session_state.chat_messages.append({"role":"ai","text":"⚠️ Please enter a numeric price."})
-            st.experimental_rerun()
+            log.append("ai", "⚠️ Please enter a numeric price.")
+            st.rerun()
 
         # Save price
-        st.session_state.module_prices[module_name] = price
+        _set_price(module_name, price)
         st.session_state.current_index += 1
 
         # Ask next module or finish
         if st.session_state.current_index < len(st.session_state.modules):
             next_module = st.session_state.modules[st.session_state.current_index]
-            st.session_state.chat_messages.append({"role":"ai","text":f"Next, what is the price of '{next_module}'?"})
+            log.append("ai", f"Next, what is the price of '{next_module}'?")
         else:
-            total = sum(st.session_state.module_prices.values())
-            summary_text = "**✅ All module prices entered!**\n\n"
-            for mod, pr in st.session_state.module_prices.items():
-                summary_text += f"- {mod}: ₹{pr:.2f}\n"
-            summary_text += f"\n**Total Project Cost: ₹{total:.2f}**"
-            st.session_state.chat_messages.append({"role":"ai","text":summary_text})
+            log.append("ai", st.session_state.summary.text())
 
     else:
-        st.session_state.chat_messages.append({"role":"ai","text":"Upload Excel first and I will guide you through the modules."})
+        log.append("ai", "Upload Excel first and I will guide you through the modules.")
 
-    # Clear input and rerun to refresh chat
-    st.session_state.chat_input = ""
-    st.experimental_rerun()
\ No newline at end of file
+    # Rerun to refresh chat (chat_input clears itself)
+    st.rerun()
\ No newline at end of file
@@ -0,0 +1,184 @@
+# cadai_export.py
+# Excel export — workbooks are built only when a download is requested and
+# memoized on a content hash of the costing rows.
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from io import BytesIO
+
+import pandas as pd
+import xlsxwriter
+
+from cadai_lookup import FRAME_FAMILY
+from cadai_tables import FAB_ROWS, fab_total_wt
+
+CACHE_SIZE = 32               # workbooks kept per process
+
+ROLLER_COLUMNS = [
+    "LINE", "ROLLER", "WT", "QTY", "QTY TYPE", "ROLLER QTY", "UNIT_CP", "UNIT_PRICE", "TOTAL_PRICE",
+    "BEARING", "BEARING COST", "FIXED COST", "RUBBER QTY", "RUBBER COST", "SHAFT DIA (EFFECTIVE)",
+]
+FRAME_COLUMNS = [
+    "ROLLER LINE", "ROLLER", "BELT WIDTH", "FRAME WT", "FRAME UNIT PRICE", "FRAME TOTAL PRICE", "FRAME QTY (SET)",
+]
+MONEY_COLUMNS = {
+    "UNIT_CP", "UNIT_PRICE", "TOTAL_PRICE", "BEARING COST", "FIXED COST", "RUBBER COST",
+    "FRAME UNIT PRICE", "FRAME TOTAL PRICE",
+}
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+# ================== HASH ==================
+def rows_hash(rows):
+    """Stable content hash of a list of costing row dicts."""
+    h = hashlib.sha1()
+    for row in rows:
+        h.update(json.dumps(row, sort_keys=True, default=str).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+# ================== WORKBOOKS ==================
+def _build_excel(rows, sheet_name, engine):
+    buf = BytesIO()
+    with pd.ExcelWriter(buf, engine=engine) as w:
+        pd.DataFrame(rows).to_excel(w, index=False, sheet_name=sheet_name)
+    return buf.getvalue()
+
+
+def _memoized(key, build):
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    data = build()
+
+    with _lock:
+        _cache[key] = data
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return data
+
+
+def excel_bytes(rows, sheet_name="Sheet1", engine="xlsxwriter"):
+    """Workbook bytes for `rows`; rebuilt only when the rows actually change."""
+    key = (rows_hash(rows), sheet_name, engine)
+    return _memoized(key, lambda: _build_excel(rows, sheet_name, engine))
+
+
+def lazy_excel(rows, sheet_name="Sheet1", engine="xlsxwriter"):
+    """Zero-argument callable for st.download_button(data=...).
+
+    Streamlit only calls it when the user clicks download, so reruns that
+    merely redraw the button cost nothing.
+    """
+    snapshot = list(rows)
+    return lambda: excel_bytes(snapshot, sheet_name, engine)
+
+
+# ================== STREAMED QUOTE WORKBOOK ==================
+class QuoteTotals:
+    """Running totals collected while rows stream past (nothing is kept per row)."""
+
+    def __init__(self):
+        self.roller_price = defaultdict(float)
+        self.frame_price = defaultdict(float)
+        self.roller_takeoff = defaultdict(lambda: defaultdict(float))
+        self.frame_takeoff = defaultdict(lambda: defaultdict(float))
+
+    def add_roller(self, row):
+        roller = row.get("ROLLER", "")
+        n = float(row.get("ROLLER QTY", row.get("QTY", 0)) or 0)
+        t = self.roller_takeoff[roller]
+        t["LINES"] += 1
+        t["ROLLERS"] += n
+        t["STEEL (KG)"] += float(row.get("WT", 0) or 0) * n
+        t["BEARING PAIRS"] += n
+        t["SEALS"] += n
+        t["RUBBER RINGS"] += float(row.get("RUBBER QTY", 0) or 0) * n
+        self.roller_price[roller] += float(row.get("TOTAL_PRICE", 0) or 0)
+
+    def add_frame(self, row):
+        roller = row.get("ROLLER", "")
+        bw = row.get("BELT WIDTH")
+        n = float(row.get("FRAME QTY (SET)", 0) or 0)
+        wt = row.get("FRAME WT")
+        family = FRAME_FAMILY.get(roller)
+        if wt is None and family and bw in FAB_ROWS.get(family, {}):
+            wt = fab_total_wt(family, bw)
+        t = self.frame_takeoff[(roller, bw)]
+        t["FRAMES"] += n
+        t["STEEL (KG)"] += float(wt or 0) * n
+        self.frame_price[roller] += float(row.get("FRAME TOTAL PRICE", 0) or 0)
+
+
+def _stream_sheet(ws, columns, rows, header_fmt, money_fmt, on_row):
+    ws.write_row(0, 0, columns, header_fmt)
+    r = 0
+    for r, row in enumerate(rows, start=1):
+        for c, col in enumerate(columns):
+            v = row.get(col)
+            if v is None:
+                continue
+            if col in MONEY_COLUMNS:
+                ws.write_number(r, c, float(v), money_fmt)
+            else:
+                ws.write(r, c, v.item() if hasattr(v, "item") else v)
+        on_row(row)
+    return r
+
+
+def write_quote_workbook(out, roller_rows, frame_rows=()):
+    """Stream one quote workbook (ROLLERS, FRAMES, TOTALS, MATERIAL TAKEOFF) to `out`.
+
+    `out` is a path or binary file object. roller_rows / frame_rows can be any
+    iterables (generators, DB cursors); xlsxwriter's constant_memory mode
+    flushes each row to disk as it is written, so memory stays bounded
+    whatever the row count. Returns the QuoteTotals gathered on the way.
+    """
+    totals = QuoteTotals()
+    wb = xlsxwriter.Workbook(out, {"constant_memory": True})
+    try:
+        header = wb.add_format({"bold": True, "bg_color": "#DDEBF7"})
+        money = wb.add_format({"num_format": "#,##0.00"})
+        ws_roll = wb.add_worksheet("ROLLERS")
+        ws_frame = wb.add_worksheet("FRAMES")
+        ws_tot = wb.add_worksheet("TOTALS")
+        ws_mto = wb.add_worksheet("MATERIAL TAKEOFF")
+
+        _stream_sheet(ws_roll, ROLLER_COLUMNS, roller_rows, header, money, totals.add_roller)
+        _stream_sheet(ws_frame, FRAME_COLUMNS, frame_rows, header, money, totals.add_frame)
+
+        # --- TOTALS ---
+        ws_tot.write_row(0, 0, ["ROLLER", "ROLLER TOTAL PRICE", "FRAME TOTAL PRICE", "TOTAL (ROLLER + FRAME)"], header)
+        r = 0
+        for r, roller in enumerate(sorted(set(totals.roller_price) | set(totals.frame_price)), start=1):
+            rp, fp = totals.roller_price.get(roller, 0.0), totals.frame_price.get(roller, 0.0)
+            ws_tot.write(r, 0, roller)
+            ws_tot.write_row(r, 1, [rp, fp, rp + fp], money)
+        rp, fp = sum(totals.roller_price.values()), sum(totals.frame_price.values())
+        ws_tot.write(r + 1, 0, "GRAND TOTAL", header)
+        ws_tot.write_row(r + 1, 1, [rp, fp, rp + fp], money)
+
+        # --- MATERIAL TAKEOFF ---
+        roller_cols = ["LINES", "ROLLERS", "STEEL (KG)", "BEARING PAIRS", "SEALS", "RUBBER RINGS"]
+        ws_mto.write_row(0, 0, ["ROLLER"] + roller_cols, header)
+        r = 0
+        for r, (roller, t) in enumerate(sorted(totals.roller_takeoff.items()), start=1):
+            ws_mto.write(r, 0, roller)
+            ws_mto.write_row(r, 1, [round(t[c], 3) for c in roller_cols])
+        r += 2
+        ws_mto.write_row(r, 0, ["FRAME", "BELT WIDTH", "FRAMES", "STEEL (KG)"], header)
+        for (roller, bw), t in sorted(totals.frame_takeoff.items(), key=lambda kv: (kv[0][0], kv[0][1] or 0)):
+            r += 1
+            ws_mto.write(r, 0, roller)
+            ws_mto.write(r, 1, bw)
+            ws_mto.write_row(r, 2, [t["FRAMES"], round(t["STEEL (KG)"], 3)])
+    finally:
+        wb.close()
+    return totals
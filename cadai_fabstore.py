@@ -0,0 +1,163 @@
+# cadai_fabstore.py
+# Columnar fabrication table store — every frame's fabrication rows in one
+# memory-mapped NumPy file, keyed by (family, belt width).
+#
+#   data/fab_rows.csv                 editable source (FAMILY, BELT WIDTH + FAB_COLUMNS)
+#   <cache>/fab_rows-<hash>.npy       rows as a structured array, sorted by (family, bw)
+#   <cache>/fab_index-<hash>.npy      (family, bw) -> [start, stop) + TOTAL WT
+#
+# The .npy pair is compiled from the CSV on first use and named after the CSV's
+# content hash, so an edited CSV simply compiles a new pair. Only the small
+# index is read eagerly; the rows are mapped read-only (one copy in the page
+# cache for every process) and a width's slice is only touched when that
+# table is asked for.
+#
+# Files: $CADAI_FAB_SOURCE (default data/fab_rows.csv), $CADAI_FAB_CACHE
+# (default data/fab_store/).
+
+import glob
+import hashlib
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FAB_SOURCE = os.environ.get("CADAI_FAB_SOURCE", os.path.join(ROOT, "data", "fab_rows.csv"))
+FAB_CACHE = os.environ.get("CADAI_FAB_CACHE", os.path.join(ROOT, "data", "fab_store"))
+
+FAB_COLUMNS = ["DESCRIPTION", "SECTION", "SIZE", "WT/M", "LENGTH", "QTY", "TOTAL WT"]
+TEXT_COLUMNS = ["DESCRIPTION", "SECTION", "SIZE"]
+KEY_COLUMNS = ["FAMILY", "BELT WIDTH"]
+
+
+# ================== COMPILE ==================
+def _field(col):
+    return col.lower().replace("/", "_").replace(" ", "_")
+
+
+def _text_dtype(values):
+    return f"U{max(1, max((len(v) for v in values), default=1))}"
+
+
+def compile_rows(df):
+    """Source DataFrame -> (rows, index) structured arrays."""
+    df = df.copy()
+    df.columns = [" ".join(str(c).upper().split()) for c in df.columns]
+    missing = [c for c in KEY_COLUMNS + FAB_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Fabrication source missing column(s): {', '.join(missing)}")
+    for col in ["FAMILY"] + TEXT_COLUMNS:
+        df[col] = df[col].fillna("").astype(str).str.strip()
+    df = df.sort_values(KEY_COLUMNS, kind="stable").reset_index(drop=True)
+
+    rows = np.empty(len(df), dtype=[
+        ("family", _text_dtype(df["FAMILY"])), ("belt_width", "i4"),
+        *[(_field(c), _text_dtype(df[c])) for c in TEXT_COLUMNS],
+        ("wt_m", "f8"), ("length", "f8"), ("qty", "i8"), ("total_wt", "f8"),
+    ])
+    rows["family"] = df["FAMILY"].to_numpy()
+    rows["belt_width"] = df["BELT WIDTH"].to_numpy(dtype=int)
+    for col in TEXT_COLUMNS:
+        rows[_field(col)] = df[col].to_numpy()
+    for col in ["WT/M", "LENGTH", "QTY", "TOTAL WT"]:
+        rows[_field(col)] = pd.to_numeric(df[col], errors="raise").to_numpy()
+
+    keys = df["FAMILY"] + "\x1f" + df["BELT WIDTH"].astype(str)
+    starts = np.flatnonzero(np.r_[True, keys.to_numpy()[1:] != keys.to_numpy()[:-1]]) if len(df) else np.array([], int)
+    stops = np.r_[starts[1:], len(df)]
+    index = np.empty(len(starts), dtype=[
+        ("family", rows.dtype["family"]), ("belt_width", "i4"), ("start", "i8"), ("stop", "i8"), ("total_wt", "f8"),
+    ])
+    index["family"] = rows["family"][starts]
+    index["belt_width"] = rows["belt_width"][starts]
+    index["start"], index["stop"] = starts, stops
+    index["total_wt"] = [rows["total_wt"][a:b].sum() for a, b in zip(starts, stops)]
+    return rows, index
+
+
+def _save(path, arr):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, arr)
+    os.replace(tmp, path)
+
+
+def build_store(source=FAB_SOURCE, cache=FAB_CACHE):
+    """Paths of the compiled (rows, index) pair for `source`, compiling it if needed."""
+    with open(source, "rb") as fh:
+        tag = hashlib.sha1(fh.read()).hexdigest()[:12]
+    rows_path = os.path.join(cache, f"fab_rows-{tag}.npy")
+    index_path = os.path.join(cache, f"fab_index-{tag}.npy")
+    if os.path.exists(index_path):     # written last, so the rows are there too
+        return rows_path, index_path
+
+    rows, index = compile_rows(pd.read_csv(source, dtype={"FAMILY": str}))
+    os.makedirs(cache, exist_ok=True)
+    _save(rows_path, rows)
+    _save(index_path, index)
+    for old in glob.glob(os.path.join(cache, "fab_*.npy")):
+        if tag not in os.path.basename(old):
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    return rows_path, index_path
+
+
+# ================== STORE ==================
+class FabStore:
+    """Read-only (family, belt width) -> fabrication rows over a mapped row file."""
+
+    def __init__(self, rows, index):
+        self._rows = rows
+        self._slots = {}
+        self._widths = {}
+        for family, bw, start, stop, total in index.tolist():
+            self._slots[(family, bw)] = (start, stop, total)
+            self._widths.setdefault(family, []).append(bw)
+        self._widths = {f: tuple(sorted(bws)) for f, bws in self._widths.items()}
+
+    @classmethod
+    def open(cls, source=FAB_SOURCE, cache=FAB_CACHE):
+        try:
+            rows_path, index_path = build_store(source, cache)
+        except OSError:
+            # read-only checkout: keep the compiled arrays in memory instead
+            return cls(*compile_rows(pd.read_csv(source, dtype={"FAMILY": str})))
+        return cls(np.load(rows_path, mmap_mode="r"), np.load(index_path))
+
+    def families(self):
+        return list(self._widths)
+
+    def widths(self, family):
+        """Belt widths with a table for `family` (no rows are read)."""
+        return self._widths.get(family, ())
+
+    def has(self, family, bw):
+        return (family, bw) in self._slots
+
+    def total_wt(self, family, bw):
+        """Sum of TOTAL WT (kg), from the index."""
+        return self._slots[(family, bw)][2]
+
+    def _slice(self, family, bw):
+        start, stop, _ = self._slots[(family, bw)]
+        return self._rows[start:stop]
+
+    def rows(self, family, bw):
+        """Raw rows as lists in FAB_COLUMNS order."""
+        part = self._slice(family, bw)
+        return [list(r) for r in zip(*(part[_field(c)].tolist() for c in FAB_COLUMNS))]
+
+    def table(self, family, bw):
+        """New DataFrame of one table (copied out of the mapped file)."""
+        part = self._slice(family, bw)
+        return pd.DataFrame({c: np.array(part[_field(c)]) for c in FAB_COLUMNS})
+
+
+@lru_cache(maxsize=None)
+def get_fab_store(source=FAB_SOURCE, cache=FAB_CACHE):
+    """Process-wide store, opened on first use."""
+    return FabStore.open(source, cache)
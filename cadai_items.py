@@ -0,0 +1,57 @@
+# cadai_items.py
+# Streaming reader for technical Excel sheets — pulls the distinct values of
+# one column (default "Item") without loading the workbook into a DataFrame.
+#
+# openpyxl read-only mode parses the sheet row by row; only the one column is
+# requested from each row and values are de-duplicated as they stream past
+# (first-seen order, like Series.unique()). Memory is the distinct values,
+# capped at MAX_ITEMS, not the sheet.
+
+from openpyxl import load_workbook
+
+ITEM_COLUMN = "Item"
+MAX_ITEMS = 50_000            # distinct values kept before the read is refused
+PROGRESS_EVERY = 5_000        # rows between progress callbacks
+
+
+class ItemReadError(ValueError):
+    """The sheet has no such column, or too many distinct values."""
+
+
+def _header_col(ws, column):
+    header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    for i, name in enumerate(header, start=1):
+        if name is not None and str(name) == column:
+            return i
+    raise ItemReadError(f"Excel must have a column named '{column}'!")
+
+
+def unique_items(source, column=ITEM_COLUMN, progress=None, max_items=MAX_ITEMS):
+    """Distinct non-empty values of `column` on the first sheet, in first-seen order.
+
+    `source` is a path or binary file object (e.g. a Streamlit upload).
+    `progress(rows_done, rows_total)` is called every PROGRESS_EVERY rows;
+    rows_total is None when the sheet does not declare its size.
+    """
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        col = _header_col(ws, column)
+        total = ws.max_row - 1 if ws.max_row else None
+
+        seen, items = set(), []
+        done = 0
+        for (value,) in ws.iter_rows(min_row=2, min_col=col, max_col=col, values_only=True):
+            done += 1
+            if value is not None and value not in seen:
+                if len(items) >= max_items:
+                    raise ItemReadError(f"More than {max_items:,} distinct values in '{column}'")
+                seen.add(value)
+                items.append(value)
+            if progress is not None and done % PROGRESS_EVERY == 0:
+                progress(done, total)
+        if progress is not None:
+            progress(done, done)
+        return items
+    finally:
+        wb.close()
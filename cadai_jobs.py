@@ -0,0 +1,200 @@
+# cadai_jobs.py
+# Background export jobs — quote workbooks are built on a small process-wide
+# worker pool instead of in the Streamlit script thread.
+#
+# A rerun only submits a job (quote id + QuoteStore.version, no line is read)
+# and returns; the worker streams the lines off the store's cursors
+# (iter_rollers / iter_frames) into cadai_export.write_quote_workbook on one of
+# EXPORT_WORKERS threads, which also caps how many builds run at once however
+# many estimators export together. Each session sees its own jobs; the panel
+# polls them while any is pending. Finished bytes are kept until downloaded
+# (plus DOWNLOAD_GRACE) or RESULT_TTL, within MAX_CACHED_BYTES overall.
+#
+# Workers: $CADAI_EXPORT_WORKERS (default 2).
+
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from cadai_export import write_quote_workbook
+from cadai_metrics import timed
+
+EXPORT_WORKERS = int(os.environ.get("CADAI_EXPORT_WORKERS", "2"))
+MAX_QUEUED = 16               # jobs waiting for a worker, all sessions
+MAX_PER_OWNER = 4             # jobs listed per session
+RESULT_TTL = 15 * 60          # s a finished workbook waits to be downloaded
+DOWNLOAD_GRACE = 60           # s kept after the download click
+MAX_CACHED_BYTES = 256 * 2**20
+POLL_SECONDS = 1.0
+
+KINDS = {"rollers": "Roller workbook", "frames": "Frame workbook", "quote": "Quote workbook"}
+PENDING = ("queued", "running")
+
+
+class QueueFull(RuntimeError):
+    """Too many exports waiting; try again shortly."""
+
+
+class Job:
+    """One export: status, progress and (when done) the workbook bytes."""
+
+    def __init__(self, owner, kind, key, file_name, total):
+        self.id = uuid.uuid4().hex[:12]
+        self.owner, self.kind, self.key, self.file_name = owner, kind, key, file_name
+        self.total = total            # rows to write
+        self.done = 0
+        self.status = "queued"
+        self.error = None
+        self.data = None
+        self.created = time.time()
+        self.finished = None
+        self.expires = None
+
+    @property
+    def progress(self):
+        return 1.0 if self.status == "done" else self.done / self.total if self.total else 0.0
+
+    def _count(self, rows):
+        for row in rows:
+            self.done += 1
+            yield row
+
+
+def _build(rollers, frames):
+    with tempfile.TemporaryFile() as fh:
+        write_quote_workbook(fh, rollers, frames)
+        fh.seek(0)
+        return fh.read()
+
+
+# ================== QUEUE ==================
+class JobQueue:
+    """Bounded export pool shared by every session of the process."""
+
+    def __init__(self, workers=EXPORT_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="cadai-export")
+        self._jobs = OrderedDict()    # id -> Job, oldest first
+        self._lock = threading.Lock()
+
+    def submit(self, owner, kind, store, quote_id, file_name="export.xlsx"):
+        """Queue a workbook of one quote's lines in a QuoteStore; returns the Job.
+
+        Only the quote's version is read here; the lines are read by the
+        worker. Resubmitting an unchanged quote returns the existing job
+        instead of building the same workbook twice.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown export kind: {kind}")
+        roller_version, rollers, frame_version, frames = store.version(quote_id)
+        with_rollers, with_frames = kind in ("rollers", "quote"), kind in ("frames", "quote")
+        key = (
+            kind, quote_id,
+            roller_version if with_rollers else None,
+            frame_version if with_frames else None,
+        )
+        total = rollers * with_rollers + frames * with_frames
+
+        with self._lock:
+            self._sweep()
+            for job in self._jobs.values():
+                if job.owner == owner and job.key == key and job.status != "failed":
+                    return job
+            if sum(job.status == "queued" for job in self._jobs.values()) >= MAX_QUEUED:
+                raise QueueFull("Too many exports in progress — try again in a moment.")
+            mine = [job for job in self._jobs.values() if job.owner == owner]
+            for job in mine[:max(0, len(mine) - MAX_PER_OWNER + 1)]:
+                if job.status not in PENDING:
+                    del self._jobs[job.id]
+            job = Job(owner, kind, key, file_name, total)
+            self._jobs[job.id] = job
+
+        self._pool.submit(self._run, job, store, quote_id, with_rollers, with_frames)
+        return job
+
+    def _run(self, job, store, quote_id, with_rollers, with_frames):
+        job.status = "running"
+        try:
+            rollers = store.iter_rollers(quote_id) if with_rollers else ()
+            frames = store.iter_frames(quote_id) if with_frames else ()
+            job.data = timed(f"export_{job.kind}", _build)(job._count(rollers), job._count(frames))
+        except Exception as e:  # reported in the panel, never raised into a rerun
+            job.error = str(e) or type(e).__name__
+            job.status = "failed"
+        else:
+            job.status = "done"
+        job.finished = time.time()
+        job.expires = job.finished + RESULT_TTL
+
+    def _sweep(self):
+        """Drop expired results, then the oldest finished ones past MAX_CACHED_BYTES (lock held)."""
+        now = time.time()
+        for job in list(self._jobs.values()):
+            if job.expires is not None and job.expires < now:
+                del self._jobs[job.id]
+        held = sum(len(job.data) for job in self._jobs.values() if job.data)
+        for job in list(self._jobs.values()):
+            if held <= MAX_CACHED_BYTES:
+                break
+            if job.data:
+                held -= len(job.data)
+                del self._jobs[job.id]
+
+    def jobs(self, owner):
+        """This session's jobs, newest first."""
+        with self._lock:
+            self._sweep()
+            return [job for job in reversed(self._jobs.values()) if job.owner == owner]
+
+    def downloaded(self, job_id):
+        """Download clicked: keep the bytes only for DOWNLOAD_GRACE more seconds."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.expires is not None:
+                job.expires = min(job.expires, time.time() + DOWNLOAD_GRACE)
+
+    def discard(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status not in PENDING:
+                del self._jobs[job_id]
+
+
+@lru_cache(maxsize=None)
+def get_job_queue():
+    """Process-wide queue (one worker pool for every session)."""
+    return JobQueue()
+
+
+# ================== PANEL ==================
+def render_jobs(st, owner, queue=None):
+    """Export status for one session; reruns itself every POLL_SECONDS while a job is pending."""
+    queue = queue or get_job_queue()
+    polling = any(job.status in PENDING for job in queue.jobs(owner))
+
+    @st.fragment(run_every=POLL_SECONDS if polling else None)
+    def _panel():
+        jobs = queue.jobs(owner)
+        for job in jobs:
+            label = f"{KINDS[job.kind]} · {job.total:,} lines"
+            if job.status == "queued":
+                st.caption(f"⏳ {label} — waiting for a worker")
+            elif job.status == "running":
+                st.progress(job.progress, text=f"{label} — {job.done:,} / {job.total:,}")
+            elif job.status == "failed":
+                c1, c2 = st.columns([4, 1])
+                c1.error(f"{label} failed: {job.error}")
+                c2.button("Dismiss", key=f"job_dismiss_{job.id}", on_click=queue.discard, args=(job.id,))
+            else:
+                st.download_button(
+                    f"Download {KINDS[job.kind]}", job.data, job.file_name,
+                    key=f"job_download_{job.id}", on_click=queue.downloaded, args=(job.id,),
+                )
+        if polling and not any(job.status in PENDING for job in jobs):
+            st.rerun()            # last job finished: redraw the page once and stop polling
+
+    _panel()
@@ -0,0 +1,114 @@
+# cadai_lookup.py
+# Sorted-array indexes over the belt-width / frame tables.
+#
+# Every query is a bisect (np.searchsorted), and every query accepts either a
+# scalar (returns a plain Python number) or an array (returns an array), so a
+# whole column of roller weights maps to belt widths in one call.
+
+import numpy as np
+
+from cadai_tables import DEFAULT_BW, FRAME_WT, ROLLER_WT_TO_BW
+
+
+def _out(result, scalar):
+    return result.item() if scalar else result
+
+
+# ================== BAND INDEX ==================
+class BandIndex:
+    """Half-open bands [low, high) -> value; `default` outside every band."""
+
+    def __init__(self, bands, default):
+        bands = sorted(bands)
+        self.lows = np.array([b[0] for b in bands], dtype=float)
+        self.highs = np.array([b[1] for b in bands], dtype=float)
+        self.values = np.array([b[2] for b in bands])
+        self.default = default
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=float)
+        i = np.searchsorted(self.lows, x, side="right") - 1
+        j = np.clip(i, 0, len(self.lows) - 1)
+        inside = (i >= 0) & (x < self.highs[j])
+        return _out(np.where(inside, self.values[j], self.default), x.ndim == 0)
+
+
+# ================== TABLE INDEX ==================
+class TableIndex:
+    """{key: value} table with exact, nearest-key and nearest-value queries.
+
+    Ties resolve to the smaller key / value, like min() over the dict did.
+    """
+
+    def __init__(self, mapping):
+        self.keys = np.array(sorted(mapping))
+        self.values = np.array([mapping[k] for k in self.keys], dtype=float)
+        by_value = np.argsort(self.values, kind="stable")
+        self._sorted_values = self.values[by_value]
+        self._keys_by_value = self.keys[by_value]
+
+    @staticmethod
+    def _nearest(sorted_arr, x):
+        i = np.clip(np.searchsorted(sorted_arr, x), 1, len(sorted_arr) - 1)
+        left, right = sorted_arr[i - 1], sorted_arr[i]
+        return np.where(np.abs(right - x) < np.abs(x - left), i, i - 1)
+
+    def get(self, key, default=np.nan):
+        """Value for an exact key, `default` where the key is missing."""
+        key = np.asarray(key)
+        i = np.clip(np.searchsorted(self.keys, key), 0, len(self.keys) - 1)
+        found = self.keys[i] == key
+        return _out(np.where(found, self.values[i], default), key.ndim == 0)
+
+    def contains(self, key):
+        key = np.asarray(key)
+        i = np.clip(np.searchsorted(self.keys, key), 0, len(self.keys) - 1)
+        return _out(self.keys[i] == key, key.ndim == 0)
+
+    def nearest_key(self, x):
+        """Closest key to x (e.g. nearest available belt width)."""
+        x = np.asarray(x, dtype=float)
+        if len(self.keys) == 1:
+            return _out(np.full(x.shape, self.keys[0]), x.ndim == 0)
+        return _out(self.keys[self._nearest(self.keys.astype(float), x)], x.ndim == 0)
+
+    def nearest_by_value(self, x):
+        """Key whose value is closest to x (e.g. belt width for a weight)."""
+        x = np.asarray(x, dtype=float)
+        if len(self.keys) == 1:
+            return _out(np.full(x.shape, self.keys[0]), x.ndim == 0)
+        return _out(self._keys_by_value[self._nearest(self._sorted_values, x)], x.ndim == 0)
+
+
+# ================== ROLLER → FRAME FAMILY ==================
+FRAME_FAMILY = {
+    "Carrying Idler With Frame": "CARRYING",
+    "SARI": "SARI",
+    "SARI (N-6012)": "SARI_N",
+    "SACI": "SACI",
+}
+
+
+# ================== SHARED INDEXES ==================
+ROLLER_BW = BandIndex(ROLLER_WT_TO_BW, DEFAULT_BW)
+FRAME_WT_INDEX = {family: TableIndex(table) for family, table in FRAME_WT.items()}
+
+
+def get_frame_bw_from_roller_wt(roller_wt):
+    """Map roller weight (kg) to a belt width (mm); scalar or array."""
+    return ROLLER_BW(roller_wt)
+
+
+def frame_bw(family, roller_wt):
+    """Belt width for a frame family, snapped to the nearest width the family has."""
+    bw = ROLLER_BW(roller_wt)
+    index = FRAME_WT_INDEX[family]
+    has = index.contains(bw)
+    if np.all(has):
+        return bw
+    return _out(np.where(has, bw, index.nearest_key(bw)), np.ndim(bw) == 0)
+
+
+def frame_wt(family, bw, default=np.nan):
+    """Reference frame weight (kg) for a family at belt width(s)."""
+    return FRAME_WT_INDEX[family].get(bw, default)
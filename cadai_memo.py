@@ -0,0 +1,167 @@
+# cadai_memo.py
+# Process-wide memoization of roller / frame costing — identical specs priced
+# again (other sessions, input-stage reruns, re-uploaded schedules, repeated API
+# batches) come from a bounded LRU instead of the engine.
+#
+# Keys are a normalized spec plus constants_version(constants), so editing any
+# constant simply misses; stale entries age out of the LRU.
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from cadai_costing import cost_frames, cost_rollers
+
+ROLLER_MEMO_SIZE = 4096       # single-line entries
+FRAME_MEMO_SIZE = 1024
+SCHEDULE_MEMO_ROWS = 100_000  # costed schedule rows kept (whole chunks)
+SPEC_DECIMALS = 3             # mm / kg inputs are compared at this precision
+
+
+# ================== LRU ==================
+class CostMemo:
+    """Thread-safe LRU with hit/miss counters, bounded by entries and/or total weight."""
+
+    def __init__(self, name, max_entries=None, max_weight=None, weigh=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.weigh = weigh or (lambda value: 1)
+        self.hits = self.misses = self.evictions = 0
+        self.weight = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+            self.misses += 1
+
+        value = build()
+        size = self.weigh(value)
+        if self.max_weight is not None and size > self.max_weight:
+            return value
+
+        with self._lock:
+            if key not in self._data:
+                self._data[key] = (value, size)
+                self.weight += size
+            while (self.max_entries is not None and len(self._data) > self.max_entries) or (
+                self.max_weight is not None and self.weight > self.max_weight
+            ):
+                _, (_, old) = self._data.popitem(last=False)
+                self.weight -= old
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+
+    def stats(self):
+        calls = self.hits + self.misses
+        return {
+            "CACHE": self.name,
+            "ENTRIES": len(self._data),
+            "HITS": self.hits,
+            "MISSES": self.misses,
+            "HIT RATE": round(self.hits / calls, 3) if calls else 0.0,
+            "EVICTIONS": self.evictions,
+            "SIZE": self.weight,
+        }
+
+
+ROLLER_MEMO = CostMemo("roller", max_entries=ROLLER_MEMO_SIZE)
+FRAME_MEMO = CostMemo("frame", max_entries=FRAME_MEMO_SIZE)
+SCHEDULE_MEMO = CostMemo("schedule rows", max_weight=SCHEDULE_MEMO_ROWS, weigh=len)
+
+
+def memo_stats():
+    """Rows for the diagnostics sidebar."""
+    return [m.stats() for m in (ROLLER_MEMO, FRAME_MEMO, SCHEDULE_MEMO)]
+
+
+# ================== KEYS ==================
+def _digest(*arrays):
+    h = hashlib.sha1()
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(str((a.dtype, a.shape)).encode())
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+
+def constants_version(constants):
+    """Hashable version of a constants dict (changes whenever any value does).
+
+    Not sorted: the app always builds constants in DEFAULT_CONSTANTS order, and
+    a different order only costs a miss.
+    """
+    return tuple((k, v if np.isscalar(v) else _digest(v)) for k, v in constants.items())
+
+
+def _num(x):
+    return round(float(x), SPEC_DECIMALS)
+
+
+# ================== ROLLERS ==================
+def cached_cost_roller(pipe_dia, pipe_thk, face_width, shaft_dia, shaft_len, roller_type, qty, constants, **kw):
+    """cost_roller through the LRU.
+
+    The unit result is cached (qty does not change it); totals are scaled
+    here, so 10 and 100 off the same spec share one entry.
+    """
+    key = (
+        _num(pipe_dia), _num(pipe_thk), _num(face_width), _num(shaft_dia), _num(shaft_len), str(roller_type),
+        tuple(sorted(kw.items())), constants_version(constants),
+    )
+    unit = ROLLER_MEMO.get(key, lambda: {
+        k: float(v) for k, v in cost_rollers(
+            pipe_dia, pipe_thk, face_width, shaft_dia, shaft_len, roller_type, 1, constants, **kw
+        ).items()
+    })
+    res = dict(unit)
+    res["total_price"] = unit["unit_price"] * float(qty)
+    return res
+
+
+# ================== SCHEDULE CHUNKS ==================
+def _columns_digest(df, columns):
+    h = hashlib.sha1()
+    for col in columns:
+        values = df[col].to_numpy()
+        h.update(col.encode())
+        if values.dtype.kind in "biuf":
+            h.update(values.astype(float).tobytes())
+        else:
+            h.update("\x1f".join(map(str, values)).encode())
+    return h.hexdigest()
+
+
+def cached_schedule_rows(chunk, columns, constants, build):
+    """Costed rows of a validated schedule chunk, through the LRU.
+
+    Batches are already one vectorized pass; what repricing an identical
+    chunk really skips is building its row dicts. Keyed on a content hash of
+    the chunk's schedule `columns`; callers get their own copies of the rows.
+    """
+    key = (_columns_digest(chunk, columns), constants_version(constants))
+    return [dict(row) for row in SCHEDULE_MEMO.get(key, build)]
+
+
+# ================== FRAMES ==================
+def cached_cost_frame(roller_type, roller_wt, set_qty, constants, frame_wt=None):
+    """Single-frame cost_frames through the LRU; plain floats like cost_roller."""
+    key = (str(roller_type), _num(roller_wt), None if frame_wt is None else _num(frame_wt), constants_version(constants))
+    unit = FRAME_MEMO.get(key, lambda: {
+        k: float(v) for k, v in cost_frames(roller_type, roller_wt, 1, constants, frame_wt=frame_wt).items()
+    })
+    res = dict(unit)
+    res["total_price"] = unit["unit_price"] * float(set_qty)
+    return res
@@ -0,0 +1,296 @@
+# cadai_metrics.py
+# Opt-in rerun instrumentation for the Streamlit stage machine — wall time per
+# section per rerun, rolling p50/p95/p99, optional cProfile / tracemalloc dumps.
+#
+# Environment:
+#   CADAI_METRICS=1              turn timing on (off: every call is a no-op)
+#   CADAI_PROFILE=cprofile|tracemalloc|both
+#                                also profile each rerun and dump to CADAI_METRICS_DIR
+#   CADAI_PROFILE_MIN_MS=250     only dump reruns slower than this (default 0)
+#   CADAI_METRICS_DIR            output dir (default cadai_metrics/ next to this module)
+#
+# Script usage (flat script, so sections are marks rather than `with` blocks):
+#   perf = start_rerun(st.session_state)
+#   perf.mark("setup")
+#   perf.stage("input")          # counted only when "input" is the active stage
+#   ...
+#   perf.finish()
+#
+# st.rerun() ends the script early; that rerun is then closed by the next
+# start_rerun(). Call perf.finish() before st.stop(), so the stopped rerun is
+# closed at once rather than when the next one starts.
+#
+# Work off the script thread (e.g. export builds on the cadai_jobs pool) is
+# timed with timed(name, fn) and shows up as its own section.
+
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from functools import lru_cache
+
+import numpy as np
+
+ENABLED = os.environ.get("CADAI_METRICS", "").lower() in ("1", "true", "yes", "on")
+PROFILE = os.environ.get("CADAI_PROFILE", "").lower()
+PROFILE_MIN_MS = float(os.environ.get("CADAI_PROFILE_MIN_MS", "0") or 0)
+METRICS_DIR = os.environ.get("CADAI_METRICS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cadai_metrics"))
+
+WINDOW = 500                  # samples kept per section for the rolling percentiles
+BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+FLUSH_SECS = 10               # metrics file is rewritten at most this often
+TOP_ALLOCS = 25
+
+RERUN = "rerun"               # whole-script section name
+
+
+# ================== AGGREGATE ==================
+class SectionStats:
+    """Rolling window of durations (ms) plus an all-time bucket histogram."""
+
+    def __init__(self):
+        self.window = deque(maxlen=WINDOW)
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.window.append(ms)
+        self.buckets[int(np.searchsorted(BUCKETS_MS, ms))] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def summary(self):
+        p50, p95, p99 = np.percentile(self.window, [50, 95, 99]) if self.window else (0.0, 0.0, 0.0)
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "histogram": {f"le_{b}": n for b, n in zip(BUCKETS_MS, self.buckets)} | {"le_inf": self.buckets[-1]},
+        }
+
+
+class Metrics:
+    """Process-wide section timings, shared by every session."""
+
+    def __init__(self, out_dir=METRICS_DIR):
+        self.out_dir = out_dir
+        self.sections = {}
+        self.reruns = 0
+        self.interrupted = 0
+        self.started = time.time()
+        self._flushed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, timings, interrupted=False, rerun=True):
+        with self._lock:
+            for name, ms in timings.items():
+                self.sections.setdefault(name, SectionStats()).add(ms)
+            self.reruns += rerun
+            self.interrupted += interrupted
+        if time.monotonic() - self._flushed > FLUSH_SECS:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            sections = {name: s.summary() for name, s in sorted(self.sections.items())}
+            return {
+                "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "reruns": self.reruns,
+                "interrupted": self.interrupted,
+                "sections": sections,
+            }
+
+    def table(self):
+        """Rows for st.dataframe, slowest p95 first."""
+        rows = [
+            {"SECTION": name, "COUNT": s["count"], "P50 MS": round(s["p50_ms"], 2), "P95 MS": round(s["p95_ms"], 2),
+             "P99 MS": round(s["p99_ms"], 2), "MAX MS": round(s["max_ms"], 2)}
+            for name, s in self.snapshot()["sections"].items()
+        ]
+        return sorted(rows, key=lambda r: -r["P95 MS"])
+
+    def flush(self, path=None):
+        """Write the snapshot as JSON (atomic replace); returns the path."""
+        path = path or os.path.join(self.out_dir, "cadai_metrics.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.snapshot(), fh, indent=2)
+        os.replace(tmp, path)
+        self._flushed = time.monotonic()
+        return path
+
+    def reset(self):
+        with self._lock:
+            self.sections.clear()
+            self.reruns = self.interrupted = 0
+            self.started = time.time()
+
+
+@lru_cache(maxsize=None)
+def get_metrics():
+    return Metrics()
+
+
+# ================== PER-RERUN TIMER ==================
+class RerunTimer:
+    """Marks sections of one script run; lives in the session between reruns."""
+
+    def __init__(self, session_state, stage_key="stage"):
+        self.session_state = session_state
+        self.stage_key = stage_key
+        self.t0 = self._last = time.perf_counter()
+        self.timings = {}
+        self.last = {}                # section ms of the previous complete rerun
+        self.peak_kb = None           # tracemalloc peak of this rerun
+        self._open = None             # (name, counted)
+        self._profiler = None
+        self._done = False
+        self._start_profile()
+
+    # ---------- sections ----------
+    def _close(self, now):
+        if self._open is not None:
+            name, counted = self._open
+            if counted:
+                self.timings[name] = self.timings.get(name, 0.0) + (now - self._last) * 1000
+        self._open = None
+        self._last = now
+
+    def mark(self, name):
+        """End the open section and start `name`."""
+        self._close(time.perf_counter())
+        self._open = (name, True)
+
+    def stage(self, name):
+        """Like mark(), but only counted when `name` is the active stage."""
+        self._close(time.perf_counter())
+        self._open = (name, self.session_state.get(self.stage_key) == name)
+
+    # ---------- end ----------
+    def finish(self, interrupted=False):
+        if self._done:
+            return
+        self._done = True
+        now = time.perf_counter()
+        self._close(now)
+        self.timings[RERUN] = (now - self.t0) * 1000
+        self._stop_profile()
+        get_metrics().record(self.timings, interrupted)
+
+    # ---------- profiling ----------
+    def _start_profile(self):
+        if PROFILE in ("cprofile", "both"):
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:        # another profiler already active on this thread
+                self._profiler = None
+        if PROFILE in ("tracemalloc", "both") and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    def _stop_profile(self):
+        slow = self.timings[RERUN] >= PROFILE_MIN_MS
+        label = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.session_state.get(self.stage_key, 'run')}-{os.getpid()}-{id(self) % 10000}"
+        if self._profiler is not None:
+            self._profiler.disable()
+            if slow:
+                os.makedirs(METRICS_DIR, exist_ok=True)
+                self._profiler.dump_stats(os.path.join(METRICS_DIR, f"profile-{label}.prof"))
+        if PROFILE in ("tracemalloc", "both") and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak_kb = peak / 1024
+            if slow:
+                os.makedirs(METRICS_DIR, exist_ok=True)
+                top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCS]
+                with open(os.path.join(METRICS_DIR, f"alloc-{label}.txt"), "w", encoding="utf-8") as fh:
+                    fh.write(f"peak {peak / 2**20:.2f} MB\n")
+                    fh.writelines(f"{stat}\n" for stat in top)
+
+
+class NullTimer:
+    """Instrumentation off: same interface, no work."""
+
+    last = {}
+
+    def mark(self, name):
+        pass
+
+    def stage(self, name):
+        pass
+
+    def finish(self, interrupted=False):
+        pass
+
+
+_NULL = NullTimer()
+
+
+def timed(name, fn):
+    """Wrap `fn` so each call is recorded as section `name` (any thread; as is when timing is off)."""
+    if not ENABLED:
+        return fn
+
+    def run(*args, **kwargs):
+        t = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            get_metrics().record({name: (time.perf_counter() - t) * 1000}, rerun=False)
+    return run
+
+
+def start_rerun(session_state, key="_perf_timer"):
+    """Timer for this script run (closing the previous one if st.rerun()/st.stop() cut it short)."""
+    if not ENABLED:
+        return _NULL
+    prev = session_state.get(key)
+    if prev is not None:
+        # before the new timer exists: its profiler / tracemalloc peak must not be touched by this
+        prev.finish(interrupted=True)
+    timer = RerunTimer(session_state)
+    if prev is not None:
+        timer.last, timer.peak_kb = prev.timings, prev.peak_kb
+    session_state[key] = timer
+    return timer
+
+
+# ================== DIAGNOSTICS PANEL ==================
+def render_sidebar(st, timer):
+    """Hidden diagnostics sidebar (the app shows it for ?diag=1)."""
+    metrics = get_metrics()
+    with st.sidebar:
+        st.subheader("Diagnostics")
+        if not ENABLED:
+            st.caption("Timing is off — start the app with CADAI_METRICS=1.")
+            return
+        snap = metrics.snapshot()
+        st.caption(f"{snap['reruns']} reruns since {snap['since']} ({snap['interrupted']} cut short by st.rerun)")
+        st.caption("export_* sections are workbook builds on the export pool, off the script thread.")
+        st.markdown("**Section latency (rolling)**")
+        st.dataframe(metrics.table(), hide_index=True)
+        if timer.last:
+            st.markdown("**Previous rerun (ms)**")
+            st.dataframe([{"SECTION": k, "MS": round(v, 2)} for k, v in timer.last.items()], hide_index=True)
+        if timer.peak_kb is not None:
+            st.caption(f"Previous rerun peak allocation: {timer.peak_kb / 1024:.1f} MB")
+        if PROFILE:
+            st.caption(f"Profiling: {PROFILE} → {METRICS_DIR}")
+        c1, c2 = st.columns(2)
+        if c1.button("Write file", key="diag_flush"):
+            st.success(metrics.flush())
+        if c2.button("Reset", key="diag_reset"):
+            metrics.reset()
+        st.download_button("metrics.json", lambda: json.dumps(metrics.snapshot(), indent=2), "cadai_metrics.json",
+                           mime="application/json", key="diag_download")
@@ -0,0 +1,125 @@
+# cadai_pricebook.py
+# Price book — rates live in pricebook.toml instead of code, loaded once per
+# process and reloaded when the file's mtime changes.
+#
+# Every caller asks on each rerun / request; that is one os.stat(), the file is
+# only parsed again after it was saved. A broken edit keeps the last good book
+# (see PriceBook.error) so running sessions never lose their rates.
+#
+# File: $CADAI_PRICEBOOK, default pricebook.toml next to this module.
+# Formats: .toml, .json ({section: {key: value}}), .xlsx (SECTION / KEY / VALUE columns).
+
+import json
+import os
+import threading
+import tomllib
+from functools import lru_cache
+from types import MappingProxyType
+
+import pandas as pd
+
+from cadai_costing import DEFAULT_CONSTANTS
+
+PRICEBOOK_PATH = os.environ.get(
+    "CADAI_PRICEBOOK", os.path.join(os.path.dirname(os.path.abspath(__file__)), "pricebook.toml")
+)
+
+# built-in fallbacks, used for any section / key the file leaves out
+BUILTIN = {
+    "constants": dict(DEFAULT_CONSTANTS),
+    "sari": {"STEEL_COST": 70.0, "BEARING_COST_PAIR": 100.0, "SEAL_COST": 30.0, "WELDING_COST": 80.0, "MARKUP": 1.25},
+    "sari_frame": {"RATE": 100.0, "MARKUP": 1.25, "GUIDE_ROLLER": 400.0, "PIVOT_BEARING": 1000.0},
+}
+
+
+# ================== READ ==================
+def _read(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".toml":
+        with open(path, "rb") as fh:
+            return tomllib.load(fh)
+    if ext == ".json":
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    if ext in (".xlsx", ".xls"):
+        df = pd.read_excel(path)
+        df.columns = [str(c).strip().upper() for c in df.columns]
+        book = {}
+        for section, key, value in df[["SECTION", "KEY", "VALUE"]].dropna().itertuples(index=False):
+            book.setdefault(str(section).strip().lower(), {})[str(key).strip().upper()] = value
+        return book
+    raise ValueError(f"Unsupported price book format: {ext}")
+
+
+def parse_book(raw):
+    """Validate a raw book and merge it over BUILTIN (every value a float)."""
+    book = {name: dict(values) for name, values in BUILTIN.items()}
+    for name, values in raw.items():
+        if not isinstance(values, dict):
+            raise ValueError(f"[{name}] must be a table of KEY = number")
+        section = book.setdefault(name, {})
+        for key, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"[{name}] {key} must be a number, got {value!r}")
+            if value < 0:
+                raise ValueError(f"[{name}] {key} must be >= 0")
+            section[key] = float(value)
+    return book
+
+
+# ================== CACHE ==================
+class PriceBook:
+    """Process-wide price book, re-parsed only when the file changes."""
+
+    def __init__(self, path=PRICEBOOK_PATH):
+        self.path = path
+        self.mtime = None
+        self.version = 0
+        self.error = None
+        self._book = MappingProxyType({k: MappingProxyType(v) for k, v in BUILTIN.items()})
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def get(self):
+        """Current book (read-only {section: {key: float}}), reloading if the file changed."""
+        mtime = self._stat()
+        if mtime != self.mtime:
+            with self._lock:
+                if mtime != self.mtime:
+                    self._load(mtime)
+        return self._book
+
+    def _load(self, mtime):
+        self.mtime = mtime
+        if mtime is None:
+            self.error = f"{self.path} not found; using built-in rates"
+            return
+        try:
+            book = parse_book(_read(self.path))
+        except Exception as e:  # keep serving the last good book
+            self.error = f"{os.path.basename(self.path)}: {e}"
+            return
+        self._book = MappingProxyType({k: MappingProxyType(v) for k, v in book.items()})
+        self.version += 1
+        self.error = None
+
+
+@lru_cache(maxsize=None)
+def get_price_book(path=PRICEBOOK_PATH):
+    return PriceBook(path)
+
+
+def section(name):
+    """One section of the current book as a plain dict (safe to modify)."""
+    return dict(get_price_book().get()[name])
+
+
+def default_constants():
+    """Costing constants from the price book, in DEFAULT_CONSTANTS order."""
+    return section("constants")
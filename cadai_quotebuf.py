@@ -0,0 +1,121 @@
+# cadai_quotebuf.py
+# In-session quote buffer for the root app (cadai_web.py): append-only columns,
+# running totals updated on add / delete, and a table view rebuilt only when
+# the lines changed.
+#
+# CADAI.PY/cadai_web.py keeps its lines in the SQLite quote store instead; the
+# store maintains the same totals with triggers (cadai_store.quote_totals).
+
+import pandas as pd
+
+from cadai_lookup import get_frame_bw_from_roller_wt
+
+METRICS = ["LINES", "QTY", "WEIGHT", "TOTAL CP", "TOTAL PRICE"]
+
+
+def _zero():
+    return {"LINES": 0} | dict.fromkeys(METRICS[1:], 0.0)
+
+
+class QuoteBuffer:
+    """Quote lines as append-only columns plus running totals per group.
+
+    Deleting a line only clears its slot (ids stay stable) and subtracts it
+    from the totals, so totals never rescan the lines and frame() only
+    rebuilds after a change.
+    """
+
+    def __init__(self, weight="WT", unit_cp="UNIT_CP", price="TOTAL_PRICE", qty="QTY", group=None):
+        self.keys = {"QTY": qty, "WEIGHT": weight, "UNIT_CP": unit_cp, "TOTAL PRICE": price}
+        self.group = group or (lambda row: (row.get("ROLLER", ""),))
+        self.columns = {}             # column -> list of values (None where a line lacks it)
+        self.alive = []
+        self.size = 0                 # slots, alive or not
+        self.live = 0
+        self.version = 0
+        self.totals = {}              # group key -> {metric: value}
+        self.grand = _zero()
+        self._view = (None, None)     # (version, DataFrame)
+
+    # ---------- metrics ----------
+    def _metrics(self, row):
+        qty = float(row.get(self.keys["QTY"], 0) or 0)
+        return {
+            "LINES": 1,
+            "QTY": qty,
+            "WEIGHT": float(row.get(self.keys["WEIGHT"], 0) or 0) * qty,
+            "TOTAL CP": float(row.get(self.keys["UNIT_CP"], 0) or 0) * qty,
+            "TOTAL PRICE": float(row.get(self.keys["TOTAL PRICE"], 0) or 0),
+        }
+
+    def _apply(self, row, sign):
+        key = self.group(row)
+        group = self.totals.setdefault(key, _zero())
+        for k, v in self._metrics(row).items():
+            group[k] += sign * v
+            self.grand[k] += sign * v
+        if group["LINES"] <= 0:
+            del self.totals[key]
+
+    # ---------- write ----------
+    def append(self, row):
+        """Add a line; returns its id."""
+        for col in row:
+            if col not in self.columns:
+                self.columns[col] = [None] * self.size
+        for col, values in self.columns.items():
+            values.append(row.get(col))
+        self.alive.append(True)
+        self.size += 1
+        self.live += 1
+        self.version += 1
+        self._apply(row, +1)
+        return self.size - 1
+
+    def delete(self, ids):
+        for i in ids:
+            i = int(i)
+            if 0 <= i < self.size and self.alive[i]:
+                self._apply(self.row(i), -1)
+                self.alive[i] = False
+                self.live -= 1
+        self.version += 1
+
+    # ---------- read ----------
+    def row(self, i):
+        return {col: values[i] for col, values in self.columns.items() if values[i] is not None}
+
+    def __iter__(self):
+        return (self.row(i) for i in range(self.size) if self.alive[i])
+
+    def __len__(self):
+        return self.live
+
+    def last(self):
+        for i in range(self.size - 1, -1, -1):
+            if self.alive[i]:
+                return self.row(i)
+        return None
+
+    def frame(self):
+        """Live lines as a DataFrame (index = line id); cached until the next add / delete."""
+        version, df = self._view
+        if version != self.version:
+            df = pd.DataFrame(self.columns, index=pd.RangeIndex(self.size))[self.alive]
+            self._view = (self.version, df)
+        return df
+
+    def totals_frame(self, names):
+        """Running totals as a DataFrame, one row per group (`names` label the group key)."""
+        rows = [dict(zip(names, key)) | {k: round(v, 2) for k, v in t.items()} for key, t in self.totals.items()]
+        return pd.DataFrame(rows, columns=list(names) + METRICS)
+
+
+def roller_buffer():
+    """Roller lines grouped by roller type and the belt width their weight maps to."""
+    return QuoteBuffer(group=lambda row: (row.get("ROLLER", ""), int(get_frame_bw_from_roller_wt(float(row.get("WT", 0) or 0)))))
+
+
+def frame_buffer():
+    """Frame lines grouped by description (family + belt width)."""
+    return QuoteBuffer(weight="FRAME_WT", group=lambda row: (row.get("DESCRIPTION", ""),))
@@ -0,0 +1,170 @@
+# cadai_schedule.py
+# Roller schedule (BOM) import — validate an uploaded schedule and cost every line in chunks.
+
+import numpy as np
+import pandas as pd
+
+from cadai_bearings import get_catalog, recommend_shaft
+from cadai_costing import FLAT_RETURN, IMPACT, ROLLER_TYPES, cost_rollers
+from cadai_memo import cached_schedule_rows
+
+# ================== SCHEDULE LAYOUT ==================
+REQUIRED_COLUMNS = ["ROLLER", "PIPE DIA", "PIPE THK", "FACE WIDTH", "SHAFT DIA", "QTY"]
+OPTIONAL_COLUMNS = ["SHAFT LENGTH", "QTY TYPE", "NO. OF ROLLERS", "BEARING"]
+NUMERIC_COLUMNS = ["PIPE DIA", "PIPE THK", "FACE WIDTH", "SHAFT DIA", "SHAFT LENGTH", "QTY", "NO. OF ROLLERS"]
+
+SINGLE = "SINGLE ROLLER"
+SET = "SET (1 Frame)"
+ROLLERS_PER_SET = 3
+SHAFT_ALLOWANCE = 60          # mm, default shaft length = face width + 60
+
+CHUNK_SIZE = 500
+
+
+# ================== READ ==================
+def _normalize_header(name):
+    return " ".join(str(name).replace("_", " ").upper().split())
+
+
+def read_schedule(uploaded_file):
+    """Read an uploaded .csv / .xlsx roller schedule into a DataFrame."""
+    name = getattr(uploaded_file, "name", str(uploaded_file)).lower()
+    if name.endswith(".csv"):
+        df = pd.read_csv(uploaded_file)
+    else:
+        df = pd.read_excel(uploaded_file)
+    df.columns = [_normalize_header(c) for c in df.columns]
+    return df
+
+
+def template_csv():
+    """Empty schedule with an example line, as CSV bytes."""
+    example = pd.DataFrame([{
+        "ROLLER": "Carrying Idler With Frame", "PIPE DIA": 89, "PIPE THK": 3.2,
+        "FACE WIDTH": 380, "SHAFT DIA": 25, "SHAFT LENGTH": 440,
+        "QTY": 10, "QTY TYPE": SET, "NO. OF ROLLERS": 1, "BEARING": "6204",
+    }])
+    return example.to_csv(index=False).encode("utf-8")
+
+
+# ================== VALIDATE ==================
+def validate_schedule(df):
+    """Split a schedule into costable rows and per-row errors.
+
+    Returns (valid_df, errors) where errors is a list of
+    {"ROW": spreadsheet row number, "ERROR": message}. Nothing is dropped
+    silently: every rejected line gets at least one error.
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        return df.iloc[0:0], [{"ROW": "-", "ERROR": f"Missing column(s): {', '.join(missing)}"}]
+
+    df = df.copy()
+    for col in OPTIONAL_COLUMNS:
+        if col not in df.columns:
+            df[col] = np.nan
+
+    df["ROLLER"] = df["ROLLER"].astype(str).str.strip()
+    df["BEARING"] = df["BEARING"].fillna("").astype(str).str.strip().str.removesuffix(".0")
+    df["QTY TYPE"] = df["QTY TYPE"].fillna(SINGLE).astype(str).str.strip().replace("", SINGLE)
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    df["SHAFT LENGTH"] = df["SHAFT LENGTH"].fillna(df["FACE WIDTH"] + SHAFT_ALLOWANCE)
+    df["NO. OF ROLLERS"] = df["NO. OF ROLLERS"].fillna(1)
+
+    # BEARING (catalog SKU) is optional; a blank SHAFT DIA then takes the recommended shaft
+    has_bearing = (df["BEARING"] != "").to_numpy()
+    known = np.asarray(get_catalog().contains(df["BEARING"].to_numpy()), dtype=bool)
+    df["SHAFT DIA"] = df["SHAFT DIA"].fillna(pd.Series(
+        recommend_shaft(get_catalog().bore_of(df["BEARING"].to_numpy())), index=df.index
+    ))
+
+    checks = [(~df["ROLLER"].isin(ROLLER_TYPES), "Unknown roller type")]
+    checks.append((pd.Series(has_bearing & ~known, index=df.index), "Unknown BEARING (not in the bearing catalog)"))
+    for col in ["PIPE DIA", "PIPE THK", "FACE WIDTH", "SHAFT DIA", "SHAFT LENGTH"]:
+        checks.append((~(df[col] > 0), f"{col} must be a number > 0"))
+    checks.append((~(df["QTY"] >= 1) | (df["QTY"] % 1 != 0), "QTY must be a whole number >= 1"))
+    checks.append((~(df["NO. OF ROLLERS"] >= 1) | (df["NO. OF ROLLERS"] % 1 != 0), "NO. OF ROLLERS must be a whole number >= 1"))
+    checks.append((~df["QTY TYPE"].str.upper().str.startswith(("SINGLE", "SET")), "QTY TYPE must be SINGLE ROLLER or SET"))
+    checks.append((df["PIPE THK"] * 2 >= df["PIPE DIA"], "PIPE THK too large for PIPE DIA"))
+
+    bad = np.zeros(len(df), dtype=bool)
+    errors = []
+    for mask, message in checks:
+        mask = mask.to_numpy()
+        bad |= mask
+        errors.extend({"ROW": int(i) + 2, "ERROR": message} for i in np.flatnonzero(mask))
+    errors.sort(key=lambda e: e["ROW"])
+
+    return df[~bad], errors
+
+
+# ================== COST ==================
+def roller_qty(df):
+    """Rollers actually priced per line: SET = 3 per frame, Flat Return = QTY × NO. OF ROLLERS."""
+    is_set = df["QTY TYPE"].str.upper().str.startswith("SET").to_numpy()
+    is_flat = (df["ROLLER"] == FLAT_RETURN).to_numpy()
+    qty = df["QTY"].to_numpy(dtype=int)
+    per = np.where(is_flat, df["NO. OF ROLLERS"].to_numpy(dtype=int), np.where(is_set, ROLLERS_PER_SET, 1))
+    return qty * per
+
+
+def costing_rows(df, res, roller_qtys, bearing_cost=None):
+    """Engine output -> rows in the same shape the input stage saves.
+
+    `bearing_cost` is the catalog price per pair of each line (NaN where the
+    BEARING_COST_PAIR constant was used).
+    """
+    rows = []
+    qty_type = np.where(df["QTY TYPE"].str.upper().str.startswith("SET") & (df["ROLLER"] != FLAT_RETURN), SET, SINGLE)
+    qty = df["QTY"].to_numpy()
+    bearing = df["BEARING"].to_numpy() if "BEARING" in df.columns else None
+    for i, roller in enumerate(df["ROLLER"].to_numpy()):
+        row = {
+            "ROLLER": roller,
+            "WT": round(float(res["weight"][i]), 3),
+            "QTY": int(qty[i]),
+            "QTY TYPE": str(qty_type[i]),
+            "ROLLER QTY": int(roller_qtys[i]),
+            "UNIT_CP": round(float(res["unit_cp"][i]), 2),
+            "UNIT_PRICE": round(float(res["unit_price"][i]), 2),
+            "TOTAL_PRICE": round(float(res["total_price"][i]), 2),
+            "FIXED COST": round(float(res["fixed_cost"][i]), 2),
+        }
+        if bearing is not None and bearing[i]:
+            row["BEARING"] = str(bearing[i])
+            if bearing_cost is not None and not np.isnan(bearing_cost[i]):
+                row["BEARING COST"] = round(float(bearing_cost[i]), 2)
+        if roller == IMPACT:
+            row["RUBBER QTY"] = int(res["rubber_qty"][i])
+            row["RUBBER COST"] = round(float(res["rubber_cost"][i]), 2)
+            row["SHAFT DIA (EFFECTIVE)"] = round(float(res["shaft_dia"][i]), 2)
+        rows.append(row)
+    return rows
+
+
+def _cost_chunk(chunk, constants):
+    qtys = roller_qty(chunk)
+    # catalog-priced bearings replace BEARING_COST_PAIR row by row
+    bearing_cost = np.asarray(get_catalog().pair_cost(chunk["BEARING"].to_numpy(), np.nan), dtype=float)
+    if not np.isnan(bearing_cost).all():
+        constants = {**constants, "BEARING_COST_PAIR": np.where(np.isnan(bearing_cost), constants["BEARING_COST_PAIR"], bearing_cost)}
+    res = cost_rollers(
+        chunk["PIPE DIA"].to_numpy(), chunk["PIPE THK"].to_numpy(), chunk["FACE WIDTH"].to_numpy(),
+        chunk["SHAFT DIA"].to_numpy(), chunk["SHAFT LENGTH"].to_numpy(),
+        chunk["ROLLER"].to_numpy(), qtys, constants,
+    )
+    return costing_rows(chunk, res, qtys, bearing_cost)
+
+
+def cost_schedule(df, constants, chunk_size=CHUNK_SIZE):
+    """Cost a validated schedule chunk by chunk (chunks memoized, see cadai_memo).
+
+    Yields (rows_done, rows_total, rows) so the caller can drive a progress bar.
+    """
+    total = len(df)
+    for start in range(0, total, chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        rows = cached_schedule_rows(chunk, REQUIRED_COLUMNS + OPTIONAL_COLUMNS, constants, lambda: _cost_chunk(chunk, constants))
+        yield start + len(chunk), total, rows
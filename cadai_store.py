@@ -0,0 +1,312 @@
+# cadai_store.py
+# Persistent quote store (SQLite, stdlib) — roller and frame lines live on disk,
+# the Streamlit session only keeps its quote id.
+#
+# DB file: $CADAI_DB, default cadai_quotes.db next to this module.
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from functools import lru_cache
+
+from cadai_lookup import get_frame_bw_from_roller_wt
+
+DB_PATH = os.environ.get("CADAI_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cadai_quotes.db"))
+INSERT_BATCH = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS roller_lines (
+    id          INTEGER PRIMARY KEY,
+    quote_id    TEXT    NOT NULL,
+    roller      TEXT    NOT NULL,
+    belt_width  INTEGER,
+    total_price REAL,
+    data        TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_roller_quote ON roller_lines (quote_id, id);
+CREATE INDEX IF NOT EXISTS ix_roller_type  ON roller_lines (quote_id, roller);
+CREATE INDEX IF NOT EXISTS ix_roller_bw    ON roller_lines (quote_id, belt_width);
+
+CREATE TABLE IF NOT EXISTS frame_lines (
+    id          INTEGER PRIMARY KEY,
+    quote_id    TEXT    NOT NULL,
+    roller      TEXT    NOT NULL,
+    belt_width  INTEGER,
+    total_price REAL,
+    data        TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_frame_quote ON frame_lines (quote_id, id);
+CREATE INDEX IF NOT EXISTS ix_frame_type  ON frame_lines (quote_id, roller);
+CREATE INDEX IF NOT EXISTS ix_frame_bw    ON frame_lines (quote_id, belt_width);
+"""
+
+# Running totals per (quote, kind, roller type, belt width), kept up to date by
+# triggers on every insert / delete, so quote summaries never scan the lines.
+#   rollers: qty = ROLLER QTY, weight = WT × qty, total_cp = UNIT_CP × qty
+#   frames : qty = FRAME QTY (SET), weight = FRAME WT × sets, total_cp = 0 (not recorded)
+TOTALS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quote_totals (
+    quote_id    TEXT    NOT NULL,
+    kind        TEXT    NOT NULL,
+    roller      TEXT    NOT NULL,
+    belt_width  INTEGER NOT NULL,
+    lines       INTEGER NOT NULL,
+    qty         REAL    NOT NULL,
+    weight      REAL    NOT NULL,
+    total_cp    REAL    NOT NULL,
+    total_price REAL    NOT NULL,
+    PRIMARY KEY (quote_id, kind, roller, belt_width)
+);
+"""
+
+# Change counter per (quote, kind), bumped by triggers on every insert / delete.
+# Line ids are plain INTEGER PRIMARY KEYs and get reused after the last line is
+# deleted, so ids and counts cannot tell "delete + add" from "unchanged".
+VERSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quote_versions (
+    quote_id    TEXT    NOT NULL,
+    kind        TEXT    NOT NULL,
+    version     INTEGER NOT NULL,
+    PRIMARY KEY (quote_id, kind)
+);
+"""
+
+_LINE_METRICS = {
+    "roller": (
+        "COALESCE(json_extract({r}.data, '$.\"ROLLER QTY\"'), json_extract({r}.data, '$.QTY'), 0)",
+        "COALESCE(json_extract({r}.data, '$.WT'), 0)",
+        "COALESCE(json_extract({r}.data, '$.UNIT_CP'), 0)",
+    ),
+    "frame": (
+        "COALESCE(json_extract({r}.data, '$.\"FRAME QTY (SET)\"'), 0)",
+        "COALESCE(json_extract({r}.data, '$.\"FRAME WT\"'), 0)",
+        "0",
+    ),
+}
+
+
+def _totals_triggers(kind, table):
+    qty, wt, cp = (m.format(r="{r}") for m in _LINE_METRICS[kind])
+    new = {k: v.format(r="NEW") for k, v in (("qty", qty), ("wt", wt), ("cp", cp))}
+    old = {k: v.format(r="OLD") for k, v in (("qty", qty), ("wt", wt), ("cp", cp))}
+    return f"""
+CREATE TRIGGER IF NOT EXISTS tr_{table}_add AFTER INSERT ON {table} BEGIN
+    INSERT INTO quote_totals VALUES (
+        NEW.quote_id, '{kind}', NEW.roller, COALESCE(NEW.belt_width, 0), 1,
+        {new["qty"]}, {new["wt"]} * {new["qty"]}, {new["cp"]} * {new["qty"]}, COALESCE(NEW.total_price, 0)
+    )
+    ON CONFLICT (quote_id, kind, roller, belt_width) DO UPDATE SET
+        lines = lines + 1, qty = qty + excluded.qty, weight = weight + excluded.weight,
+        total_cp = total_cp + excluded.total_cp, total_price = total_price + excluded.total_price;
+END;
+CREATE TRIGGER IF NOT EXISTS tr_{table}_del AFTER DELETE ON {table} BEGIN
+    UPDATE quote_totals SET
+        lines = lines - 1, qty = qty - {old["qty"]}, weight = weight - {old["wt"]} * {old["qty"]},
+        total_cp = total_cp - {old["cp"]} * {old["qty"]}, total_price = total_price - COALESCE(OLD.total_price, 0)
+    WHERE quote_id = OLD.quote_id AND kind = '{kind}' AND roller = OLD.roller AND belt_width = COALESCE(OLD.belt_width, 0);
+    DELETE FROM quote_totals
+    WHERE quote_id = OLD.quote_id AND kind = '{kind}' AND roller = OLD.roller AND belt_width = COALESCE(OLD.belt_width, 0)
+      AND lines <= 0;
+END;
+"""
+
+
+def _version_triggers(kind, table):
+    bump = """
+    INSERT INTO quote_versions VALUES ({r}.quote_id, '{kind}', 1)
+    ON CONFLICT (quote_id, kind) DO UPDATE SET version = version + 1;"""
+    return f"""
+CREATE TRIGGER IF NOT EXISTS tr_{table}_ver_add AFTER INSERT ON {table} BEGIN{bump.format(r="NEW", kind=kind)}
+END;
+CREATE TRIGGER IF NOT EXISTS tr_{table}_ver_del AFTER DELETE ON {table} BEGIN{bump.format(r="OLD", kind=kind)}
+END;
+"""
+
+
+def _totals_backfill(kind, table):
+    qty, wt, cp = (m.format(r=table) for m in _LINE_METRICS[kind])
+    return f"""
+INSERT INTO quote_totals
+SELECT quote_id, '{kind}', roller, COALESCE(belt_width, 0), COUNT(*),
+       SUM({qty}), SUM({wt} * {qty}), SUM({cp} * {qty}), SUM(COALESCE(total_price, 0))
+FROM {table} GROUP BY quote_id, roller, COALESCE(belt_width, 0);
+"""
+
+INSERT_ROLLER = "INSERT INTO roller_lines (quote_id, roller, belt_width, total_price, data) VALUES (?, ?, ?, ?, ?)"
+INSERT_FRAME = "INSERT INTO frame_lines (quote_id, roller, belt_width, total_price, data) VALUES (?, ?, ?, ?, ?)"
+
+
+def _json_default(v):
+    # numpy scalars (np.float64 / np.int64 / np.str_) from the costing engine
+    if hasattr(v, "item"):
+        return v.item()
+    raise TypeError(f"{type(v).__name__} is not JSON serializable")
+
+
+def _dumps(row):
+    return json.dumps(row, default=_json_default)
+
+
+def new_quote_id():
+    return uuid.uuid4().hex[:12]
+
+
+# ================== STORE ==================
+class QuoteStore:
+    """Roller / frame lines per quote id.
+
+    One connection per thread (Streamlit runs each session's script on its own
+    thread); WAL mode lets many estimators read while one writes.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as con:
+            con.executescript(SCHEMA)
+            fresh = con.execute("SELECT 1 FROM sqlite_master WHERE name = 'quote_totals'").fetchone() is None
+            con.executescript(TOTALS_SCHEMA + _totals_triggers("roller", "roller_lines") + _totals_triggers("frame", "frame_lines"))
+            con.executescript(VERSIONS_SCHEMA + _version_triggers("roller", "roller_lines") + _version_triggers("frame", "frame_lines"))
+        if fresh:
+            self.rebuild_totals()   # DB from before quote_totals existed
+
+    def _conn(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    # ---------- write ----------
+    def _insert(self, sql, params):
+        con = self._conn()
+        with con:
+            for start in range(0, len(params), INSERT_BATCH):
+                con.executemany(sql, params[start:start + INSERT_BATCH])
+
+    def add_rollers(self, quote_id, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        bws = get_frame_bw_from_roller_wt([float(r.get("WT", 0) or 0) for r in rows])
+        self._insert(INSERT_ROLLER, [
+            (quote_id, str(r.get("ROLLER", "")), int(bw), float(r.get("TOTAL_PRICE", 0) or 0), _dumps(r))
+            for r, bw in zip(rows, bws)
+        ])
+
+    def add_frames(self, quote_id, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        self._insert(INSERT_FRAME, [
+            (quote_id, str(r.get("ROLLER", "")), r.get("BELT WIDTH"), float(r.get("FRAME TOTAL PRICE", 0) or 0), _dumps(r))
+            for r in rows
+        ])
+
+    def delete_rollers(self, quote_id, ids):
+        con = self._conn()
+        with con:
+            con.executemany("DELETE FROM roller_lines WHERE quote_id = ? AND id = ?", [(quote_id, int(i)) for i in ids])
+
+    def delete_frames(self, quote_id, ids):
+        con = self._conn()
+        with con:
+            con.executemany("DELETE FROM frame_lines WHERE quote_id = ? AND id = ?", [(quote_id, int(i)) for i in ids])
+
+    # ---------- read ----------
+    def _lines(self, table, quote_id):
+        cur = self._conn().execute(f"SELECT id, data FROM {table} WHERE quote_id = ? ORDER BY id", (quote_id,))
+        return [(i, json.loads(d)) for i, d in cur]
+
+    def roller_lines(self, quote_id):
+        """[(line id, row dict)] in insertion order."""
+        return self._lines("roller_lines", quote_id)
+
+    def frame_lines(self, quote_id):
+        return self._lines("frame_lines", quote_id)
+
+    def rollers(self, quote_id):
+        return [row for _, row in self.roller_lines(quote_id)]
+
+    def frames(self, quote_id):
+        return [row for _, row in self.frame_lines(quote_id)]
+
+    def _iter(self, table, quote_id):
+        cur = self._conn().execute(f"SELECT id, data FROM {table} WHERE quote_id = ? ORDER BY id", (quote_id,))
+        for i, data in cur:
+            yield {"LINE": i, **json.loads(data)}
+
+    def iter_rollers(self, quote_id):
+        """Roller rows (plus their line id as LINE) streamed off a cursor, nothing held per row."""
+        return self._iter("roller_lines", quote_id)
+
+    def iter_frames(self, quote_id):
+        return self._iter("frame_lines", quote_id)
+
+    def _last(self, table, quote_id):
+        cur = self._conn().execute(f"SELECT data FROM {table} WHERE quote_id = ? ORDER BY id DESC LIMIT 1", (quote_id,))
+        hit = cur.fetchone()
+        return json.loads(hit[0]) if hit else None
+
+    def last_roller(self, quote_id):
+        return self._last("roller_lines", quote_id)
+
+    # ---------- running totals ----------
+    def rebuild_totals(self):
+        """Recompute quote_totals from the lines (the triggers keep it current after that)."""
+        con = self._conn()
+        with con:
+            con.execute("DELETE FROM quote_totals")
+            con.execute(_totals_backfill("roller", "roller_lines"))
+            con.execute(_totals_backfill("frame", "frame_lines"))
+
+    def totals(self, quote_id, kind=None):
+        """Running totals by roller type and belt width: [{KIND, ROLLER, BELT WIDTH, LINES, QTY, WEIGHT, TOTAL CP, TOTAL PRICE}]."""
+        sql = "SELECT kind, roller, belt_width, lines, qty, weight, total_cp, total_price FROM quote_totals WHERE quote_id = ?"
+        params = [quote_id]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        cur = self._conn().execute(sql + " ORDER BY kind DESC, roller, belt_width", params)
+        cols = ["KIND", "ROLLER", "BELT WIDTH", "LINES", "QTY", "WEIGHT", "TOTAL CP", "TOTAL PRICE"]
+        return [dict(zip(cols, r)) for r in cur]
+
+    def summary(self, quote_id):
+        """Quote-wide roller / frame / joined totals from quote_totals (one small query)."""
+        cur = self._conn().execute(
+            "SELECT kind, SUM(lines), SUM(qty), SUM(weight), SUM(total_cp), SUM(total_price) "
+            "FROM quote_totals WHERE quote_id = ? GROUP BY kind", (quote_id,)
+        )
+        out = {kind: {"lines": 0, "qty": 0.0, "weight": 0.0, "total_cp": 0.0, "total_price": 0.0} for kind in ("roller", "frame")}
+        for kind, lines, qty, weight, cp, price in cur:
+            out[kind] = {"lines": lines, "qty": qty, "weight": weight, "total_cp": cp, "total_price": price}
+        out["grand_total"] = out["roller"]["total_price"] + out["frame"]["total_price"]
+        out["total_weight"] = out["roller"]["weight"] + out["frame"]["weight"]
+        return out
+
+    def version(self, quote_id):
+        """Cheap change key for a quote's lines: (roller version, roller lines, frame version, frame lines).
+
+        A version goes up on every insert / delete of that kind (quote_versions
+        triggers), so it changes even when a deleted line's id is reused; no
+        line is read.
+        """
+        cur = self._conn().execute("SELECT kind, version FROM quote_versions WHERE quote_id = ?", (quote_id,))
+        versions = dict(cur.fetchall())
+        rollers, frames = self.count(quote_id)
+        return versions.get("roller", 0), rollers, versions.get("frame", 0), frames
+
+    def count(self, quote_id):
+        """(roller lines, frame lines) for a quote, from the running totals."""
+        s = self.summary(quote_id)
+        return s["roller"]["lines"], s["frame"]["lines"]
+
+
+@lru_cache(maxsize=None)
+def get_store(path=DB_PATH):
+    """Process-wide store shared by every session."""
+    return QuoteStore(path)
@@ -0,0 +1,132 @@
+# cadai_surface.py
+# Precomputed roller price surface — unit price over a grid of the five spec
+# dimensions, built once per (roller type, constants) and shared by every
+# session of the process.
+#
+#   PIPE DIA × PIPE THK × FACE WIDTH × SHAFT DIA × SHAFT LENGTH -> unit price
+#
+# The grid is one cost_rollers broadcast (~1.6M cells, float32, read-only).
+# Prices between grid points are multilinear interpolation over the 32
+# surrounding cells, with shaft diameter interpolated in d². Pipe weight is
+# linear in each of D, t and face width and shaft weight in d² and length, so
+# the estimate is exact up to float32 rounding; only the odd-shaft rule of
+# impact idlers is approximate between market shaft sizes. Their whole-ring
+# rubber cost (a step in face width) is kept out of the grid and added
+# exactly. Price-vs-dimension profiles for the input stage charts are read
+# from the same grid.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from cadai_bearings import MARKET_SHAFT_SIZES
+from cadai_costing import IMPACT, RUBBER_RING_COST, RUBBER_RING_PITCH, cost_rollers
+from cadai_design import PIPE_DIAS, PIPE_THKS
+
+DIMENSIONS = ["PIPE DIA", "PIPE THK", "FACE WIDTH", "SHAFT DIA", "SHAFT LENGTH"]
+AXES = {
+    "PIPE DIA": PIPE_DIAS,
+    "PIPE THK": PIPE_THKS,
+    "FACE WIDTH": np.arange(100, 1601, 50, dtype=float),
+    "SHAFT DIA": MARKET_SHAFT_SIZES,
+    "SHAFT LENGTH": np.arange(150, 1701, 50, dtype=float),
+}
+MAX_SURFACES = 8              # grids kept per process (one per roller type / constants)
+
+# interpolation coordinate per dimension (price is linear in it)
+SCALE = {"SHAFT DIA": np.square}
+
+
+def _scaled(dimension, values):
+    return SCALE.get(dimension, np.asarray)(np.asarray(values, dtype=float))
+
+
+# ================== SURFACE ==================
+class PriceSurface:
+    """Unit price grid for one roller type and one set of constants."""
+
+    def __init__(self, roller_type, constants, axes=AXES):
+        self.roller_type = roller_type
+        self.markup = float(constants["MARKUP"])
+        self.axes = [np.asarray(axes[d], dtype=float) for d in DIMENSIONS]
+        self._coords = [_scaled(d, a) for d, a in zip(DIMENSIONS, self.axes)]
+        shape = [len(a) for a in self.axes]
+        spec = [a.reshape([-1 if i == j else 1 for j in range(len(shape))]) for i, a in enumerate(self.axes)]
+        res = cost_rollers(*spec, roller_type, 1, constants)
+        price = res["unit_price"] - res["rubber_cost"] * self.markup
+        self.grid = np.broadcast_to(price, shape).astype(np.float32)
+        self.grid.setflags(write=False)
+
+    def _rubber(self, face_width):
+        if self.roller_type != IMPACT:
+            return 0.0
+        return np.floor(face_width / RUBBER_RING_PITCH) * RUBBER_RING_COST * self.markup
+
+    @property
+    def nbytes(self):
+        return self.grid.nbytes
+
+    def contains(self, point):
+        return all(a[0] <= float(point[d]) <= a[-1] for d, a in zip(DIMENSIONS, self.axes))
+
+    def interpolate(self, points):
+        """Unit price at each point ({dimension: array}); NaN outside the grid."""
+        coords = np.broadcast_arrays(*(_scaled(d, points[d]) for d in DIMENSIONS))
+        inside = np.ones(coords[0].shape, dtype=bool)
+        lo, frac = [], []
+        for a, x in zip(self._coords, coords):
+            inside &= (x >= a[0]) & (x <= a[-1])
+            i = np.clip(np.searchsorted(a, x, side="right") - 1, 0, len(a) - 2)
+            lo.append(i)
+            frac.append(np.clip((x - a[i]) / (a[i + 1] - a[i]), 0.0, 1.0))
+
+        price = np.zeros(coords[0].shape)
+        for corner in range(2 ** len(DIMENSIONS)):
+            weight = np.ones(coords[0].shape)
+            index = []
+            for k in range(len(DIMENSIONS)):
+                up = (corner >> k) & 1
+                weight = weight * (frac[k] if up else 1.0 - frac[k])
+                index.append(lo[k] + up)
+            price += weight * self.grid[tuple(index)]
+        price += self._rubber(coords[DIMENSIONS.index("FACE WIDTH")])
+        return np.where(inside, price, np.nan)
+
+    def lookup(self, point):
+        """Unit price at one spec ({dimension: value}), or None outside the grid."""
+        if not self.contains(point):
+            return None
+        return float(self.interpolate(point))
+
+    def profile(self, dimension, point):
+        """(axis values, unit prices) along one dimension, the others held at `point`."""
+        axis = self.axes[DIMENSIONS.index(dimension)]
+        return axis, self.interpolate({**point, dimension: axis})
+
+
+# ================== CACHE ==================
+_surfaces = OrderedDict()
+_lock = threading.Lock()
+
+
+def _key(roller_type, constants):
+    return (roller_type, tuple(sorted((k, float(v)) for k, v in constants.items())))
+
+
+def get_surface(roller_type, constants):
+    """Shared surface for this roller type and constants, built on first use."""
+    key = _key(roller_type, constants)
+    with _lock:
+        if key in _surfaces:
+            _surfaces.move_to_end(key)
+            return _surfaces[key]
+
+    surface = PriceSurface(roller_type, constants)
+
+    with _lock:
+        surface = _surfaces.setdefault(key, surface)
+        _surfaces.move_to_end(key)
+        while len(_surfaces) > MAX_SURFACES:
+            _surfaces.popitem(last=False)
+    return surface
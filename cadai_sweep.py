@@ -0,0 +1,127 @@
+# cadai_sweep.py
+# What-if pricing — reprice a whole saved quote over a grid of constants in one
+# NumPy broadcast.
+#
+# Every roller / frame price is linear in the constants except for the MARKUP
+# factor, so a quote collapses to a handful of sums (its "exposure"):
+#
+#   rollers: MARKUP * (STEEL_COST*Σn·steel_wt + Σn·fixed + Σn*(SEAL + WELDING + extras) + Σn'*BEARING)
+#   frames : MARKUP * (STEEL_COST*Σs·frame_wt + Σs*(FRAME_RATE + WELDING))
+#
+# (n' = rollers priced at BEARING_COST_PAIR; catalog-priced bearings are fixed)
+# and any number of scenarios is a broadcast over those sums.
+
+import numpy as np
+import pandas as pd
+
+from cadai_costing import BRACKET_WT, EXTRA_COSTS, FLAT_RETURN
+from cadai_lookup import FRAME_FAMILY
+from cadai_tables import FAB_ROWS, fab_total_wt
+
+SWEEP_KEYS = ["STEEL_COST", "BEARING_COST_PAIR", "SEAL_COST", "WELDING_COST", "MARKUP", "FRAME_RATE"]
+MAX_SCENARIOS = 5_000_000     # grid cells per sweep
+
+
+# ================== EXPOSURE ==================
+def quote_exposure(roller_rows, frame_rows, constants):
+    """Collapse saved quote lines into the sums the price is linear in.
+
+    Lines saved before FIXED COST / FRAME WT were recorded are backed out of
+    their UNIT_CP with `constants` (exact when they were priced with them).
+    """
+    exp = dict.fromkeys(["roller_steel", "roller_fixed", "rollers", "bearing_rollers", "frame_steel", "frames"], 0.0)
+    exp["estimated"] = 0
+
+    per_roller = constants["SEAL_COST"] + constants["WELDING_COST"] + sum(constants.get(k, 0.0) for k in EXTRA_COSTS)
+
+    for row in roller_rows:
+        n = float(row.get("ROLLER QTY", row.get("QTY", 0)) or 0)
+        steel_wt = float(row.get("WT", 0) or 0) + (BRACKET_WT if row.get("ROLLER") == FLAT_RETURN else 0.0)
+        bearing = row.get("BEARING COST")       # catalog price, not BEARING_COST_PAIR
+        fixed = row.get("FIXED COST")
+        if fixed is None:
+            fixed = float(row.get("UNIT_CP", 0) or 0) - steel_wt * constants["STEEL_COST"] - per_roller
+            fixed -= constants["BEARING_COST_PAIR"] if bearing is None else bearing
+            exp["estimated"] += 1
+        exp["roller_steel"] += n * steel_wt
+        exp["roller_fixed"] += n * (float(fixed) + (0.0 if bearing is None else float(bearing)))
+        exp["rollers"] += n
+        exp["bearing_rollers"] += 0.0 if bearing is not None else n
+
+    for row in frame_rows:
+        sets = float(row.get("FRAME QTY (SET)", 0) or 0)
+        wt = row.get("FRAME WT")
+        if wt is None:
+            family, bw = FRAME_FAMILY.get(row.get("ROLLER")), row.get("BELT WIDTH")
+            wt = fab_total_wt(family, bw) if family and bw in FAB_ROWS.get(family, {}) else 0.0
+            exp["estimated"] += 1
+        exp["frame_steel"] += sets * float(wt)
+        exp["frames"] += sets
+
+    return exp
+
+
+# ================== PRICING ==================
+def quote_totals(exp, constants):
+    """(roller total, frame total) — constants may be arrays of any broadcastable shape."""
+    c = {k: np.asarray(v, dtype=float) for k, v in constants.items()}
+    extras = sum(c.get(k, 0.0) for k in EXTRA_COSTS)
+    rollers = c["MARKUP"] * (
+        c["STEEL_COST"] * exp["roller_steel"]
+        + exp["roller_fixed"]
+        + exp["rollers"] * (c["SEAL_COST"] + c["WELDING_COST"] + extras)
+        + exp.get("bearing_rollers", exp["rollers"]) * c["BEARING_COST_PAIR"]
+    )
+    frames = c["MARKUP"] * (
+        c["STEEL_COST"] * exp["frame_steel"]
+        + exp["frames"] * (c["FRAME_RATE"] + c["WELDING_COST"])
+    )
+    return rollers, frames
+
+
+def price_grid(exp, base, ranges):
+    """Quote total over the full grid of `ranges` ({constant: values}).
+
+    Each swept constant gets its own axis (in `ranges` order); the rest stay at
+    `base`. Returns {"axes": [(name, values)], "total", "rollers", "frames"}
+    with grids of shape (len(v1), len(v2), ...).
+    """
+    axes = [(k, np.asarray(v, dtype=float)) for k, v in ranges.items()]
+    size = int(np.prod([len(v) for _, v in axes])) if axes else 1
+    if size > MAX_SCENARIOS:
+        raise ValueError(f"{size:,} scenarios; keep the grid under {MAX_SCENARIOS:,}")
+
+    constants = dict(base)
+    for i, (k, v) in enumerate(axes):
+        shape = [1] * len(axes)
+        shape[i] = len(v)
+        constants[k] = v.reshape(shape)
+
+    rollers, frames = quote_totals(exp, constants)
+    shape = tuple(len(v) for _, v in axes)
+    rollers, frames = np.broadcast_to(rollers, shape), np.broadcast_to(frames, shape)
+    return {"axes": axes, "total": rollers + frames, "rollers": rollers, "frames": frames}
+
+
+def tornado(exp, base, ranges):
+    """One-at-a-time swing of the quote total, largest first (rows for a tornado chart)."""
+    base_total = float(sum(quote_totals(exp, base)))
+    rows = []
+    for k, v in ranges.items():
+        lo, hi = float(np.min(v)), float(np.max(v))
+        at_lo = float(sum(quote_totals(exp, {**base, k: lo})))
+        at_hi = float(sum(quote_totals(exp, {**base, k: hi})))
+        rows.append({
+            "CONSTANT": k, "LOW": lo, "HIGH": hi, "BASE TOTAL": base_total,
+            "TOTAL AT LOW": at_lo, "TOTAL AT HIGH": at_hi, "SWING": abs(at_hi - at_lo),
+        })
+    return sorted(rows, key=lambda r: -r["SWING"])
+
+
+def grid_frame(grid):
+    """Long-form DataFrame of a price grid (one row per scenario) for charts / CSV."""
+    names = [k for k, _ in grid["axes"]]
+    mesh = np.meshgrid(*[v for _, v in grid["axes"]], indexing="ij")
+    data = {k: m.ravel() for k, m in zip(names, mesh)}
+    data.update({"ROLLER TOTAL": grid["rollers"].ravel(), "FRAME TOTAL": grid["frames"].ravel(), "TOTAL": grid["total"].ravel()})
+    return pd.DataFrame(data)
@@ -0,0 +1,136 @@
+# cadai_tables.py
+# Frame reference tables — built once per process and shared by every session.
+#
+# Streamlit re-executes the app script on every widget change, but imported
+# modules are only executed once per process. The small weight tables live
+# here; fabrication rows come from the columnar store (cadai_fabstore). The
+# DataFrames are built lazily on first use and cached; treat them as read-only
+# and hand editable_fab_table() (a copy) to st.data_editor.
+
+from collections.abc import Mapping
+from functools import lru_cache
+
+import pandas as pd
+
+from cadai_fabstore import FAB_COLUMNS, get_fab_store
+
+
+def make_df(rows=None):
+
+    if not rows:
+        return pd.DataFrame(columns=FAB_COLUMNS)
+
+    return pd.DataFrame(rows, columns=FAB_COLUMNS)
+
+
+# ================== FRAME WEIGHT TABLES ==================
+CARRYING_FRAME_WT = {650:12.7,800:16.8,1000:23.1,1200:26.2,1400:35,1600:38.4,1800:52.4,2000:64.7}
+SARI_FRAME_WT     = {650:14.2,800:18.1,1000:24.5,1200:28.9,1400:37.4,1600:41.8,1800:56.2,2000:68.9}
+SARI_N_FRAME_WT   = {800:19.3,1000:26.1,1200:30.2}
+SACI_FRAME_WT     = {650:13.5,800:17.2,1000:22.9,1200:27.4,1400:36.2,1600:40.5,1800:54.3,2000:66.1}
+
+FRAME_WT = {
+    "CARRYING": CARRYING_FRAME_WT,
+    "SARI": SARI_FRAME_WT,
+    "SARI_N": SARI_N_FRAME_WT,
+    "SACI": SACI_FRAME_WT,
+}
+
+
+# ================== ROLLER WT → BW ==================
+# (low, high, belt width): low <= roller wt (kg) < high
+ROLLER_WT_TO_BW = [
+    (0, 15, 650),
+    (15, 22, 800),
+    (22, 30, 1000),
+    (30, 38, 1200),
+    (38, 48, 1400),
+    (48, 60, 1600),
+    (60, 75, 1800),
+    (75, 10**9, 2000),
+]
+DEFAULT_BW = 1000
+
+
+# ================== FABRICATION ROWS ==================
+# The rows live in data/fab_rows.csv, compiled to a memory-mapped columnar store
+# (cadai_fabstore). FAB_ROWS is a lazy read-only view over it:
+# FAB_ROWS[family] lists the belt widths without reading any rows, and
+# FAB_ROWS[family][bw] reads just that table.
+class _FabWidths(Mapping):
+    def __init__(self, family):
+        self.family = family
+
+    def __getitem__(self, bw):
+        if not get_fab_store().has(self.family, bw):
+            raise KeyError(bw)
+        return get_fab_store().rows(self.family, bw)
+
+    def __contains__(self, bw):
+        return get_fab_store().has(self.family, bw)
+
+    def __iter__(self):
+        return iter(get_fab_store().widths(self.family))
+
+    def __len__(self):
+        return len(get_fab_store().widths(self.family))
+
+
+class _FabFamilies(Mapping):
+    def __getitem__(self, family):
+        if family not in get_fab_store().families():
+            raise KeyError(family)
+        return _FabWidths(family)
+
+    def __iter__(self):
+        return iter(get_fab_store().families())
+
+    def __len__(self):
+        return len(get_fab_store().families())
+
+
+FAB_ROWS = _FabFamilies()
+
+
+# ================== CACHED TABLES ==================
+@lru_cache(maxsize=None)
+def fab_table(family, bw):
+    """Fabrication table for one (family, belt width); built once per process, on first use."""
+    return get_fab_store().table(family, bw)
+
+
+class _FabTables(Mapping):
+    """{belt width: DataFrame} for one family; each table is built when first read."""
+
+    def __init__(self, family):
+        self.family = family
+
+    def __getitem__(self, bw):
+        if bw not in FAB_ROWS[self.family]:
+            raise KeyError(bw)
+        return fab_table(self.family, bw)
+
+    def __contains__(self, bw):
+        return bw in FAB_ROWS[self.family]
+
+    def __iter__(self):
+        return iter(FAB_ROWS[self.family])
+
+    def __len__(self):
+        return len(FAB_ROWS[self.family])
+
+
+@lru_cache(maxsize=None)
+def fab_tables(family):
+    """Read-only {belt width: DataFrame} mapping for a frame family."""
+    return _FabTables(family)
+
+
+def fab_total_wt(family, bw):
+    """Sum of the fabrication table's TOTAL WT column (kg), from the store index."""
+    return float(get_fab_store().total_wt(family, bw))
+
+
+def editable_fab_table(family, bw):
+    """Private copy of a cached table for st.data_editor / user edits."""
+    return fab_table(family, bw).copy()
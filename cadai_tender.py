@@ -0,0 +1,235 @@
+# cadai_tender.py
+# Tender pricing — cost every conveyor schedule of a plant in parallel and
+# write one consolidated workbook.
+#
+#   python cadai_tender.py tender.csv --output tender.xlsx
+#   python cadai_tender.py conv_a.xlsx conv_b.csv --workers 32 --output tender.xlsx
+#
+# tender.csv (manifest) has one row per conveyor:
+#   CONVEYOR, SCHEDULE       name and schedule file (.csv / .xlsx, see cadai_schedule)
+#   PRICEBOOK                optional price book for that conveyor (see cadai_pricebook)
+#   STEEL_COST, MARKUP, ...  optional per-conveyor overrides of single constants
+# Schedule files given directly are named after their file stem and priced
+# with the default price book.
+#
+# Work runs on a ProcessPoolExecutor in two passes: one task per conveyor to
+# read and validate its schedule, then one task per CHUNK_SIZE lines to cost
+# rollers (and the frames of SET lines). Results come back through
+# Executor.map, so the merged output is in manifest / line order whatever
+# the worker count or scheduling.
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cadai_costing import cost_frames
+from cadai_lookup import FRAME_FAMILY
+from cadai_pricebook import default_constants, get_price_book
+from cadai_schedule import CHUNK_SIZE, cost_schedule, read_schedule, validate_schedule
+
+SUMMARY_COLUMNS = [
+    "CONVEYOR", "LINES", "ERRORS", "ROLLERS", "ROLLER TOTAL", "FRAME SETS", "FRAME TOTAL", "TOTAL",
+]
+
+
+# ================== MANIFEST ==================
+def read_manifest(paths):
+    """[{"CONVEYOR", "SCHEDULE", "CONSTANTS"}] from a manifest CSV or a list of schedule files."""
+    if len(paths) == 1 and paths[0].lower().endswith(".csv") and "SCHEDULE" in _header(paths[0]):
+        df = pd.read_csv(paths[0])
+        df.columns = [str(c).strip().upper() for c in df.columns]
+        base = os.path.dirname(os.path.abspath(paths[0]))
+    else:
+        df = pd.DataFrame({"SCHEDULE": paths})
+        base = os.getcwd()
+    if "CONVEYOR" not in df.columns:
+        df["CONVEYOR"] = [os.path.splitext(os.path.basename(p))[0] for p in df["SCHEDULE"]]
+
+    book_default = default_constants()
+    conveyors = []
+    for rec in df.to_dict("records"):
+        constants = dict(book_default)
+        book = rec.get("PRICEBOOK")
+        if isinstance(book, str) and book.strip():
+            pb = get_price_book(os.path.join(base, book.strip()))
+            constants = dict(pb.get()["constants"])
+            if pb.error:
+                raise ValueError(f"{rec['CONVEYOR']}: {pb.error}")
+        for key in constants:
+            if key in rec and pd.notna(rec[key]):
+                constants[key] = float(rec[key])
+        conveyors.append({
+            "CONVEYOR": str(rec["CONVEYOR"]),
+            "SCHEDULE": os.path.join(base, str(rec["SCHEDULE"])),
+            "CONSTANTS": constants,
+        })
+    names = [c["CONVEYOR"] for c in conveyors]
+    if len(set(names)) != len(names):
+        raise ValueError("CONVEYOR names must be unique")
+    return conveyors
+
+
+def _header(path):
+    with open(path, encoding="utf-8-sig") as fh:
+        return {c.strip().upper() for c in fh.readline().split(",")}
+
+
+# ================== WORK UNITS (run in the pool) ==================
+def load_conveyor(conveyor):
+    """Read + validate one schedule: (valid DataFrame, errors)."""
+    try:
+        df = read_schedule(conveyor["SCHEDULE"])
+    except (OSError, ValueError) as e:
+        return None, [{"ROW": "-", "ERROR": f"Cannot read {conveyor['SCHEDULE']}: {e}"}]
+    return validate_schedule(df)
+
+
+def cost_unit(unit):
+    """Cost one chunk of one conveyor: (roller rows, frame rows)."""
+    chunk, constants, with_frames = unit
+    sheet_rows = (chunk.index.to_numpy() + 2).tolist()      # spreadsheet row, as in validate_schedule errors
+    rows = [
+        {"ROW": sheet_rows[k], **row}
+        for _, _, part in cost_schedule(chunk, constants, len(chunk)) for k, row in enumerate(part)
+    ]
+
+    frames = []
+    if with_frames:
+        sets = [
+            i for i, row in enumerate(rows)
+            if row["QTY TYPE"].upper().startswith("SET") and row["ROLLER"] in FRAME_FAMILY
+        ]
+        if sets:
+            set_qty = np.array([rows[i]["QTY"] for i in sets])
+            fres = cost_frames([rows[i]["ROLLER"] for i in sets], [rows[i]["WT"] for i in sets], set_qty, constants)
+            for k, i in enumerate(sets):
+                frames.append({
+                    "ROW": rows[i]["ROW"],
+                    "ROLLER": rows[i]["ROLLER"],
+                    "BELT WIDTH": int(fres["belt_width"][k]),
+                    "FRAME WT": round(float(fres["frame_wt"][k]), 3),
+                    "FRAME UNIT PRICE": round(float(fres["unit_price"][k]), 2),
+                    "FRAME TOTAL PRICE": round(float(fres["total_price"][k]), 2),
+                    "FRAME QTY (SET)": int(set_qty[k]),
+                })
+    return rows, frames
+
+
+# ================== TENDER ==================
+def price_tender(conveyors, workers=None, chunk_size=CHUNK_SIZE, with_frames=True, progress=None):
+    """Price every conveyor; returns {"summary", "rollers", "frames", "errors"} DataFrames.
+
+    `progress(units_done, units_total)` is called as chunks finish.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        loaded = list(pool.map(load_conveyor, conveyors))
+
+        units, owners = [], []
+        for n, (conveyor, (df, _)) in enumerate(zip(conveyors, loaded)):
+            if df is None:
+                continue
+            for start in range(0, len(df), chunk_size):
+                units.append((df.iloc[start:start + chunk_size], conveyor["CONSTANTS"], with_frames))
+                owners.append(n)
+
+        results = []
+        for done, result in enumerate(pool.map(cost_unit, units), start=1):
+            results.append(result)
+            if progress is not None:
+                progress(done, len(units))
+
+    roller_rows = [[] for _ in conveyors]
+    frame_rows = [[] for _ in conveyors]
+    for n, (rows, frames) in zip(owners, results):
+        roller_rows[n].extend(rows)
+        frame_rows[n].extend(frames)
+
+    summary, rollers, frames, errors = [], [], [], []
+    for conveyor, (_, errs), rrows, frows in zip(conveyors, loaded, roller_rows, frame_rows):
+        name = conveyor["CONVEYOR"]
+        roller_total = sum(r["TOTAL_PRICE"] for r in rrows)
+        frame_total = sum(f["FRAME TOTAL PRICE"] for f in frows)
+        summary.append({
+            "CONVEYOR": name,
+            "LINES": len(rrows),
+            "ERRORS": len({e["ROW"] for e in errs}),          # rejected lines, not error messages
+            "ROLLERS": sum(r["ROLLER QTY"] for r in rrows),
+            "ROLLER TOTAL": round(roller_total, 2),
+            "FRAME SETS": sum(f["FRAME QTY (SET)"] for f in frows),
+            "FRAME TOTAL": round(frame_total, 2),
+            "TOTAL": round(roller_total + frame_total, 2),
+        })
+        rollers.extend({"CONVEYOR": name, **r} for r in rrows)
+        frames.extend({"CONVEYOR": name, **f} for f in frows)
+        errors.extend({"CONVEYOR": name, **e} for e in errs)
+
+    total = {k: sum(row[k] for row in summary) for k in SUMMARY_COLUMNS[1:]}
+    summary.append({"CONVEYOR": "TENDER TOTAL", **{k: round(v, 2) for k, v in total.items()}})
+    return {
+        "summary": pd.DataFrame(summary, columns=SUMMARY_COLUMNS),
+        "rollers": pd.DataFrame(rollers),
+        "frames": pd.DataFrame(frames),
+        "errors": pd.DataFrame(errors, columns=["CONVEYOR", "ROW", "ERROR"]),
+    }
+
+
+def write_tender(result, path):
+    """One workbook (Summary / Rollers / Frames / Errors sheets), or the roller lines as CSV.
+
+    A CSV output gets its rejected lines in a sibling <name>_errors.csv.
+    Returns where the errors went (None when there are none).
+    """
+    if path.lower().endswith(".csv"):
+        result["rollers"].to_csv(path, index=False)
+        if result["errors"].empty:
+            return None
+        errors_path = f"{os.path.splitext(path)[0]}_errors.csv"
+        result["errors"].to_csv(errors_path, index=False)
+        return errors_path
+    with pd.ExcelWriter(path, engine="xlsxwriter") as w:
+        for sheet in ["summary", "rollers", "frames", "errors"]:
+            result[sheet].to_excel(w, index=False, sheet_name=sheet.title())
+    return None if result["errors"].empty else f"the Errors sheet of {path}"
+
+
+# ================== CLI ==================
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Price a multi-conveyor tender in parallel")
+    ap.add_argument("inputs", nargs="+", help="manifest CSV, or schedule files")
+    ap.add_argument("--output", "-o", default="tender.xlsx", help=".xlsx (all sheets) or .csv (roller lines, errors in *_errors.csv)")
+    ap.add_argument("--workers", "-j", type=int, default=None, help="processes (default: all cores)")
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="schedule lines per work unit")
+    ap.add_argument("--no-frames", action="store_true", help="do not price frames for SET lines")
+    args = ap.parse_args(argv)
+
+    try:
+        conveyors = read_manifest(args.inputs)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    def _progress(done, total):
+        print(f"\rcosting {done}/{total} chunks", end="", file=sys.stderr)
+
+    t = time.perf_counter()
+    result = price_tender(conveyors, args.workers, args.chunk_size, not args.no_frames, _progress)
+    print(file=sys.stderr)
+    errors_at = write_tender(result, args.output)
+
+    print(result["summary"].to_string(index=False))
+    lines = int(result["summary"]["LINES"].iloc[-1])
+    print(f"\n{len(conveyors)} conveyors, {lines:,} lines in {time.perf_counter() - t:.2f} s -> {args.output}")
+    if errors_at:
+        rejected = int(result["summary"]["ERRORS"].iloc[-1])
+        print(f"{rejected:,} schedule lines rejected (see {errors_at})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,17 +3,24 @@
 
 import streamlit as st
 import pandas as pd
-from io import BytesIO
+
+from cadai_costing import cost_roller
+from cadai_export import lazy_excel
+from cadai_lookup import TableIndex
+from cadai_pricebook import default_constants, section
+from cadai_quotebuf import frame_buffer, roller_buffer
+from cadai_tables import editable_fab_table
 
 # ---------------- SESSION INIT ----------------
 if "stage" not in st.session_state:
     st.session_state.stage = "select_roller"
 
+# quote lines: append-only buffers with running totals (cadai_quotebuf)
 if "costings" not in st.session_state:
-    st.session_state.costings = []
+    st.session_state.costings = roller_buffer()
 
 if "frame_costings" not in st.session_state:
-    st.session_state.frame_costings = []
+    st.session_state.frame_costings = frame_buffer()
 
 if "constants" not in st.session_state:
     st.session_state.constants = {}
@@ -22,15 +29,10 @@ if "selected_roller" not in st.session_state:
     st.session_state.selected_roller = None
 
 # ---------------- CONSTANTS ----------------
-DEFAULT_CONSTANTS = {
-    "STEEL_COST": 70,
-    "BEARING_COST_PAIR": 100,
-    "SEAL_COST": 30,
-    "WELDING_COST": 80,
-    "MARKUP": 1.25,
-    "FRAME_RATE": 100,
-    "LOCKING_RING": 0
-}
+# From the price book (pricebook.toml), reloaded when the file is saved
+DEFAULT_CONSTANTS = default_constants()
+if st.session_state.constants and st.session_state.get("constants_source", "book") == "book":
+    st.session_state.constants = DEFAULT_CONSTANTS.copy()
 
 # ---------------- FRAME TABLE ----------------
 REFERENCE_FRAME_WEIGHT_TABLE = pd.DataFrame({
@@ -49,8 +51,14 @@ FRAME_TABLE = {
     2000: 64.7
 }
 
+SARI_FRAME_WT_TABLE = {650:18.9,800:23.1,1000:36.1,1200:42.0,1400:60.9,1600:66.8,1800:90.9,2000:96.6}
+
+FRAME_INDEX = TableIndex(FRAME_TABLE)
+SARI_FRAME_INDEX = TableIndex(SARI_FRAME_WT_TABLE)
+
 def nearest_frame(weight):
-    return min(FRAME_TABLE.items(), key=lambda x: abs(x[1] - weight))
+    bw = FRAME_INDEX.nearest_by_value(weight)
+    return bw, FRAME_TABLE[bw]
 
 # ---------------- UI ----------------
 st.title("COST AI")
@@ -93,6 +101,7 @@ if st.session_state.stage == "ask_constants":
         st.rerun()
     if col2.button("NO"):
         st.session_state.constants = DEFAULT_CONSTANTS.copy()
+        st.session_state.constants_source = "book"
         st.session_state.stage = "input"
         st.rerun()
 
@@ -108,6 +117,7 @@ if st.session_state.stage == "constants":
         i += 1
     if st.button("Save Constants"):
         st.session_state.constants = c
+        st.session_state.constants_source = "custom"
         st.session_state.stage = "input"
         st.rerun()
 
@@ -122,28 +132,20 @@ if st.session_state.stage == "input":
     pipe_thk = st.number_input("PIPE THICKNESS", value=3.2)
     qty = st.number_input("QTY", value=1, step=1)
 
-    if int(shaft_dia) % 2 != 0:
-        shaft_dia += 3
-
-    # ---- WEIGHTS ----
-    pipe_wt = (3.14*pipe_dia*face_width*pipe_thk*7.85)/1000000
-    shaft_wt = (3.14/4)*(shaft_dia/10)*(shaft_dia/10)*(shaft_len/10)*7.85/1000
-    total_wt = pipe_wt + shaft_wt
-
     c = st.session_state.constants
-    housing_cost = pipe_dia / 2
     roller_type = st.session_state.selected_roller
 
     # ------------------ SARI ------------------
     if roller_type == "SARI":
         belt_width = 1000
         st.markdown(f"**BELT WIDTH = {belt_width} mm (Fixed for SARI)**")
-        steel_cost = 70
-        bearing_cost = 100
-        seal_cost = 30
-        welding_cost = 80
-        total_cost = (total_wt*steel_cost) + housing_cost + steel_cost + bearing_cost + seal_cost + welding_cost
-        unit_price = total_cost * 1.25
+        sari_rates = section("sari")
+        steel_cost = sari_rates["STEEL_COST"]
+        res = cost_roller(pipe_dia, pipe_thk, face_width, shaft_dia, shaft_len, roller_type, qty, sari_rates,
+                          odd_shaft_rule="all", whole_rubber_rings=False)
+        total_wt = res["weight"]
+        total_cost = res["unit_cp"] + steel_cost   # SARI rate sheet carries one extra steel-rate unit
+        unit_price = total_cost * sari_rates["MARKUP"]
         total_price = unit_price * qty
         if st.button("Calculate Roller Cost"):
             st.session_state.last_roller_weight = total_wt
@@ -160,16 +162,12 @@ if st.session_state.stage == "input":
 
     # ------------------ Other Rollers ------------------
     else:
-        if roller_type == "Carrying Idler Without Frame":
-            total_cost = (total_wt*c["STEEL_COST"])+housing_cost+c["BEARING_COST_PAIR"]+c["SEAL_COST"]+c["WELDING_COST"]
-        elif roller_type == "Impact Idler Without Frame":
-            rubber_ring_qty = face_width/35
-            rubber_ring_cost = rubber_ring_qty*50
-            total_cost = (total_wt*c["STEEL_COST"])+housing_cost+rubber_ring_cost+c["BEARING_COST_PAIR"]+c["SEAL_COST"]+c["LOCKING_RING"]+c["WELDING_COST"]
-        elif roller_type == "Carrying Idler With Frame":
-            total_cost = (total_wt*c["STEEL_COST"])+housing_cost+c["LOCKING_RING"]+c["BEARING_COST_PAIR"]+c["SEAL_COST"]+c["WELDING_COST"]
-        unit_price = total_cost*c["MARKUP"]
-        total_price = unit_price*qty
+        res = cost_roller(pipe_dia, pipe_thk, face_width, shaft_dia, shaft_len, roller_type, qty, c,
+                          odd_shaft_rule="all", whole_rubber_rings=False)
+        total_wt = res["weight"]
+        total_cost = res["unit_cp"]
+        unit_price = res["unit_price"]
+        total_price = res["total_price"]
         if st.button("Calculate Roller Cost"):
             st.session_state.last_roller_weight = total_wt
             st.session_state.costings.append({
@@ -186,8 +184,15 @@ if st.session_state.stage == "input":
 # ---------------- COMPILED ROLLER ----------------
 if st.session_state.stage == "compiled":
     st.subheader("Roller Costing")
-    df = pd.DataFrame(st.session_state.costings)
-    st.dataframe(df, use_container_width=True)
+    costings = st.session_state.costings
+    st.dataframe(costings.frame(), use_container_width=True)   # cached until a line is added
+
+    t1, t2, t3 = st.columns(3)
+    t1.metric("Rollers", f"{costings.grand['QTY']:,.0f}")
+    t2.metric("Total Weight (kg)", f"{costings.grand['WEIGHT']:,.2f}")
+    t3.metric("Total Price", f"{costings.grand['TOTAL PRICE']:,.2f}")
+    with st.expander("Totals by roller type / belt width"):
+        st.dataframe(costings.totals_frame(["ROLLER", "BELT WIDTH"]), hide_index=True)
 
     col1, col2 = st.columns(2)
 
@@ -218,34 +223,7 @@ if st.session_state.stage == "frame_input":
     bw, _ = nearest_frame(roller_wt)
     st.success(f"AUTO SELECTED BELT WIDTH = {bw} mm (Based on Roller WT = {round(roller_wt,2)} kg)")
 
-    def make_df(rows):
-        return pd.DataFrame(rows, columns=["DESCRIPTION","SECTION","SIZE","LENGTH (M)","WT/M","QTY","TOTAL WT"])
-
-    FRAME_STRUCTURES = {
-        650: make_df([
-            ["BASE ANGLE","ANGLE","65 x 65 x 6",5.8,0.984,1,5.71],
-            ["SIDE BRACKET","FLAT","65 x 6",3.1,0.345,2,2.14],
-            ["CENTRE BRACKET","FLAT","65 x 6",3.1,0.365,2,2.26],
-            ["MID FLAT","FLAT","50 x 6",2.4,0.300,2,1.44],
-            ["BASE FLAT","FLAT","50 x 6",2.4,0.240,2,1.15],
-        ]),
-        800: make_df([
-            ["BASE ANGLE","ANGLE","75 x 75 x 6",6.8,1.134,1,7.71],
-            ["SIDE BRACKET","FLAT","75 x 6",3.5,0.385,2,2.70],
-            ["CENTRE BRACKET","FLAT","75 x 6",3.5,0.400,2,2.80],
-            ["MID FLAT","FLAT","50 x 6",2.4,0.500,2,2.40],
-            ["BASE FLAT","FLAT","50 x 6",2.4,0.240,2,1.15],
-        ]),
-        1000: make_df([
-            ["BASE ANGLE","ANGLE","90 x 90 x 6",6.0,1.350,1,8.10],
-            ["SIDE BRACKET","FLAT","75 x 8",4.7,0.425,2,4.00],
-            ["CENTRE BRACKET","FLAT","75 x 8",4.7,0.415,2,3.90],
-            ["MID FLAT","FLAT","50 x 6",2.4,0.550,2,2.64],
-            ["BASE FLAT","FLAT","65 x 6",3.1,0.240,2,1.49],
-        ])
-    }
-
-    df = FRAME_STRUCTURES[bw]
+    df = editable_fab_table("CARRYING", bw)
     st.markdown("### Frame Fabrication Table (Editable)")
     edited_df = st.data_editor(df, use_container_width=True)
     TOTAL_FRAME_WEIGHT = edited_df["TOTAL WT"].sum()
@@ -277,56 +255,25 @@ if st.session_state.stage == "frame_input":
 # ---------------- FRAME INPUT FOR SARI ----------------
 if st.session_state.stage == "frame_input_sari":
     st.subheader("SARI Frame Auto Selection & Calculation")
-    SARI_FRAME_WT_TABLE = {650:18.9,800:23.1,1000:36.1,1200:42.0,1400:60.9,1600:66.8,1800:90.9,2000:96.6}
-
     roller_wt = st.session_state.last_roller_weight
-    nearest_bw = min(SARI_FRAME_WT_TABLE.keys(), key=lambda x: abs(SARI_FRAME_WT_TABLE[x]-roller_wt))
+    nearest_bw = SARI_FRAME_INDEX.nearest_by_value(roller_wt)
     st.success(f"Selected Belt Width = {nearest_bw} mm (Based on Roller WT = {round(roller_wt,2)} kg)")
 
-    def make_df(rows):
-        return pd.DataFrame(rows, columns=["DESCRIPTION","SECTION","SIZE","WT/M","LENGTH (M)","QTY","TOTAL WT"])
-
-    SARI_FRAME_STRUCTURES = {
-        650: make_df([
-            ["BASE CHANNEL","ISMC","100 x 50",0.972,9.2,1,8.94],
-            ["BRG. ANGLE","ANGLE","65 x 65 x 6",0.790,5.8,1,4.58],
-            ["SIDE BRACKET","FLAT","65 x 6",0.125,3.1,2,0.78],
-            ["SUPPORT ANGLE","ANGLE","50 x 50 x 6",0.050,4.5,2,0.45],
-            ["GUIDE BRACKET","FLAT","75 x 6",0.150,3.5,2,1.05],
-            ["MOUNTING FLAT","FLAT","100 x 6",0.330,4.7,2,3.10],
-        ]),
-        800: make_df([
-            ["BASE CHANNEL","ISMC","100 x 50",1.122,9.2,1,10.32],
-            ["BRG. ANGLE","ANGLE","75 x 75 x 6",0.990,6.8,1,6.73],
-            ["SIDE BRACKET","FLAT","75 x 6",0.130,3.5,2,0.91],
-            ["SUPPORT ANGLE","ANGLE","50 x 50 x 6",0.050,4.5,2,0.45],
-            ["GUIDE BRACKET","FLAT","100 x 6",0.160,4.7,2,1.50],
-            ["MOUNTING FLAT","FLAT","100 x 6",0.340,4.7,2,3.20],
-        ]),
-        1000: make_df([
-            ["BASE CHANNEL","ISMC","125 x 65",1.334,12.7,1,16.94],
-            ["BRG. ANGLE","ANGLE","90 x 90 x 6",1.194,8.2,1,9.79],
-            ["SIDE BRACKET","FLAT","75 x 8",0.130,4.7,2,1.22],
-            ["SUPPORT ANGLE","ANGLE","50 x 50 x 6",0.050,4.5,2,0.45],
-            ["GUIDE BRACKET","FLAT","100 x 6",0.160,4.7,2,1.50],
-            ["MOUNTING FLAT","FLAT","130 x 8",0.380,8.2,2,6.23],
-        ]),
-    }
-
-    df = SARI_FRAME_STRUCTURES[nearest_bw]
+    df = editable_fab_table("SARI", nearest_bw)
     st.markdown("### Frame Fabrication Table (Editable)")
     edited_df = st.data_editor(df, use_container_width=True)
     TOTAL_FRAME_WEIGHT = edited_df["TOTAL WT"].sum()
     st.success(f"TOTAL FRAME WEIGHT = {round(TOTAL_FRAME_WEIGHT,2)} kg")
 
-    guide_roller = st.number_input("Guide Roller Cost", value=400.0)
-    pivot_bearing = st.number_input("Pivot Bearing Cost", value=1000.0)
+    sari_frame = section("sari_frame")
+    guide_roller = st.number_input("Guide Roller Cost", value=sari_frame["GUIDE_ROLLER"])
+    pivot_bearing = st.number_input("Pivot Bearing Cost", value=sari_frame["PIVOT_BEARING"])
     QTY = st.number_input("Frame QTY", value=1, step=1)
 
-    RATE = 100
+    RATE = sari_frame["RATE"]
     UNIT_CP = TOTAL_FRAME_WEIGHT * RATE + guide_roller + pivot_bearing
     TOTAL_CP = UNIT_CP * QTY
-    MARKUP = 1.25
+    MARKUP = sari_frame["MARKUP"]
     UNIT_PRICE = UNIT_CP * MARKUP
     TOTAL_PRICE = UNIT_PRICE * QTY
 
@@ -349,8 +296,16 @@ if st.session_state.stage == "frame_input_sari":
 if st.session_state.stage == "frame_compiled":
     st.subheader("Frame Costing Table")
     if len(st.session_state.frame_costings) > 0:
-        df = pd.DataFrame(st.session_state.frame_costings)
-        st.dataframe(df, use_container_width=True)
+        st.dataframe(st.session_state.frame_costings.frame(), use_container_width=True)
+
+        roller_total = st.session_state.costings.grand["TOTAL PRICE"]
+        frame_total = st.session_state.frame_costings.grand["TOTAL PRICE"]
+        st.markdown("### Total Cost (Roller + Frame)")
+        st.dataframe(pd.DataFrame([{
+            "ROLLER TOTAL PRICE": round(roller_total, 2),
+            "FRAME TOTAL PRICE": round(frame_total, 2),
+            "TOTAL (ROLLER + FRAME)": round(roller_total + frame_total, 2),
+        }]), use_container_width=True, hide_index=True)
     else:
         st.info("No frame costing yet.")
 
@@ -367,20 +322,18 @@ if st.session_state.stage == "frame_compiled":
         st.session_state.stage = "compiled"
         st.rerun()
 
-    if col3.button("Download Frame Excel"):
-        if len(st.session_state.frame_costings) > 0:
-            buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-                df.to_excel(writer, index=False, sheet_name="FRAME_COSTING")
-            st.download_button("Download Frame Excel", buffer.getvalue(), file_name="frame_costing.xlsx")
-        else:
-            st.warning("No frame costing data to download.")
+    if len(st.session_state.frame_costings) > 0:
+        col3.download_button(
+            "Download Frame Excel",
+            lazy_excel(st.session_state.frame_costings, "FRAME_COSTING", "openpyxl"),
+            file_name="frame_costing.xlsx",
+        )
 
 # ---------------- DOWNLOAD ROLLER ----------------
 if len(st.session_state.costings) > 0:
     st.markdown("---")
-    buffer = BytesIO()
-    df = pd.DataFrame(st.session_state.costings)
-    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="ROLLER_COSTING")
-    st.download_button("Download Roller Excel", buffer.getvalue(), file_name="roller_costing.xlsx")
\ No newline at end of file
+    st.download_button(
+        "Download Roller Excel",
+        lazy_excel(st.session_state.costings, "ROLLER_COSTING", "openpyxl"),
+        file_name="roller_costing.xlsx",
+    )